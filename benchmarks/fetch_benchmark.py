@@ -0,0 +1,151 @@
+"""
+Fetch benchmark: time the standings fetch paths against a local stand-in server.
+
+Every scenario runs StandingsClient against modules.standings_replay's
+StandInServer, so no request leaves the machine: a full download with no
+cache, a conditional request answered 304, a fresh on-disk cache hit, a
+flaky server whose 503s the client retries through, the stale-cache
+fallback when the server only returns errors (after the retries), several
+clients fetching at once, and the in-process replay session as a floor. Standings
+come from a synthetic payload unless --fixture points at a recorded one.
+
+Usage: python benchmarks/fetch_benchmark.py [--requests 50] [--latency 0.01] [--concurrency 8] [--error-rate 0.3]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+from modules.standings_client import STANDINGS_URL, StandingsClient
+from modules.standings_replay import ReplaySession, StandInServer, load_fixture
+
+from synthetic import synthetic_payload
+
+SCENARIOS = ['cold', 'revalidate', 'cached', 'retry', 'stale', 'concurrent', 'replay']
+
+
+def fixture_from_args(path):
+    if path:
+        return load_fixture(path)
+    return {'url': STANDINGS_URL, 'headers': {}, 'payload': synthetic_payload()}
+
+
+def run_fetches(count, make_client, expected):
+    """
+    (seconds per fetch, retries) over count fetches, checking each client reports the expected status
+    """
+    retries = 0
+    start = time.perf_counter()
+    for _ in range(count):
+        client = make_client()
+        client.fetch()
+        if client.last_status != expected:
+            raise RuntimeError(f"Expected '{expected}' but the client reported '{client.last_status}'")
+        retries += client.retries
+        client.close()
+    return (time.perf_counter() - start) / count, retries
+
+
+def benchmark(fixture, scenarios, count, latency, concurrency, tmp, error_rate=0.3, backoff=0.0):
+    """
+    {scenario: (seconds per fetch, client retries, server stats)}
+
+    The retry scenario's server fails error_rate of all requests; clients
+    back off backoff, 2 × backoff, ... seconds between attempts.
+    """
+    url = fixture['url']
+    cache_path = os.path.join(tmp, "standings.json")
+    results = {}
+    for scenario in scenarios:
+        with StandInServer({url: fixture}, latency=latency, seed=0) as server:
+            local_url = server.url_for(url)
+
+            def client(ttl=0, cache=cache_path, retries=2):
+                return StandingsClient(url=local_url, cache_path=cache, ttl=ttl, retries=retries, backoff=backoff)
+
+            if scenario in ('revalidate', 'cached', 'stale'):
+                client().fetch()  # Prime the on-disk cache
+            if scenario == 'stale':
+                server.error_rate = 1.0
+            elif scenario == 'retry':
+                server.error_rate = error_rate
+            server.reset_stats()
+
+            if scenario == 'cold':
+                seconds, retries = run_fetches(count, lambda: client(cache=None), 'fetched')
+            elif scenario == 'revalidate':
+                seconds, retries = run_fetches(count, client, 'not-modified')
+            elif scenario == 'cached':
+                seconds, retries = run_fetches(count, lambda: client(ttl=3600), 'cache')
+            elif scenario == 'retry':
+                # Enough attempts that every fetch gets through the injected errors
+                seconds, retries = run_fetches(count, lambda: client(cache=None, retries=10), 'fetched')
+            elif scenario == 'stale':
+                with contextlib.redirect_stdout(io.StringIO()):  # The client reports every failed fetch
+                    seconds, retries = run_fetches(count, client, 'stale')
+            elif scenario == 'concurrent':
+                start = time.perf_counter()
+                with ThreadPoolExecutor(concurrency) as pool:
+                    runs = list(pool.map(lambda _: run_fetches(1, lambda: client(cache=None), 'fetched'),
+                                         range(count)))
+                seconds = (time.perf_counter() - start) / len(runs)
+                retries = sum(run_retries for _, run_retries in runs)
+            else:
+                replay = ReplaySession(fixtures={url: fixture})
+                seconds, retries = run_fetches(
+                    count, lambda: StandingsClient(url=url, cache_path=None, session=replay), 'fetched')
+            results[scenario] = (seconds, retries, dict(server.stats))
+        if os.path.exists(cache_path):
+            os.remove(cache_path)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument('--requests', type=int, default=50, help="Fetches per scenario")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds the server waits before answering")
+    parser.add_argument('--concurrency', type=int, default=8, help="Threads in the concurrent scenario")
+    parser.add_argument('--error-rate', type=float, default=0.3, help="Share of 503s in the retry scenario")
+    parser.add_argument('--backoff', type=float, default=0.0, help="Client retry backoff in seconds")
+    parser.add_argument('--fixture', help="Recorded fixture or .cache/standings.json to serve")
+    parser.add_argument('--output', help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    fixture = fixture_from_args(args.fixture)
+    with tempfile.TemporaryDirectory() as tmp:
+        results = benchmark(fixture, args.scenarios, args.requests, args.latency, args.concurrency, tmp,
+                            args.error_rate, args.backoff)
+
+    print(f"{'Scenario':<12} {'ms/fetch':>9} {'Requests':>9} {'Retries':>8} {'200':>5} {'304':>5} {'5xx':>5}")
+    for scenario, (seconds, retries, stats) in results.items():
+        print(f"{scenario:<12} {seconds * 1000:>9.2f} {stats['requests']:>9} {retries:>8} {stats['ok']:>5} "
+              f"{stats['not_modified']:>5} {stats['errors']:>5}")
+
+    if args.output:
+        report = {
+            'latency': args.latency,
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'error_rate': args.error_rate,
+            'backoff': args.backoff,
+            'fixture': args.fixture or 'synthetic',
+            'results': [{'scenario': scenario, 'ms_per_fetch': round(seconds * 1000, 3), 'retries': retries, **stats}
+                        for scenario, (seconds, retries, stats) in results.items()]
+        }
+        with open(args.output, 'w', encoding='utf8') as f:
+            json.dump(report, f, indent=2)
+        print(f"✓ Wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+"""
+Pipeline benchmark: time every stage of the build for growing synthetic pools.
+
+Each stage (bets parsing, consensus, fun stats, similarity, consensus table,
+live scoring, best-case scores, live standings HTML, index.html and README.md
+rendering) is timed on its own for every pool size, best of --repeat runs,
+and the results are written as JSON (by default to the git-ignored
+benchmarks/results/<commit>.json) so runs from different commits can be
+compared. Standings come from a synthetic payload unless
+--payload points at a recorded one (a raw payload or a .cache/standings.json).
+
+Usage: python benchmarks/pipeline_benchmark.py [--sizes 100 1000 ...] [--stages parse consensus ...]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+from modules.allsvenskan_scraper import calculate_prediction_scores, generate_live_standings_html, get_allsvenskan_standings
+from modules.bets_parser import load_bets
+from modules.elimination import best_case_scores
+from modules.fun_stats import calculate_fun_stats, consensus_ranking
+from modules.page import generate_enhanced_standings_table, iter_page, page_context
+from modules.readme import generate_readme
+from modules.similarity import analyze_pool
+from modules.renderer import write_chunks
+from modules.team_registry import TeamRegistry
+
+# modules.readme imports tabulate on first use; load it here so render_readme times rendering only
+import tabulate  # noqa: F401
+
+from synthetic import synthetic_bets, synthetic_payload, write_bets_file
+
+DEFAULT_SIZES = [100, 1000, 10000, 100000]
+STAGES = ['parse', 'consensus', 'fun_stats', 'similarity', 'consensus_table', 'live_scores', 'best_case',
+          'live_html', 'render_html', 'render_readme']
+
+
+def load_payload(path):
+    with open(path, 'r', encoding='utf8') as f:
+        payload = json.load(f)
+    # Accept the standings client's cache file as well as a bare payload
+    if isinstance(payload, dict) and 'payload' in payload and 'url' in payload:
+        payload = payload['payload']
+    return payload
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def time_call(fn, repeat):
+    """Best wall time of `repeat` calls and the last call's result"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def benchmark_size(size, payload, stages, repeat, tmp):
+    """Time the selected stages for one pool size; returns {stage: seconds}"""
+    bets_path = os.path.join(tmp, "bets")
+    write_bets_file(bets_path, synthetic_bets(size))
+
+    registry = TeamRegistry.build(payload)
+    standings = get_allsvenskan_standings(payload)
+    timings = {}
+
+    # Later stages need the earlier results, so those are always computed
+    seconds, matrix = time_call(lambda: load_bets(bets_path), repeat if 'parse' in stages else 1)
+    if 'parse' in stages:
+        timings['parse'] = seconds
+    bets = matrix.to_dict()
+
+    seconds, sorted_consensus = time_call(lambda: consensus_ranking(bets), repeat if 'consensus' in stages else 1)
+    if 'consensus' in stages:
+        timings['consensus'] = seconds
+
+    if 'fun_stats' in stages:
+        random.seed(0)
+        timings['fun_stats'], fun_stats = time_call(lambda: calculate_fun_stats(bets, sorted_consensus), repeat)
+    else:
+        fun_stats = {}
+
+    similarity = None
+    if 'similarity' in stages:
+        timings['similarity'], similarity = time_call(lambda: analyze_pool(matrix), repeat)
+
+    logos = {team: registry.logo_url(team) for team in sorted_consensus if registry.logo_url(team)}
+    seconds, consensus_table = time_call(lambda: generate_enhanced_standings_table(sorted_consensus, bets, logos),
+                                         repeat if 'consensus_table' in stages else 1)
+    if 'consensus_table' in stages:
+        timings['consensus_table'] = seconds
+
+    if 'live_scores' in stages:
+        timings['live_scores'], _ = time_call(lambda: calculate_prediction_scores(matrix, standings, registry), repeat)
+
+    if 'best_case' in stages:
+        full_data = get_allsvenskan_standings.full_data
+        timings['best_case'], _ = time_call(lambda: best_case_scores(matrix, standings, full_data, registry), repeat)
+
+    live_html = ""
+    if 'live_html' in stages:
+        timings['live_html'], live_html = time_call(
+            lambda: generate_live_standings_html(standings, matrix, registry), repeat)
+
+    if 'render_html' in stages:
+        index_path = os.path.join(tmp, "index.html")
+        timings['render_html'], _ = time_call(lambda: write_chunks(index_path, iter_page(
+            page_context(bets, sorted_consensus, fun_stats, live_html, consensus_table,
+                         similarity=similarity))), repeat)
+
+    if 'render_readme' in stages:
+        timings['render_readme'], _ = time_call(
+            lambda: generate_readme(bets, sorted_consensus, "Benchmark Pool"), repeat)
+
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--payload', help="Recorded standings payload to score against")
+    parser.add_argument('--output', help="JSON results file (default: benchmarks/results/<commit>.json)")
+    args = parser.parse_args()
+
+    payload = load_payload(args.payload) if args.payload else synthetic_payload()
+    commit = git_commit()
+    output = args.output or os.path.join(BENCH_DIR, "results", f"{commit or 'unknown'}.json")
+
+    results = []
+    print(f"{'Participants':>12} {'Stage':<16} {'Seconds':>9} {'µs/user':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            timings = benchmark_size(size, payload, args.stages, args.repeat, tmp)
+            for stage in args.stages:
+                seconds = timings[stage]
+                print(f"{size:>12} {stage:<16} {seconds:>9.3f} {seconds / size * 1e6:>9.1f}")
+                results.append({
+                    'participants': size,
+                    'stage': stage,
+                    'seconds': round(seconds, 6),
+                    'us_per_participant': round(seconds / size * 1e6, 3)
+                })
+
+    report = {
+        'commit': commit,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'repeat': args.repeat,
+        'payload': args.payload or 'synthetic',
+        'results': results
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf8') as f:
+        json.dump(report, f, indent=2)
+    print(f"✓ Wrote {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Render benchmark: time index.html generation for growing synthetic pools.
+
+Renders the full page through the compiled template, streamed to disk and,
+for comparison, concatenated with `+=` into one string first. Prints time per
+participant, which should stay flat (linear total time) as the pool grows.
+The consensus table is computed outside the timed section.
+
+Usage: python benchmarks/render_benchmark.py [--sizes 100 1000 10000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.page import generate_enhanced_standings_table, iter_page, page_context
+from modules.renderer import write_chunks
+
+from synthetic import synthetic_bets
+
+
+def consensus(bets):
+    totals = {}
+    for predictions in bets.values():
+        for i, team in enumerate(predictions):
+            totals[team] = totals.get(team, 0) + i
+    return dict(sorted(totals.items(), key=lambda item: (item[1], item[0])))
+
+
+def make_context(bets, sorted_consensus, consensus_table):
+    return page_context(bets, sorted_consensus, {}, "", consensus_table)
+
+
+def render_streaming(bets, sorted_consensus, consensus_table, path):
+    write_chunks(path, iter_page(make_context(bets, sorted_consensus, consensus_table)))
+
+
+def render_concatenated(bets, sorted_consensus, consensus_table, path):
+    """The old approach: grow one string with += and write it at the end"""
+    html_content = ''
+    for chunk in iter_page(make_context(bets, sorted_consensus, consensus_table)):
+        html_content += chunk
+    with open(path, 'w', encoding='utf8') as f:
+        f.write(html_content)
+
+
+def time_call(fn, *args, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000, 50000])
+    args = parser.parse_args()
+
+    print(f"{'Participants':>12} {'Streaming (s)':>14} {'µs/user':>9} {'Concat (s)':>11} {'µs/user':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "index.html")
+        for size in args.sizes:
+            bets = synthetic_bets(size)
+            sorted_consensus = consensus(bets)
+            consensus_table = generate_enhanced_standings_table(sorted_consensus, bets, {})
+            streaming = time_call(render_streaming, bets, sorted_consensus, consensus_table, path)
+            concat = time_call(render_concatenated, bets, sorted_consensus, consensus_table, path)
+            print(f"{size:>12} {streaming:>14.3f} {streaming / size * 1e6:>9.1f} "
+                  f"{concat:>11.3f} {concat / size * 1e6:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Synthetic pools and standings payloads for the benchmarks.
+
+Every participant gets a random but valid ranking (a permutation of the 16
+teams), and payloads mimic the standings endpoint: numbered team entries with
+position, names, logo and a list of {name, value} stats.
+"""
+import random
+
+TEAMS = ["AIK", "Elfsborg", "Hammarby", "Mjällby", "Malmö", "Djurgården", "Häcken", "Norrköping",
+         "Sirius", "Degerfors", "GAIS", "Östers", "Göteborg", "Brommapojkarna", "Halmstad", "Värnamo"]
+
+
+def synthetic_bets(participants, seed=0):
+    rng = random.Random(seed)
+    bets = {}
+    for i in range(participants):
+        ranking = TEAMS[:]
+        rng.shuffle(ranking)
+        bets[f"Participant {i}"] = ranking
+    return bets
+
+
+def write_bets_file(path, bets):
+    """Write bets in the format of the repo's `bets` file ('## Name' then '1. Team' lines)"""
+    with open(path, 'w', encoding='utf8') as f:
+        for user, ranking in bets.items():
+            f.write(f"## {user}\n")
+            f.writelines(f"{pos}. {team}\n" for pos, team in enumerate(ranking, 1))
+            f.write("\n")
+
+
+def synthetic_payload(round_played=15, seed=0):
+    """A standings payload after `round_played` rounds of random results"""
+    rng = random.Random(seed)
+    table = {team: {'gp': 0, 'w': 0, 'd': 0, 'l': 0, 'gf': 0, 'ga': 0} for team in TEAMS}
+    for _ in range(round_played):
+        teams = TEAMS[:]
+        rng.shuffle(teams)
+        for home, away in zip(teams[::2], teams[1::2]):
+            home_goals, away_goals = rng.randint(0, 4), rng.randint(0, 3)
+            for team, scored, conceded in ((home, home_goals, away_goals), (away, away_goals, home_goals)):
+                row = table[team]
+                row['gp'] += 1
+                row['gf'] += scored
+                row['ga'] += conceded
+                row['w' if scored > conceded else 'd' if scored == conceded else 'l'] += 1
+
+    for row in table.values():
+        row['gd'] = row['gf'] - row['ga']
+        row['points'] = 3 * row['w'] + row['d']
+    order = sorted(TEAMS, key=lambda team: (-table[team]['points'], -table[team]['gd'], team))
+
+    payload = {}
+    for pos, team in enumerate(order, 1):
+        payload[str(pos)] = {
+            'position': pos,
+            'name': team,
+            'displayName': team,
+            'abbrv': team[:3].upper(),
+            'logoImageUrl': f"https://example.invalid/logos/{pos}.png",
+            'stats': [{'name': name, 'value': value} for name, value in table[team].items()]
+        }
+    payload['undefined'] = {}
+    return payload
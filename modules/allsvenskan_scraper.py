@@ -1,75 +1,69 @@
-import requests
 import json
 from datetime import datetime
+from modules.scoring import score_bets
+from modules.scoring_metrics import get_metrics
+from modules.standings_client import get_standings_client
 
 def get_full_data():
-    url = "https://allsvenskan.se/data-endpoint/statistics/standings/2025/total"
-    
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-        "Accept": "application/json",
-        "Accept-Language": "en-US,en;q=0.5",
-        "Cache-Control": "no-cache"
-    }
+    """
+    Return the raw standings payload from the official API
 
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()  # Raise exception for bad status codes
-        return response.json()
-    except:
-        print(f"Error fetching Allsvenskan standings from API")
-    return []
+    Goes through the shared StandingsClient, so repeated calls within a run
+    reuse one response and unchanged standings are revalidated with a 304.
+    """
+    return get_standings_client().fetch()
 
-def get_allsvenskan_standings():
+def parse_standings(data):
     """
-    Fetch the current Allsvenskan standings from the official API
-    Returns a list of teams in their current order (1st to last)
+    Turn a raw standings payload into a list of team dicts sorted by position
     """
-    url = "https://allsvenskan.se/data-endpoint/statistics/standings/2025/total"
+    # Create a list to store team information in order
+    standings_data = []
     
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-        "Accept": "application/json",
-        "Accept-Language": "en-US,en;q=0.5",
-        "Cache-Control": "no-cache"
-    }
-    
-    try:
-        data = get_full_data()
-        
-        # Create a list to store team information in order
-        standings_data = []
-        
-        # Process each team entry (ignoring the 'undefined' key)
-        for key, team_info in data.items():
-            # Skip the 'undefined' key and any non-numeric keys
-            if not key.isdigit():
-                continue
-                
-            # Extract team information
-            position = int(team_info.get('position', 0))
-            team_name = team_info.get('name', '')
-            display_name = team_info.get('displayName', team_name)
-            logo_url = team_info.get('logoImageUrl', '')
+    # Process each team entry (ignoring the 'undefined' key)
+    for key, team_info in data.items():
+        # Skip the 'undefined' key and any non-numeric keys
+        if not key.isdigit():
+            continue
             
-            # Get stats
-            stats = {}
-            for stat in team_info.get('stats', []):
-                stat_name = stat.get('name', '')
-                stat_value = stat.get('value', 0)
-                stats[stat_name] = stat_value
-            
-            # Add team to list
-            standings_data.append({
-                'position': position,
-                'name': team_name,
-                'displayName': display_name,
-                'logoUrl': logo_url,
-                'stats': stats
-            })
+        # Extract team information
+        position = int(team_info.get('position', 0))
+        team_name = team_info.get('name', '')
+        display_name = team_info.get('displayName', team_name)
+        logo_url = team_info.get('logoImageUrl', '')
         
-        # Sort by position
-        standings_data.sort(key=lambda x: x['position'])
+        # Get stats
+        stats = {}
+        for stat in team_info.get('stats', []):
+            stat_name = stat.get('name', '')
+            stat_value = stat.get('value', 0)
+            stats[stat_name] = stat_value
+        
+        # Add team to list
+        standings_data.append({
+            'position': position,
+            'name': team_name,
+            'displayName': display_name,
+            'logoUrl': logo_url,
+            'stats': stats
+        })
+    
+    # Sort by position
+    standings_data.sort(key=lambda x: x['position'])
+    return standings_data
+
+def get_allsvenskan_standings(data=None):
+    """
+    Fetch the current Allsvenskan standings from the official API
+    Returns a list of teams in their current order (1st to last)
+
+    Pass an already fetched payload as data to parse that instead (e.g. for
+    another league or season).
+    """
+    try:
+        if data is None:
+            data = get_full_data()
+        standings_data = parse_standings(data)
         
         # Extract just the team names for compatibility with existing code
         standings = [team['displayName'] for team in standings_data]
@@ -93,61 +87,18 @@ def get_allsvenskan_standings():
         
         return []
 
-def calculate_prediction_scores(bets, actual_results):
+def calculate_prediction_scores(bets, actual_results, team_registry=None, metrics=None, kendall=False):
     """
     Calculate scores for each person based on the difference between 
     their predictions and actual results. Higher score is better.
+
+    bets can be the {user: [team, ...]} dict or a RankMatrix; all users are
+    scored together from one users × teams matrix (see modules.scoring).
+    Pass the TeamRegistry so prediction names match the API display names,
+    and metric names from modules.scoring_metrics for extra totals. With
+    kendall=True the Kendall tau distance is added as well.
     """
-    scores = {}
-    team_count = len(actual_results)
-    
-    # Calculate the theoretical maximum error possible
-    # Worst case: predicting teams in completely reverse order
-    max_possible_error = (team_count * team_count) // 2 if team_count % 2 == 0 else ((team_count * team_count) - 1) // 2
-    
-    for user, predictions in bets.items():
-        total_error = 0
-        user_team_errors = {}  # Track error for each team
-        
-        for predicted_pos, team in enumerate(predictions):
-            # Skip if the team isn't in actual results
-            if team not in actual_results:
-                continue
-                
-            # Get actual position (0-indexed in the list)
-            actual_pos = actual_results.index(team)
-            
-            # Calculate absolute error for this team
-            error = abs(predicted_pos - actual_pos)
-            total_error += error
-            
-            user_team_errors[team] = {
-                'predicted': predicted_pos + 1,  # +1 for display position
-                'actual': actual_pos + 1,        # +1 for display position
-                'error': error
-            }
-        
-        # Find best and worst predictions
-        if user_team_errors:
-            best_prediction = min(user_team_errors.items(), key=lambda x: x[1]['error'])
-            worst_prediction = max(user_team_errors.items(), key=lambda x: x[1]['error'])
-        else:
-            best_prediction = None
-            worst_prediction = None
-        
-        # Convert error to a positive score (higher is better)
-        positive_score = max_possible_error - total_error
-        
-        scores[user] = {
-            'score': positive_score,
-            'max_possible': max_possible_error,
-            'raw_error': total_error,
-            'percent': round((positive_score / max_possible_error) * 100, 1),
-            'best_prediction': best_prediction,
-            'worst_prediction': worst_prediction
-        }
-    
-    return scores
+    return score_bets(bets, actual_results, team_registry, metrics, kendall)
 
 def get_leaderboard(scores):
     """
@@ -155,9 +106,26 @@ def get_leaderboard(scores):
     """
     return sorted(scores.items(), key=lambda x: x[1]['score'], reverse=True)
 
-def generate_live_standings_html(standings, bets):
+def get_kendall_leaderboard(scores):
+    """
+    Create a leaderboard by Kendall tau distance (fewer discordant pairs is better)
+
+    scores must come from calculate_prediction_scores(..., kendall=True).
+    """
+    return sorted(scores.items(), key=lambda x: x[1]['discordant_pairs'])
+
+def generate_live_standings_html(standings, bets, team_registry=None, outlook=None, metrics=None, best_case=None,
+                                 leaderboard=None):
     """
     Generate HTML for the live standings section
+
+    outlook is the optional result of modules.simulator.simulate_pool; when
+    given, win/top-3 chances and the expected final score get their own columns.
+    Each scoring metric named in metrics gets a column as well, and
+    best_case (from modules.elimination.best_case_scores) adds the best
+    score still reachable and whether the participant can still win.
+    leaderboard is a modules.scoring.IncrementalLeaderboard already updated
+    for these standings, to reuse instead of scoring everyone again.
     """
     if not standings:
         return ""
@@ -167,9 +135,15 @@ def generate_live_standings_html(standings, bets):
     formatted_date = now.strftime("%B %d, %Y at %H:%M")
     
     # Calculate scores
-    scores = calculate_prediction_scores(bets, standings)
-    leaderboard = get_leaderboard(scores)
+    if leaderboard is not None:
+        scores = leaderboard.scores(metrics, kendall=True)
+        leaderboard = [(user, scores[user]) for user, _ in leaderboard.leaderboard()]
+    else:
+        scores = calculate_prediction_scores(bets, standings, team_registry, metrics, kendall=True)
+        leaderboard = get_leaderboard(scores)
     
+    metric_columns = get_metrics(metrics or [])
+
     # Get the full standings data if available
     full_standings_data = getattr(get_allsvenskan_standings, 'full_data', None)
 
@@ -184,7 +158,7 @@ def generate_live_standings_html(standings, bets):
     if not matches_played:
         return ""
 
-    html = """
+    html = ["""
     <!-- Current Leaderboard Section -->
     <section class="section" id="current-leaderboard-section">
         <h2 class="section-title"><span class="icon">🏆</span> Current Prediction Scores</h2>
@@ -199,11 +173,20 @@ def generate_live_standings_html(standings, bets):
                         <th>Score</th>
                         <th>Percentage</th>
                         <th>Best Prediction</th>
-                        <th>Worst Prediction</th>
+                        <th>Worst Prediction</th>{metric_headers}{best_case_headers}{outlook_headers}
                     </tr>
                 </thead>
                 <tbody>
-    """
+    """.format(metric_headers=''.join(f"""
+                        <th title="{'Higher' if metric.higher_is_better else 'Lower'} is better">{metric.label} {'↑' if metric.higher_is_better else '↓'}</th>"""
+                                      for metric in metric_columns),
+               best_case_headers="""
+                        <th>Best Possible</th>
+                        <th>Can Still Win</th>""" if best_case else "",
+               outlook_headers="""
+                        <th>Win Chance</th>
+                        <th>Top 3 Chance</th>
+                        <th>Expected Score</th>""" if outlook else "")]
     
     for index, (user, score_data) in enumerate(leaderboard):
         position = index + 1
@@ -224,24 +207,85 @@ def generate_live_standings_html(standings, bets):
             worst_team = team
             worst_details = f" (P:{details['predicted']}, A:{details['actual']})"
         
-        html += f"""
+        metric_cells = ''.join(f"""
+                    <td>{score_data['metrics'][metric.name]}</td>""" for metric in metric_columns)
+        
+        best_case_cells = ""
+        if best_case and user in best_case:
+            user_best = best_case[user]
+            best_case_cells = f"""
+                    <td>{user_best['best_score']} pts</td>
+                    <td>{'✗ Eliminated' if user_best['eliminated'] else '✓'}</td>"""
+        
+        outlook_cells = ""
+        if outlook and user in outlook:
+            user_outlook = outlook[user]
+            outlook_cells = f"""
+                    <td>{user_outlook['win_probability'] * 100:.1f}%</td>
+                    <td>{user_outlook['top3_probability'] * 100:.1f}%</td>
+                    <td>{user_outlook['expected_score']} pts</td>"""
+        
+        html.append(f"""
                 <tr class="{medal_class}">
                     <td>{position}</td>
                     <td>{user}</td>
                     <td>{score_data['score']} pts</td>
                     <td>{score_data['percent']}%</td>
                     <td class="best-prediction">{best_team}{best_details}</td>
-                    <td class="worst-prediction">{worst_team}{worst_details}</td>
-                </tr>"""
+                    <td class="worst-prediction">{worst_team}{worst_details}</td>{metric_cells}{best_case_cells}{outlook_cells}
+                </tr>""")
     
-    html += """
+    html.append("""
                 </tbody>
             </table>
         </div>
     </section>
-    """
+    """)
+    
+    # Same standings, ranked by how many pairs of teams each participant got in the right order
+    html.append("""
+    <section class="section" id="kendall-leaderboard-section">
+        <h2 class="section-title"><span class="icon">🔗</span> Rank Correlation</h2>
+        <p class="section-description">Kendall tau: pairs of teams predicted in the wrong order relative to each other. Fewer is better!</p>
+        
+        <div class="table-wrapper">
+            <table id="kendall-leaderboard-table">
+                <thead>
+                    <tr>
+                        <th>#</th>
+                        <th>Participant</th>
+                        <th>Wrong Pairs</th>
+                        <th>Kendall τ</th>
+                    </tr>
+                </thead>
+                <tbody>
+    """)
+    
+    position = 0
+    previous_pairs = None
+    for index, (user, score_data) in enumerate(get_kendall_leaderboard(scores)):
+        # Equal distances share a rank
+        if score_data['discordant_pairs'] != previous_pairs:
+            position = index + 1
+            previous_pairs = score_data['discordant_pairs']
+        medal_class = f"medal-{position}" if position <= 3 else ""
+        tau = "N/A" if score_data['kendall_tau'] is None else f"{score_data['kendall_tau']:.3f}"
+        html.append(f"""
+                <tr class="{medal_class}">
+                    <td>{position}</td>
+                    <td>{user}</td>
+                    <td>{score_data['discordant_pairs']}</td>
+                    <td>{tau}</td>
+                </tr>""")
+    
+    html.append("""
+                </tbody>
+            </table>
+        </div>
+    </section>
+    """)
     
-    return html
+    return ''.join(html)
 
 
 
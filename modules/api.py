@@ -0,0 +1,76 @@
+"""
+The pool pipeline as importable functions.
+
+    from modules import api
+
+    matrix = api.load("bets")
+    scores = api.score(matrix, payload)       # payload from the standings endpoint
+    stats = api.aggregate(matrix)
+    api.render(output_dir="site", simulate=True)
+
+Each stage imports what it needs on first call, so a scoring-only script
+loads the bets parser and the scorer and nothing else: no HTTP client, no
+templates, no process pools.
+"""
+
+
+def load(path='bets', width=16):
+    """Parse a bets file into a RankMatrix"""
+    from modules.bets_parser import load_bets
+    return load_bets(path, width)
+
+
+def standings(payload=None):
+    """
+    Team names in table order from a standings payload
+
+    With no payload the standings are fetched (through the on-disk cache).
+    """
+    from modules.allsvenskan_scraper import get_allsvenskan_standings
+    return get_allsvenskan_standings(payload)
+
+
+def aggregate(matrix):
+    """
+    Pool-wide statistics of a RankMatrix
+
+    Returns {'consensus', 'histogram', 'fun_stats'}: the consensus ranking
+    ({team: summed position}, best first), the team × position histogram and
+    the fun stats shown on the page.
+    """
+    from modules.fun_stats import calculate_fun_stats, consensus_ranking
+    from modules.position_histogram import PositionHistogram
+
+    bets = matrix.to_dict()
+    consensus = consensus_ranking(bets)
+    histogram = PositionHistogram(matrix)
+    return {'consensus': consensus, 'histogram': histogram,
+            'fun_stats': calculate_fun_stats(bets, consensus, histogram)}
+
+
+def score(matrix, actual, registry=None, metrics=None, kendall=False):
+    """
+    Score every participant against the standings
+
+    actual is either the team names in table order or a raw standings
+    payload; for a payload the team registry that matches prediction and
+    API names is built from it unless one is passed. Returns score_bets()'s
+    {user: score data}.
+    """
+    if isinstance(actual, dict):
+        if registry is None:
+            from modules.team_registry import load_team_registry
+            registry = load_team_registry(actual, path=None)
+        actual = standings(actual)
+    from modules.scoring import score_bets
+    return score_bets(matrix, actual, registry, metrics, kendall)
+
+
+def render(config=None, standings_payload=None, incremental=False, **overrides):
+    """
+    Build a pool's pages; config defaults to pool_config(**overrides)
+
+    Returns build_pool()'s result dict.
+    """
+    from modules.pipeline import build_pool, pool_config
+    return build_pool(config or pool_config(**overrides), standings_payload, incremental=incremental)
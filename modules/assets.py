@@ -0,0 +1,172 @@
+"""
+Fingerprinted, precompressed static assets for the page.
+
+With assets='hashed' the inline <style> and <script> blocks of the page
+template are moved into files named after a hash of their minified content
+(assets/page.3f2a9c1e0b7d.css), so a static host can serve them with a
+far-future cache lifetime and a rebuild that only changes the data leaves
+them cached. Every served artifact also gets .gz and, when the optional
+brotli module is installed, .br siblings for hosts that serve precompressed
+files (nginx gzip_static/brotli_static, most CDNs).
+"""
+import gzip
+import hashlib
+import os
+import re
+
+from modules.renderer import Template
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ASSET_MODES = ('inline', 'hashed')
+ASSETS_DIR = "assets"
+
+_BLOCK = re.compile(r"<(style|script)>(.*?)</\1>", re.S)
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_CSS_SPACE = re.compile(r"\s*([{};,>])\s*")
+_hashed_cache = {}
+
+
+def minify_css(css):
+    """Drop comments and the whitespace that carries no meaning in CSS"""
+    css = _CSS_COMMENT.sub("", css)
+    css = " ".join(css.split())
+    css = _CSS_SPACE.sub(r"\1", css)
+    # Space after a colon is never needed; before one it can be (a :hover)
+    css = css.replace(": ", ":").replace(";}", "}")
+    return css.strip()
+
+
+def minify_js(js):
+    """
+    Strip indentation, blank lines and comments that can be told apart from code
+
+    Deliberately conservative: lines are kept (no reliance on semicolon
+    insertion) and a trailing // comment is only dropped when the code
+    before it holds no string, template or regex literal it could be part of.
+    """
+    lines = []
+    for line in js.splitlines():
+        line = line.strip()
+        if not line or line.startswith("//"):
+            continue
+        code, marker, _ = line.partition(" //")
+        if marker and not any(ch in code for ch in "'\"`/"):
+            line = code.rstrip()
+        lines.append(line)
+    return "\n".join(lines)
+
+
+MINIFIERS = {'style': ('css', minify_css), 'script': ('js', minify_js)}
+
+
+def fingerprint(stem, extension, data):
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}.{extension}"
+
+
+def externalize(html, stem):
+    """
+    Move the plain <style> and <script> blocks of html into hashed asset files
+
+    Returns (html, {filename: bytes}) with each block replaced by a <link> or
+    <script src> pointing into ASSETS_DIR, in place so the load order holds.
+    Blocks that still contain template slots stay inline.
+    """
+    assets = {}
+
+    def replace(match):
+        tag, body = match.groups()
+        if "{{" in body:
+            return match.group(0)
+        extension, minify = MINIFIERS[tag]
+        data = minify(body).encode('utf8')
+        filename = fingerprint(stem, extension, data)
+        assets[filename] = data
+        if tag == 'style':
+            return f'<link rel="stylesheet" href="{ASSETS_DIR}/{filename}">'
+        return f'<script src="{ASSETS_DIR}/{filename}"></script>'
+
+    return _BLOCK.sub(replace, html), assets
+
+
+def load_hashed_template(path, stem):
+    """
+    The template at path with its styles and scripts externalized: (Template, assets)
+
+    Recomputed only when the file changes, like renderer.load_template.
+    """
+    mtime = os.path.getmtime(path)
+    cached = _hashed_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(path, 'r', encoding='utf8') as f:
+        source, assets = externalize(f.read(), stem)
+    _hashed_cache[path] = (mtime, (Template(source), assets))
+    return _hashed_cache[path][1]
+
+
+def compressed_variants(path):
+    """The precompressed siblings written for path"""
+    return [path + ".gz"] + ([path + ".br"] if brotli else [])
+
+
+def precompress(path, force=False):
+    """
+    Write path's .gz (and .br) variants; skipped when they exist unless force
+
+    gzip output carries no timestamp, so unchanged content compresses to
+    unchanged bytes. Returns the variants written.
+    """
+    written = []
+    data = None
+    for variant in compressed_variants(path):
+        if not force and os.path.exists(variant):
+            continue
+        if data is None:
+            with open(path, 'rb') as f:
+                data = f.read()
+        if variant.endswith(".gz"):
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        else:
+            compressed = brotli.compress(data, quality=11)
+        with open(variant, 'wb') as f:
+            f.write(compressed)
+        written.append(variant)
+    return written
+
+
+def write_assets(directory, assets, compress=True):
+    """
+    Write asset files into directory and remove the ones no longer referenced
+
+    Returns the paths of the current assets. Existing files are left alone:
+    the name already says the content is the same. With compress they get
+    precompressed siblings too; without, siblings left by an earlier build
+    are removed with the rest. A build with no assets removes the directory.
+    """
+    if not assets and not os.path.isdir(directory):
+        return []
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for filename, data in assets.items():
+        path = os.path.join(directory, filename)
+        if not os.path.exists(path):
+            with open(path, 'wb') as f:
+                f.write(data)
+        if compress:
+            precompress(path)
+        paths.append(path)
+
+    keep = set(paths)
+    if compress:
+        keep.update(variant for path in paths for variant in compressed_variants(path))
+    for filename in os.listdir(directory):
+        path = os.path.join(directory, filename)
+        if path not in keep and os.path.isfile(path):
+            os.remove(path)
+    if not os.listdir(directory):
+        os.rmdir(directory)
+    return paths
@@ -0,0 +1,150 @@
+"""
+Build several prediction pools (leagues and/or seasons) in one go.
+
+The pools are listed in a JSON file, each entry being pool_config() keys:
+
+    [
+        {"league": "Allsvenskan", "season": 2025, "bets": "bets"},
+        {"league": "Superettan", "season": 2025, "bets": "pools/superettan/bets",
+         "output_dir": "pools/superettan"},
+        {"league": "Allsvenskan", "season": 2024, "bets": "pools/2024/bets",
+         "output_dir": "pools/2024", "title": "Grabbarnas Allsvenskan 2024"}
+    ]
+
+All standings are fetched concurrently (one asyncio task per distinct
+endpoint, over one shared HTTP session and the usual on-disk cache), one team
+registry is built over every league's teams, and the pools are then rendered
+in parallel in a process pool.
+
+Usage: python -m modules.batch_runner pools.json [--workers N] [--incremental]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from modules.pipeline import build_pool, pool_config
+from modules.standings_client import StandingsClient, cache_path_for, create_session
+from modules.team_registry import load_team_registry, save_team_registry
+
+BATCH_REGISTRY_PATH = os.path.join(".cache", "team_registry_batch.json")
+
+
+def load_pool_configs(path):
+    """Read the pool list and fill in the defaults; pool names must be unique"""
+    with open(path, 'r', encoding='utf8') as f:
+        entries = json.load(f)
+    if isinstance(entries, dict):
+        entries = entries.get('pools', [])
+
+    configs = [pool_config(**entry) for entry in entries]
+    seen = set()
+    for config in configs:
+        if config['name'] in seen:
+            raise ValueError(f"Duplicate pool name '{config['name']}' in {path}")
+        seen.add(config['name'])
+    return configs
+
+
+async def fetch_all_standings(urls, ttl=60):
+    """
+    Fetch every endpoint concurrently and return {url: payload}
+
+    The blocking StandingsClient.fetch calls run in worker threads and share
+    one pooled session; each URL keeps its own cache file under .cache/.
+    """
+    urls = list(dict.fromkeys(urls))
+    session = create_session()
+    try:
+        clients = [StandingsClient(url, cache_path_for(url), ttl=ttl, session=session) for url in urls]
+        payloads = await asyncio.gather(*(asyncio.to_thread(client.fetch) for client in clients))
+    finally:
+        session.close()
+
+    for url, client in zip(urls, clients):
+        print(f"  {client.last_status:<12} {url}")
+    return dict(zip(urls, payloads))
+
+
+def merge_payloads(payloads):
+    """Combine several standings payloads into one, renumbering the team keys"""
+    merged = {}
+    for payload in payloads:
+        if not isinstance(payload, dict):
+            continue
+        for key, team_info in payload.items():
+            if key.isdigit():
+                merged[str(len(merged) + 1)] = team_info
+    return merged
+
+
+def _build_pool_worker(args):
+    config, payload, team_registry, incremental = args
+    return build_pool(config, payload, team_registry, incremental)
+
+
+def run_batch(configs, workers=None, incremental=False, ttl=60, registry_path=BATCH_REGISTRY_PATH):
+    """
+    Fetch, then render every pool; returns the build_pool() results in order
+
+    Fuzzy team matches learned by any pool are merged back into the shared
+    registry and saved once at the end.
+    """
+    if not configs:
+        return []
+
+    print(f"Fetching standings for {len(configs)} pools...")
+    payloads = asyncio.run(fetch_all_standings([config['url'] for config in configs], ttl))
+
+    team_registry = load_team_registry(merge_payloads(payloads.values()), registry_path)
+    jobs = [(config, payloads[config['url']], team_registry, incremental) for config in configs]
+
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    print(f"Rendering {len(jobs)} pools with {workers} workers...")
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_build_pool_worker, jobs))
+    else:
+        results = [_build_pool_worker(job) for job in jobs]
+
+    learned = {}
+    for result in results:
+        learned.update(result['aliases'] or {})
+    if learned:
+        team_registry.aliases.update(learned)
+        try:
+            save_team_registry(team_registry, registry_path)
+        except OSError as e:
+            print(f"! Could not save team registry: {e}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('config', help="JSON file listing the pools to build")
+    parser.add_argument('--workers', type=int, default=None, help="Render processes (default: CPU count)")
+    parser.add_argument('--incremental', action='store_true', help="Skip pools whose inputs are unchanged")
+    parser.add_argument('--ttl', type=int, default=60, help="Seconds a cached standings payload is used as-is")
+    args = parser.parse_args()
+
+    try:
+        configs = load_pool_configs(args.config)
+    except (OSError, ValueError, TypeError) as e:
+        print(f"! Could not read pool config {args.config}: {e}")
+        sys.exit(1)
+
+    results = run_batch(configs, args.workers, args.incremental, args.ttl)
+    for result in results:
+        if result['skipped']:
+            status = "unchanged"
+        elif result['standings_teams']:
+            status = f"built with live standings for {result['standings_teams']} teams"
+        else:
+            status = "built without live standings"
+        print(f"✓ {result['name']}: {status} -> {', '.join(result['outputs'])}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+import mmap
+
+from modules.rank_matrix import RankMatrix
+
+_BLANK = -1
+
+
+def _iter_raw_lines(path):
+    """Yield raw lines from a memory-mapped file without reading it whole"""
+    with open(path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped
+            return
+        with mm:
+            yield from iter(mm.readline, b"")
+
+
+def parse_team_line(line):
+    """Strip the '1. ' / '- ' prefixes from a prediction line"""
+    parts = line.split(". ")
+    if len(parts) == 2:
+        line = parts[1]
+    return line.replace("- ", "")
+
+
+def iter_bets(path, matrix):
+    """
+    Stream (user, [team_id, ...]) pairs from a bets file, one participant at a time
+
+    Team names are interned into `matrix` as they are seen. The format is a
+    '## Name' header followed by one team per line, optionally numbered
+    ('1. AIK') or bulleted ('- AIK'). Lines before the first header and blank
+    lines are ignored.
+    """
+    # Raw line -> team ID, so repeated lines like b'1. AIK\n' are decoded once
+    line_ids = {}
+    current_user = None
+    team_ids = []
+    for raw in _iter_raw_lines(path):
+        if raw[:2] == b'##':
+            if current_user is not None:
+                yield current_user, team_ids
+            current_user = raw.decode('utf8').rstrip().replace("## ", "")
+            team_ids = []
+            continue
+        if current_user is None:
+            continue
+        team_id = line_ids.get(raw)
+        if team_id is None:
+            line = raw.decode('utf8').rstrip()
+            team_id = _BLANK if line == "" else matrix.intern(parse_team_line(line))
+            line_ids[raw] = team_id
+        if team_id != _BLANK:
+            team_ids.append(team_id)
+    if current_user is not None:
+        yield current_user, team_ids
+
+
+def load_bets(path='bets', width=16):
+    """
+    Parse a bets file into a RankMatrix
+
+    Each participant's ranking is stored as one fixed-width row of team IDs,
+    so the whole pool lives in a single bytearray. If a name appears twice
+    the later ranking replaces the earlier one.
+    """
+    matrix = RankMatrix(width)
+    seen = {}
+    longest = 0
+    for user, team_ids in iter_bets(path, matrix):
+        longest = max(longest, len(team_ids))
+        if user in seen:
+            matrix.replace_id_row(seen[user], team_ids)
+        else:
+            seen[user] = len(matrix.users)
+            matrix.add_id_row(user, team_ids)
+    # Drop unused padding columns (e.g. a league with fewer than `width` teams)
+    if longest < matrix.width:
+        matrix.resize(longest)
+    return matrix
@@ -0,0 +1,106 @@
+import glob
+import hashlib
+import json
+import os
+
+MANIFEST_PATH = os.path.join(".cache", "build_manifest.json")
+
+_REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path):
+    """Return the sha256 of a file, or None if it doesn't exist"""
+    try:
+        with open(path, 'rb') as f:
+            return hash_bytes(f.read())
+    except OSError:
+        return None
+
+
+def hash_payload(payload):
+    """Hash a JSON payload independent of key order and formatting"""
+    normalized = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hash_bytes(normalized.encode('utf8'))
+
+
+def template_version():
+    """
+    Hash the generator's own source (stats.py, modules/*.py and templates/)
+
+    Any change to the page templates or the statistics changes this value,
+    so a code update always triggers a rebuild.
+    """
+    sources = [os.path.join(_REPO_DIR, "stats.py")]
+    sources += sorted(glob.glob(os.path.join(_REPO_DIR, "modules", "*.py")))
+    sources += sorted(glob.glob(os.path.join(_REPO_DIR, "templates", "*")))
+    digest = hashlib.sha256()
+    for path in sources:
+        digest.update(os.path.basename(path).encode('utf8'))
+        digest.update((hash_file(path) or '').encode('ascii'))
+    return digest.hexdigest()
+
+
+def collect_build_inputs(bets_path, standings_payload, options=None):
+    """
+    Return the input hashes that decide whether the outputs need rebuilding
+
+    options holds command-line switches that change the output (e.g. whether
+    the season simulation is included).
+    """
+    return {
+        'bets': hash_file(bets_path),
+        'standings': hash_payload(standings_payload),
+        'template': template_version(),
+        'options': hash_payload(options or {})
+    }
+
+
+def load_manifest(path=MANIFEST_PATH):
+    try:
+        with open(path, 'r', encoding='utf8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(inputs, output_paths, path=MANIFEST_PATH):
+    """Record the inputs of this build and the hashes of the files it produced"""
+    manifest = {
+        'inputs': inputs,
+        'outputs': {output: hash_file(output) for output in output_paths}
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def is_up_to_date(inputs, output_paths, path=MANIFEST_PATH):
+    """
+    True if the last build had the same inputs and its outputs are untouched
+    """
+    manifest = load_manifest(path)
+    if manifest.get('inputs') != inputs:
+        return False
+    recorded = manifest.get('outputs', {})
+    for output in output_paths:
+        if recorded.get(output) is None or recorded.get(output) != hash_file(output):
+            return False
+    return True
+
+
+def write_if_changed(path, content):
+    """Write text to path unless the file already has exactly that content"""
+    data = content.encode('utf8')
+    if hash_file(path) == hash_bytes(data):
+        return False
+    with open(path, 'wb') as f:
+        f.write(data)
+    return True
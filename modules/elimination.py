@@ -0,0 +1,341 @@
+"""
+Best still-achievable scores and mathematical elimination from the pool.
+
+Every team's final position is bounded by points alone: a team can't finish
+above anyone who already has more points than it can reach, nor below anyone
+who can't catch up with it. Within those ranges, a participant's best final
+error is a minimum-cost assignment of teams to positions (cost |predicted -
+final| per prediction), solved with the Hungarian algorithm rather than by
+trying orders. The ranges ignore who plays whom, so best scores are
+optimistic and eliminations are certain.
+"""
+from functools import lru_cache
+
+from modules.rank_matrix import MISSING
+from modules.scoring import compute_error_matrix, max_possible_error
+from modules.scoring_metrics import lane_sums
+from modules.simulator import team_stat
+
+# Cost of placing a team outside its reachable range
+FORBIDDEN = 10 ** 9
+
+# How many of the current leaders to test everyone else against
+LEADER_CANDIDATES = 3
+
+
+def position_bounds(full_data, total_rounds=None):
+    """
+    (highest, lowest) 0-based final position each team can still reach
+
+    In standings order, from the current points and games played in
+    get_allsvenskan_standings.full_data. Teams level on points can finish in
+    either order.
+    """
+    team_count = len(full_data)
+    if total_rounds is None:
+        total_rounds = 2 * (team_count - 1)  # Everyone meets everyone home and away
+
+    points, ceilings = [], []
+    for team in full_data:
+        stats = team.get('stats', {})
+        gp = int(team_stat(stats, 'gp', 'played', 'matches'))
+        current = int(team_stat(stats, 'points', 'pts', 'p'))
+        points.append(current)
+        ceilings.append(current + 3 * max(0, total_rounds - gp))
+
+    bounds = []
+    for t in range(team_count):
+        above = sum(1 for other in range(team_count) if other != t and points[other] > ceilings[t])
+        below = sum(1 for other in range(team_count) if other != t and ceilings[other] < points[t])
+        bounds.append((above, team_count - 1 - below))
+    return bounds
+
+
+def independent_blocks(bounds):
+    """
+    Split the table into blocks of positions that a fixed set of teams must fill
+
+    Returns [(first_pos, last_pos, [team, ...]), ...]. Positions 0..k form a
+    block boundary when exactly k + 1 teams can reach them and none of those
+    can drop below k, so every block can be solved on its own; a team whose
+    position is already decided is a block of one.
+    """
+    blocks = []
+    start = 0
+    for end in range(len(bounds)):
+        reaching = [t for t, (highest, lowest) in enumerate(bounds) if highest <= end]
+        if len(reaching) == end + 1 and all(bounds[t][1] <= end for t in reaching):
+            blocks.append((start, end, [t for t in reaching if bounds[t][1] >= start]))
+            start = end + 1
+    return blocks
+
+
+def min_cost_assignment(cost, matched=None):
+    """
+    Hungarian algorithm for a square cost matrix
+
+    Returns (total, assignment) where assignment[row] is the column given to
+    that row. O(n³) with row/column potentials. For a matrix without
+    negative costs, matched can pre-assign {row: column} cells of cost 0
+    (distinct columns); only the other rows then need an augmenting path,
+    which makes a nearly feasible ranking O(k·n²) for k misplaced teams.
+    """
+    n = len(cost)
+    u = [0] * (n + 1)
+    v = [0] * (n + 1)
+    owner = [0] * (n + 1)  # column -> row (1-based, 0 = free)
+    way = [0] * (n + 1)
+    matched = matched or {}
+    for row, column in matched.items():
+        owner[column + 1] = row + 1
+    for row in range(1, n + 1):
+        if row - 1 in matched:
+            continue
+        owner[0] = row
+        column = 0
+        min_reduced = [float('inf')] * (n + 1)
+        used = [False] * (n + 1)
+        while True:
+            used[column] = True
+            current = owner[column]
+            delta = float('inf')
+            next_column = 0
+            costs = cost[current - 1]
+            u_current = u[current]
+            for j in range(1, n + 1):
+                if not used[j]:
+                    reduced = costs[j - 1] - u_current - v[j]
+                    if reduced < min_reduced[j]:
+                        min_reduced[j] = reduced
+                        way[j] = column
+                    if min_reduced[j] < delta:
+                        delta = min_reduced[j]
+                        next_column = j
+            for j in range(n + 1):
+                if used[j]:
+                    u[owner[j]] += delta
+                    v[j] -= delta
+                else:
+                    min_reduced[j] -= delta
+            column = next_column
+            if not owner[column]:
+                break
+        while column:
+            previous = way[column]
+            owner[column] = owner[previous]
+            column = previous
+
+    assignment = [0] * n
+    for j in range(1, n + 1):
+        assignment[owner[j] - 1] = j - 1
+    return sum(cost[row][assignment[row]] for row in range(n)), assignment
+
+
+def placement_costs(key, team_count):
+    """
+    One participant's cost rows: costs[team][pos] is their error if the team finishes at pos
+
+    key is their row of standings indices (MISSING for unknown teams).
+    """
+    costs = [None] * team_count
+    for predicted_pos, team in enumerate(key):
+        if team == MISSING:
+            continue
+        distances = [abs(predicted_pos - pos) for pos in range(team_count)]
+        costs[team] = distances if costs[team] is None else list(map(sum, zip(costs[team], distances)))
+    zeros = [0] * team_count
+    return [row if row is not None else zeros for row in costs]
+
+
+def block_picks(data, block, bounds, distinct=True):
+    """
+    A participant's picks for one block's teams, normalized for memoizing
+
+    Returns (key, offset). A team picked once at a position outside its
+    reachable range costs the distance to the nearest end of the range plus
+    the distance from there, so the pick is clamped into the range and the
+    difference added to offset; many different rankings then share a key.
+    Teams picked never or more than once keep the tuple of their positions.
+    With distinct=True the row is known to hold no team twice.
+    """
+    key, offset = [], 0
+    for team in block[2]:
+        if distinct:
+            pos = data.find(team)
+            picks = () if pos == -1 else (pos,)
+        else:
+            picks = tuple(pos for pos, picked in enumerate(data) if picked == team)
+        if len(picks) == 1:
+            highest, lowest = bounds[team]
+            clamped = min(max(picks[0], highest), lowest)
+            offset += abs(picks[0] - clamped)
+            key.append(clamped)
+        else:
+            key.append(picks)
+    return tuple(key), offset
+
+
+@lru_cache(maxsize=None)
+def distance_row(pick, team_count):
+    return [abs(pick - pos) for pos in range(team_count)]
+
+
+def key_costs(key, block, team_count):
+    """{team: cost row} for a block key from block_picks()"""
+    costs = {}
+    for team, picks in zip(block[2], key):
+        if isinstance(picks, tuple):
+            costs[team] = [sum(abs(pick - pos) for pick in picks) for pos in range(team_count)]
+        else:
+            costs[team] = distance_row(picks, team_count)
+    return costs
+
+
+def block_assignment(block, bounds, costs, nonnegative=True):
+    """
+    Cheapest placement of a block's teams within their ranges: (total, {team: pos})
+
+    costs[team] is the team's cost row (error per final position). With nonnegative
+    costs, picks that are already free and in range are kept as they are
+    before the Hungarian algorithm places the rest.
+    """
+    first, last, teams = block
+    matrix = []
+    for team in teams:
+        row = costs[team][first:last + 1]
+        highest, lowest = bounds[team]
+        for pos in range(first, highest):
+            row[pos - first] = FORBIDDEN
+        for pos in range(lowest + 1, last + 1):
+            row[pos - first] = FORBIDDEN
+        matrix.append(row)
+    matched = {}
+    if nonnegative:
+        taken = set()
+        for row, values in enumerate(matrix):
+            if 0 in values:
+                column = values.index(0)
+                if column not in taken:
+                    matched[row] = column
+                    taken.add(column)
+    total, assignment = min_cost_assignment(matrix, matched)
+    return total, {team: first + column for team, column in zip(teams, assignment)}
+
+
+def best_case_scores(matrix, actual_results, full_data, registry=None, total_rounds=None):
+    """
+    Best score each participant can still reach, and whether they can still win
+
+    Args:
+        matrix: RankMatrix of predictions
+        actual_results: current standings (team names in order)
+        full_data: get_allsvenskan_standings.full_data for the same standings
+        registry: TeamRegistry used to match prediction and standings names
+
+    Returns:
+        {user: {'best_score', 'best_error', 'eliminated'}}
+
+    A participant is eliminated when one of the current leaders beats them in
+    every final table the points still allow. Rankings whose every pick is
+    still reachable (best error 0) are found for all participants at once
+    with byte-lane column sums; the rest solve one small assignment per block
+    of the table, memoized on their picks for that block.
+    """
+    team_count = len(actual_results)
+    user_count, width = len(matrix), matrix.width
+    if not team_count or not user_count or len(full_data) != team_count:
+        return {}
+    max_error = max_possible_error(team_count)
+    bounds = position_bounds(full_data, total_rounds)
+    blocks = independent_blocks(bounds)
+    actual = bytes(compute_error_matrix(matrix, actual_results, registry)[0])
+
+    def column_sums(tables, bound):
+        return lane_sums((actual[pos::width].translate(table) for pos, table in enumerate(tables)),
+                         user_count, bound)
+
+    # Picks outside the team's reachable range (or of unknown teams), per participant
+    outside = column_sums([bytes(0 if team < team_count and bounds[team][0] <= pos <= bounds[team][1] else 1
+                                 for team in range(256)) for pos in range(width)], width)
+    # Teams whose final position is already decided contribute a fixed error
+    fixed = {teams[0]: first for first, last, teams in blocks if len(teams) == 1}
+    fixed_errors = column_sums([bytes(abs(pos - fixed[team]) if team in fixed else 0 for team in range(256))
+                                for pos in range(width)], width * team_count)
+    current_errors = column_sums([bytes(abs(pos - team) if team < team_count else 0 for team in range(256))
+                                  for pos in range(width)], width * team_count)
+    open_blocks = [block for block in blocks if len(block[2]) > 1]
+
+    def row(index):
+        return actual[index * width:(index + 1) * width]
+
+    # A row with every pick in range and no team twice is a reachable table as it stands
+    positions = [pos for pos in matrix.position_table(actual_results, registry.canonical if registry else None)
+                 if pos != MISSING]
+    one_to_one = len(set(positions)) == len(positions)
+
+    def distinct(index):
+        if one_to_one:
+            return index not in matrix.repeats
+        picked = row(index)
+        return len(set(picked) - {MISSING}) == width - picked.count(MISSING)
+
+    memos = [{} for _ in open_blocks]
+    best_errors = [0] * user_count
+    finals = {}
+    for index in range(user_count):
+        if not outside[index] and width == team_count and distinct(index):
+            continue
+        data, unique = row(index), distinct(index)
+        total, final = fixed_errors[index], {}
+        for block, memo in zip(open_blocks, memos):
+            key, offset = block_picks(data, block, bounds, unique)
+            if key not in memo:
+                memo[key] = block_assignment(block, bounds, key_costs(key, block, team_count))
+            block_total, placement = memo[key]
+            total += offset + block_total
+            final.update(placement)
+        best_errors[index] = total
+        finals[index] = final
+
+    # The leaders' worst case: no one whose best is worse than that can catch them
+    candidates = sorted(range(user_count), key=lambda index: (current_errors[index], index))[:LEADER_CANDIDATES]
+    worst = {}
+    for index in candidates:
+        negated = [[-value for value in values] for values in placement_costs(row(index), team_count)]
+        worst[index] = fixed_errors[index] - sum(block_assignment(block, bounds, negated, nonnegative=False)[0]
+                                                 for block in open_blocks)
+    leader = min(candidates, key=lambda index: (worst[index], index))
+    leader_costs = placement_costs(row(leader), team_count)
+    pair_memos = [{} for _ in open_blocks]
+
+    def beaten_by_leader(index):
+        """True if the leader finishes ahead of this participant in every reachable table"""
+        final = finals.get(index)
+        if final is None:
+            return False  # Their own ranking can still happen exactly
+        # At this participant's best table the leader might already be no better
+        leader_error = fixed_errors[leader] + sum(leader_costs[team][pos] for team, pos in final.items())
+        if best_errors[index] <= leader_error:
+            return False
+        margin = fixed_errors[index] - fixed_errors[leader]
+        data, unique = row(index), distinct(index)
+        for block, memo in zip(open_blocks, pair_memos):
+            key, offset = block_picks(data, block, bounds, unique)
+            if key not in memo:
+                difference = {team: list(map(int.__sub__, values, leader_costs[team]))
+                              for team, values in key_costs(key, block, team_count).items()}
+                memo[key] = block_assignment(block, bounds, difference, nonnegative=False)[0]
+            margin += offset + memo[key]
+        return margin > 0
+
+    results = {}
+    threshold = worst[leader]
+    for index, user in enumerate(matrix.users):
+        best_error = best_errors[index]
+        eliminated = index != leader and (best_error > threshold or beaten_by_leader(index))
+        results[user] = {
+            'best_score': max_error - best_error,
+            'best_error': best_error,
+            'eliminated': eliminated
+        }
+    return results
@@ -0,0 +1,236 @@
+import random
+
+from modules.position_histogram import PositionHistogram, mean_position, position_count, position_variance
+from modules.scoring import compute_error_matrix
+
+
+def consensus_ranking(bets):
+    """
+    Sum every team's predicted positions (0-based) over all participants
+
+    Returns {team: total} ordered by total, ties broken alphabetically, so the
+    first team is the consensus favourite (lower score is better).
+    """
+    totals = {}
+    for user in bets.keys():
+        for i, bet in enumerate(bets[user]):
+            if bet not in totals:
+                totals[bet] = i
+            else:
+                totals[bet] += i
+
+    # Group teams by their score
+    grouped_by_score = {}
+    for team, score in totals.items():
+        if score not in grouped_by_score:
+            grouped_by_score[score] = []
+        grouped_by_score[score].append(team)
+
+    # Sort scores and within each score group, sort teams alphabetically
+    sorted_consensus = {}
+    for score in sorted(grouped_by_score.keys()):
+        for team in sorted(grouped_by_score[score]):
+            sorted_consensus[team] = score
+    return sorted_consensus
+
+
+# Helper function to format teams list
+def format_team_list(teams_list):
+    if len(teams_list) == 1:
+        return teams_list[0]
+    elif len(teams_list) == 2:
+        return f"{teams_list[0]} & {teams_list[1]}"
+    else:
+        return ", ".join(teams_list[:-1]) + f" & {teams_list[-1]}"
+
+
+# Calculate additional fun stats
+def calculate_fun_stats(bets, sorted_standings, histogram=None):
+    """
+    Pick the fun facts shown on the page (champion favourite, most divisive
+    team, the prophet, ...)
+
+    Team statistics come from a PositionHistogram (pass the one built for the
+    page to share it); per-participant ones from the rows of its RankMatrix.
+    Ties are broken with random.choice, as before.
+    """
+    if histogram is None:
+        histogram = PositionHistogram.from_bets(bets)
+    matrix = histogram.matrix
+    users = matrix.users
+    stats = {}
+    
+    # Most frequently predicted team for 1st place
+    first_place_counter = histogram.first_place_votes()
+    if first_place_counter:
+        # Handle ties for most predicted champion - ALLOW MULTIPLE TEAMS
+        champion_count = max(first_place_counter.values())
+        champions = [team for team, count in first_place_counter.items() if count == champion_count]
+        # Format with commas and & sign
+        stats['most_predicted_champion'] = format_team_list(champions)
+        stats['champion_votes'] = champion_count
+    
+    # Direct relegation (bottom 2 teams)
+    direct_relegation_predictions = histogram.tail_votes((2, 1))
+    
+    if direct_relegation_predictions:
+        # Find team most predicted for direct relegation - ALLOW MULTIPLE TEAMS
+        relegation_count = max(direct_relegation_predictions.values())
+        relegation_teams = [team for team, count in direct_relegation_predictions.items() if count == relegation_count]
+        # Format with commas and & sign
+        stats['most_predicted_relegation'] = format_team_list(relegation_teams)
+        stats['relegation_votes'] = relegation_count
+    
+    # Playoff spot (3rd last position)
+    playoff_predictions = histogram.tail_votes((3,))
+    
+    if playoff_predictions:
+        # Find team most predicted for playoff - ONLY ONE TEAM
+        playoff_count = max(playoff_predictions.values())
+        # Handle ties by selecting one randomly
+        playoff_teams = [team for team, count in playoff_predictions.items() if count == playoff_count]
+        if len(playoff_teams) > 1:
+            stats['most_predicted_playoff'] = random.choice(playoff_teams)
+        else:
+            stats['most_predicted_playoff'] = playoff_teams[0]
+        stats['playoff_votes'] = playoff_count
+    
+    # Most divisive team (highest variance in predictions), every listing counts
+    team_counts = {team: histogram.team_counts(team) for team in sorted_standings.keys()}
+    
+    # Calculate position variance for each team with at least 2 positions
+    team_variance = {}
+    for team, counts in team_counts.items():
+        if position_count(counts) >= 2:
+            team_variance[team] = position_variance(counts)
+    
+    if team_variance:
+        most_divisive_variance = max(team_variance.values())
+        most_divisive_teams = [team for team, var in team_variance.items() if var == most_divisive_variance]
+        if len(most_divisive_teams) > 1:
+            stats['most_divisive_team'] = random.choice(most_divisive_teams)
+        else:
+            stats['most_divisive_team'] = most_divisive_teams[0]
+        stats['divisive_variance'] = round(most_divisive_variance, 1)
+    
+    # Find highest agreement team (team with lowest variance)
+    if team_variance:
+        most_agreed_variance = min(team_variance.values())
+        most_agreed_teams = [team for team, var in team_variance.items() if var == most_agreed_variance]
+        if len(most_agreed_teams) > 1:
+            stats['most_agreed_team'] = random.choice(most_agreed_teams)
+        else:
+            stats['most_agreed_team'] = most_agreed_teams[0]
+        stats['agreed_variance'] = round(most_agreed_variance, 1)
+    
+    # Calculate the most optimistic and pessimistic predictors: average
+    # predicted position of the consensus top 5
+    top_ids = [matrix.team_ids[team] for team in list(sorted_standings.keys())[:5] if team in matrix.team_ids]
+    user_optimism = {}
+    for index, user in enumerate(users):
+        row = matrix.row(index)
+        total_pos = 0
+        counted_teams = 0
+        for team_id in top_ids:
+            pos = row.find(team_id)
+            if pos != -1:
+                total_pos += pos + 1
+                counted_teams += 1
+        
+        if counted_teams > 0:
+            user_optimism[user] = total_pos / counted_teams
+    
+    if user_optimism:
+        # Handle ties for optimistic - ONLY ONE PERSON
+        min_optimism = min(user_optimism.values())
+        most_optimistic_users = [user for user, opt in user_optimism.items() if opt == min_optimism]
+        if len(most_optimistic_users) > 1:
+            stats['most_optimistic'] = random.choice(most_optimistic_users)
+        else:
+            stats['most_optimistic'] = most_optimistic_users[0]
+        
+        # Handle ties for pessimistic - ONLY ONE PERSON
+        max_optimism = max(user_optimism.values())
+        most_pessimistic_users = [user for user, opt in user_optimism.items() if opt == max_optimism]
+        if len(most_pessimistic_users) > 1:
+            stats['most_pessimistic'] = random.choice(most_pessimistic_users)
+        else:
+            stats['most_pessimistic'] = most_pessimistic_users[0]
+    
+    # Distance of every pick from its consensus position, for all users at once
+    consensus_order = list(sorted_standings.keys())
+    _, consensus_errors = compute_error_matrix(matrix, consensus_order)
+    width = matrix.width
+    counted_width = min(width, len(consensus_order))
+    short_rows = set(histogram.short_rows)
+    
+    # Calculate most unique predictor (most picks different from consensus)
+    # and "The Prophet" - user whose predictions align most closely with consensus
+    user_uniqueness = {}
+    user_alignment = {}
+    for index, user in enumerate(users):
+        start = index * width
+        user_uniqueness[user] = sum(consensus_errors[start:start + counted_width])
+        count = histogram.row_length(index) if index in short_rows else width
+        if count > 0:
+            user_alignment[user] = sum(consensus_errors[start:start + width]) / count
+    
+    if user_uniqueness:
+        # Handle ties for most unique - ONLY ONE PERSON
+        max_uniqueness = max(user_uniqueness.values())
+        most_unique_users = [user for user, unique in user_uniqueness.items() if unique == max_uniqueness]
+        if len(most_unique_users) > 1:
+            stats['most_unique'] = random.choice(most_unique_users)
+        else:
+            stats['most_unique'] = most_unique_users[0]
+    
+    # Calculate the average position for each team
+    team_avg_pos = {}
+    for team, counts in team_counts.items():
+        if position_count(counts):
+            team_avg_pos[team] = mean_position(counts)
+    
+    # Calculate the difference between consensus ranking and average predicted ranking
+    dark_horse_potential = {}
+    for i, team in enumerate(sorted_standings.keys()):
+        consensus_pos = i + 1  # Position in consensus ranking (1-based)
+        if team in team_avg_pos:
+            # Positive means team is ranked better in consensus than average predictions
+            # Negative means team is predicted better than consensus (dark horse)
+            dark_horse_potential[team] = consensus_pos - team_avg_pos[team]
+    
+    # Find the biggest dark horse (most negative value)
+    if dark_horse_potential:
+        biggest_dark_horse_value = min(dark_horse_potential.values())  # Most negative value
+        biggest_dark_horses = [team for team, val in dark_horse_potential.items() if val == biggest_dark_horse_value]
+        if biggest_dark_horses:
+            if len(biggest_dark_horses) > 1:
+                stats['biggest_dark_horse'] = random.choice(biggest_dark_horses)
+            else:
+                stats['biggest_dark_horse'] = biggest_dark_horses[0]
+            stats['dark_horse_value'] = round(abs(biggest_dark_horse_value), 1)  # Show as positive positions
+    
+    # 2. The "Underrated" Team (most commonly placed worse than consensus)
+    if dark_horse_potential:
+        most_underrated_value = max(dark_horse_potential.values())  # Most positive value
+        most_underrated_teams = [team for team, val in dark_horse_potential.items() if val == most_underrated_value]
+        if most_underrated_teams:
+            if len(most_underrated_teams) > 1:
+                stats['most_underrated'] = random.choice(most_underrated_teams)
+            else:
+                stats['most_underrated'] = most_underrated_teams[0]
+            stats['underrated_value'] = round(most_underrated_value, 1)
+    
+    # 3. "The Prophet" - lowest average difference from the consensus
+    if user_alignment:
+        # Lowest difference = closest to consensus
+        min_difference = min(user_alignment.values())
+        closest_users = [user for user, diff in user_alignment.items() if diff == min_difference]
+        if closest_users:
+            if len(closest_users) > 1:
+                stats['prophet'] = random.choice(closest_users)
+            else:
+                stats['prophet'] = closest_users[0]
+            stats['prophet_score'] = round(min_difference, 1)
+    
+    return stats
@@ -0,0 +1,303 @@
+"""
+Leaderboard, consensus and per-participant JSON over a small asyncio HTTP server.
+
+The pool is scored once per distinct standings payload, not once per
+request: a background task revalidates the standings every --interval
+seconds and, only when the payload hash changes, moves an
+IncrementalLeaderboard to the new standings (rescoring just the
+participants who predicted a team that moved) and swaps in a new snapshot
+of ready-made JSON documents. Requests just pick a document from the
+current snapshot; each carries a strong ETag (answered with 304 on If-None-Match)
+and a precompressed gzip body, so match-day polling costs a dict lookup and
+a socket write per viewer.
+
+Endpoints:
+    /leaderboard.json                 ranks, scores and the standings they were computed from
+    /consensus.json                   the pool's consensus ranking
+    /participants/<name>.json         one participant's score breakdown and predictions
+
+Usage: python -m modules.leaderboard_service [--host 127.0.0.1] [--port 8080] [--bets bets] [--interval 60]
+"""
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+from datetime import datetime
+from urllib.parse import unquote, urlsplit
+
+from modules.allsvenskan_scraper import get_allsvenskan_standings, get_leaderboard
+from modules.bets_parser import load_bets
+from modules.build_manifest import hash_payload
+from modules.fun_stats import consensus_ranking
+from modules.scoring import IncrementalLeaderboard
+from modules.standings_client import STANDINGS_URL, StandingsClient, cache_path_for
+from modules.team_registry import load_team_registry
+
+# Bodies smaller than this go out uncompressed; gzip wouldn't save a packet
+MIN_GZIP_SIZE = 512
+
+# Seconds an idle keep-alive connection is kept open
+KEEPALIVE_TIMEOUT = 15
+
+STATUS_TEXT = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+               405: "Method Not Allowed", 503: "Service Unavailable"}
+
+
+class Document:
+    """A JSON response prepared once: body, gzip body and their ETags"""
+
+    def __init__(self, data):
+        self.body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf8')
+        digest = hashlib.sha256(self.body).hexdigest()[:20]
+        self.etag = f'"{digest}"'
+        self.gzip_body = gzip.compress(self.body, mtime=0) if len(self.body) >= MIN_GZIP_SIZE else None
+        self.gzip_etag = f'"{digest}-gzip"'
+
+
+def prediction_detail(prediction):
+    """score_bets' (team, {'predicted', 'actual', 'error'}) as one JSON object"""
+    if not prediction:
+        return None
+    team, details = prediction
+    return {'team': team, **details}
+
+
+class Snapshot:
+    """
+    The documents for one standings payload
+
+    The leaderboard is built up front; participant documents are built on
+    first request and kept for the snapshot's lifetime.
+    """
+
+    def __init__(self, scores, standings, bets, updated_at, leaderboard=None):
+        self.scores = scores
+        self.bets = bets
+        self.ranks = {}
+        rows = []
+        for index, (user, score_data) in enumerate(leaderboard or get_leaderboard(scores)):
+            self.ranks[user] = index + 1
+            rows.append({'rank': index + 1, 'user': user, 'score': score_data['score'],
+                         'percent': score_data['percent'], 'raw_error': score_data['raw_error']})
+        self.updated_at = updated_at
+        self.leaderboard = Document({'updated_at': updated_at, 'standings': standings, 'leaderboard': rows})
+        self.participants = {}
+
+    def participant(self, user):
+        document = self.participants.get(user)
+        if document is None and user in self.scores:
+            score_data = self.scores[user]
+            document = Document({
+                'user': user,
+                'rank': self.ranks[user],
+                'score': score_data['score'],
+                'max_possible': score_data['max_possible'],
+                'percent': score_data['percent'],
+                'raw_error': score_data['raw_error'],
+                'best_prediction': prediction_detail(score_data.get('best_prediction')),
+                'worst_prediction': prediction_detail(score_data.get('worst_prediction')),
+                'predictions': self.bets.get(user, []),
+                'updated_at': self.updated_at
+            })
+            self.participants[user] = document
+        return document
+
+
+class LeaderboardCache:
+    """
+    Scored snapshots of one pool, recomputed only for a new standings payload
+
+    update() is blocking (run it in a thread); readers take self.snapshot
+    once per request, and it is replaced in a single assignment, so a
+    request never sees half of an update.
+    """
+
+    def __init__(self, matrix):
+        self.matrix = matrix
+        self.leaderboard = IncrementalLeaderboard(matrix)
+        self.bets = matrix.to_dict()
+        consensus = consensus_ranking(self.bets)
+        self.consensus = Document({'consensus': [{'position': pos, 'team': team, 'value': value}
+                                                 for pos, (team, value) in enumerate(consensus.items(), 1)]})
+        self.payload_digest = None
+        self.snapshot = None
+        self.computations = 0
+
+    def update(self, payload):
+        """Rescore for payload unless it is the one already scored; True if it was new"""
+        digest = hash_payload(payload)
+        if digest == self.payload_digest:
+            return False
+        standings = get_allsvenskan_standings(payload)
+        registry = load_team_registry(payload)
+        updated_at = datetime.now().isoformat(timespec='seconds')
+        if standings:
+            # A new team set falls back to scoring everyone; otherwise only moved teams' predictors
+            self.leaderboard.apply_standings(standings, registry)
+            self.snapshot = Snapshot(self.leaderboard.scores(), standings, self.bets, updated_at,
+                                     self.leaderboard.leaderboard())
+        else:
+            self.snapshot = Snapshot({}, standings, self.bets, updated_at)
+        self.payload_digest = digest
+        self.computations += 1
+        return True
+
+    def document(self, path):
+        """The Document for a request path, or None"""
+        if path == '/consensus.json':
+            return self.consensus
+        snapshot = self.snapshot
+        if snapshot is None:
+            return None
+        if path == '/leaderboard.json':
+            return snapshot.leaderboard
+        if path.startswith('/participants/') and path.endswith('.json'):
+            return snapshot.participant(unquote(path[len('/participants/'):-len('.json')]))
+        return None
+
+
+def accepts_gzip(accept_encoding):
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        if coding.strip().lower() in ('gzip', '*'):
+            return params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000')
+    return False
+
+
+def etag_matches(if_none_match, etags):
+    if if_none_match.strip() == '*':
+        return True
+    tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+    return not tags.isdisjoint(etags)
+
+
+class LeaderboardService:
+    """
+    The HTTP side: routes requests to the cache and keeps the standings fresh
+
+    The standings are fetched and scored in worker threads, so a rescore
+    never blocks requests that are being answered from the previous snapshot.
+    """
+
+    def __init__(self, cache, client, interval=60):
+        self.cache = cache
+        self.client = client
+        self.interval = interval
+        self.requests = 0
+
+    async def refresh(self):
+        payload = await asyncio.to_thread(self.client.fetch, True)
+        if await asyncio.to_thread(self.cache.update, payload):
+            print(f"✓ Rescored {len(self.cache.snapshot.scores)} participants for new standings")
+
+    async def poll_standings(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"! Could not refresh the standings, serving the last ones: {e}")
+
+    def respond(self, method, target, headers):
+        """(status, headers, body) for one request"""
+        if method not in ('GET', 'HEAD'):
+            return 405, {'Allow': 'GET, HEAD'}, b""
+        path = urlsplit(target).path
+        document = self.cache.document(path)
+        if document is None:
+            if self.cache.snapshot is None and path != '/consensus.json':
+                return 503, {'Retry-After': '5'}, b'{"error":"standings not loaded yet"}'
+            return 404, {}, b'{"error":"not found"}'
+
+        use_gzip = document.gzip_body is not None and accepts_gzip(headers.get('accept-encoding', ''))
+        etag = document.gzip_etag if use_gzip else document.etag
+        response_headers = {'ETag': etag, 'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'}
+        if etag_matches(headers.get('if-none-match', ''), {document.etag, document.gzip_etag}):
+            return 304, response_headers, b""
+        if use_gzip:
+            response_headers['Content-Encoding'] = 'gzip'
+            return 200, response_headers, document.gzip_body
+        return 200, response_headers, document.body
+
+    async def handle(self, reader, writer):
+        """One connection: HTTP/1.1 requests with keep-alive until the client is done"""
+        try:
+            while True:
+                request_line = await asyncio.wait_for(reader.readline(), KEEPALIVE_TIMEOUT)
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await asyncio.wait_for(reader.readline(), KEEPALIVE_TIMEOUT)
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                parts = request_line.decode('latin-1').split()
+                if len(parts) != 3:
+                    status, response_headers, body = 400, {}, b'{"error":"bad request"}'
+                    method, version = 'GET', 'HTTP/1.0'
+                else:
+                    method, target, version = parts
+                    status, response_headers, body = self.respond(method, target, headers)
+                self.requests += 1
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = (connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive')
+                # A request body we don't read would be taken for the next request
+                keep_alive = keep_alive and method in ('GET', 'HEAD') and 'content-length' not in headers
+
+                head = [f"HTTP/1.1 {status} {STATUS_TEXT[status]}",
+                        "Content-Type: application/json; charset=utf-8",
+                        f"Content-Length: {len(body)}",
+                        "Access-Control-Allow-Origin: *",
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+                head += [f"{name}: {value}" for name, value in response_headers.items()]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1'))
+                if method != 'HEAD':
+                    writer.write(body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8080):
+        await self.refresh()
+        server = await asyncio.start_server(self.handle, host, port)
+        poller = asyncio.create_task(self.poll_standings())
+        address = server.sockets[0].getsockname()
+        print(f"✓ Serving the leaderboard at http://{address[0]}:{address[1]}/leaderboard.json")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            poller.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the pool leaderboard as cached JSON.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--bets', default='bets', help="Bets file to score")
+    parser.add_argument('--url', default=STANDINGS_URL, help="Standings endpoint (e.g. a local stand-in server)")
+    parser.add_argument('--interval', type=float, default=60, help="Seconds between standings polls")
+    args = parser.parse_args()
+
+    cache = LeaderboardCache(load_bets(args.bets))
+    client = StandingsClient(url=args.url, cache_path=cache_path_for(args.url))
+    service = LeaderboardService(cache, client, args.interval)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("✓ Stopped")
+    finally:
+        client.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+"""
+Team logos served from the page itself instead of hotlinked from the API's CDN.
+
+With logos='inline' or 'sprite' every logo URL the registry knows is
+downloaded once, a few at a time over one pooled session, into a
+content-addressed cache (.cache/logos/<sha256>.<ext>, plus an index from
+URL to file), so later builds read it from disk without touching the
+network. Raster logos are shrunk to LOGO_SIZE pixels when the optional
+Pillow package is installed and kept as downloaded otherwise.
+
+'inline' puts each logo in the tables as a data: URI. 'sprite' packs them
+all into one SVG sheet written to assets/, with a <view> per logo so the
+existing <img> tags just point at sheet.svg#logo-N and the browser fetches
+a single cacheable file. A logo that can't be downloaded keeps its remote URL.
+"""
+import base64
+import hashlib
+import io
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from html import escape
+
+from modules.assets import ASSETS_DIR, fingerprint
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+LOGO_MODES = ('remote', 'inline', 'sprite')
+LOGO_CACHE_DIR = os.path.join(".cache", "logos")
+
+# Pixels per side: twice the 24px the page shows them at, for high-density screens
+LOGO_SIZE = 48
+
+# Downloads in flight; matches create_session's connection pool
+LOGO_WORKERS = 4
+
+IMAGE_HEADERS = {"Accept": "image/avif,image/webp,image/png,image/svg+xml,image/*;q=0.8"}
+
+EXTENSIONS = {'image/png': 'png', 'image/jpeg': 'jpg', 'image/gif': 'gif', 'image/webp': 'webp',
+              'image/svg+xml': 'svg'}
+MIME_TYPES = {extension: mime for mime, extension in EXTENSIONS.items()}
+
+
+def sniff_image_type(data, content_type=''):
+    """MIME type of image bytes, from their signature (or the SVG root); None if not an image"""
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return 'image/png'
+    if data.startswith(b"\xff\xd8\xff"):
+        return 'image/jpeg'
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return 'image/gif'
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return 'image/webp'
+    head = data[:1024].lstrip().lower()
+    if b"<svg" in head and (head.startswith(b"<svg") or head.startswith(b"<?xml") or head.startswith(b"<!--")):
+        return 'image/svg+xml'
+    # An HTML error page with a 200 is not a logo, whatever the header says
+    content_type = content_type.split(';')[0].strip().lower()
+    return None if content_type not in EXTENSIONS or head.startswith(b"<") else content_type
+
+
+def downsize(data, mime, size=LOGO_SIZE):
+    """
+    (data, mime) with a raster logo shrunk to fit size × size, as PNG
+
+    Vector logos, small ones and everything when Pillow isn't installed
+    come back unchanged, as do images Pillow can't read.
+    """
+    if Image is None or mime == 'image/svg+xml':
+        return data, mime
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            if max(image.size) <= size:
+                return data, mime
+            image = image.convert('RGBA')
+            image.thumbnail((size, size), Image.LANCZOS)
+            out = io.BytesIO()
+            image.save(out, 'PNG', optimize=True)
+    except (OSError, ValueError):
+        return data, mime
+    return out.getvalue(), 'image/png'
+
+
+def data_uri(data, mime):
+    return f"data:{mime};base64,{base64.b64encode(data).decode('ascii')}"
+
+
+class LogoCache:
+    """
+    Content-addressed on-disk store of downloaded logos
+
+    get_many() returns cached logos straight from disk and downloads the
+    rest in parallel; the HTTP session (and requests itself) is only set up
+    when something actually has to be downloaded.
+    """
+
+    def __init__(self, directory=LOGO_CACHE_DIR, size=LOGO_SIZE, workers=LOGO_WORKERS, timeout=10, session=None):
+        self.directory = directory
+        self.size = size
+        self.workers = workers
+        self.timeout = timeout
+        self.session = session
+        self._own_session = session is None
+        self.index_path = os.path.join(directory, "index.json")
+        self.index = self._load_index()
+        self.dirty = False
+        self.downloads = 0
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _save_index(self):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf8') as f:
+            json.dump(self.index, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+    def _read(self, url):
+        """(data, mime) of a cached logo, or None"""
+        entry = self.index.get(url)
+        if entry is None:
+            return None
+        try:
+            with open(os.path.join(self.directory, entry['file']), 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        mime = MIME_TYPES[entry['file'].rsplit('.', 1)[1]]
+        if Image is not None and not entry.get('downsized'):
+            # Cached before Pillow was installed: shrink it now, once
+            data, mime = self._store(url, data, mime)
+        return data, mime
+
+    def _store(self, url, data, mime):
+        data, mime = downsize(data, mime, self.size)
+        filename = f"{hashlib.sha256(data).hexdigest()}.{EXTENSIONS[mime]}"
+        path = os.path.join(self.directory, filename)
+        if not os.path.exists(path):
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path + ".tmp", 'wb') as f:
+                f.write(data)
+            os.replace(path + ".tmp", path)
+        self.index[url] = {'file': filename, 'downsized': Image is not None}
+        self.dirty = True
+        return data, mime
+
+    def _download(self, url):
+        """(data, mime) of one logo; raises on network errors and non-images"""
+        response = self.session.get(url, headers=IMAGE_HEADERS, timeout=self.timeout)
+        response.raise_for_status()
+        mime = sniff_image_type(response.content, response.headers.get('Content-Type', ''))
+        if mime is None:
+            raise ValueError("not an image")
+        return response.content, mime
+
+    def get_many(self, urls):
+        """{url: (data, mime)} for every URL that is cached or could be downloaded"""
+        logos = {}
+        missing = []
+        for url in dict.fromkeys(urls):
+            cached = self._read(url)
+            if cached is None:
+                missing.append(url)
+            else:
+                logos[url] = cached
+
+        if missing:
+            if self.session is None:
+                from modules.standings_client import create_session
+                self.session = create_session()
+            failed = 0
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(missing))) as pool:
+                futures = {url: pool.submit(self._download, url) for url in missing}
+                for url, future in futures.items():
+                    try:
+                        logos[url] = self._store(url, *future.result())
+                        self.downloads += 1
+                    except Exception as e:
+                        failed += 1
+                        print(f"! Could not download logo {url}: {e}")
+            if failed:
+                print(f"! Linking {failed} logos remotely instead")
+        if self.dirty:
+            self._save_index()
+            self.dirty = False
+        return logos
+
+    def close(self):
+        if self.session is not None and self._own_session:
+            self.session.close()
+            self.session = None
+
+
+def build_sprite(logos, size=LOGO_SIZE):
+    """
+    One SVG sheet holding every logo: (svg bytes, {digest: fragment})
+
+    logos is {digest: (data, mime)}. Each logo gets a size × size cell in a
+    single column and a <view> named by its fragment; the root viewBox is
+    the first cell, so the sheet has the square aspect ratio of a logo and
+    an <img height=24px> referencing a fragment shows exactly that logo.
+    """
+    cells = []
+    fragments = {}
+    for index, digest in enumerate(sorted(logos)):
+        data, mime = logos[digest]
+        fragment = f"logo-{index}"
+        fragments[digest] = fragment
+        y = index * size
+        cells.append(f'<view id="{fragment}" viewBox="0 {y} {size} {size}"/>'
+                     f'<image x="0" y="{y}" width="{size}" height="{size}" href="{escape(data_uri(data, mime))}"/>')
+    svg = (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {size} {size}">'
+           + "".join(cells) + "</svg>")
+    return svg.encode('utf8'), fragments
+
+
+def localize_logos(team_logos, mode, cache=None):
+    """
+    Point team_logos at local copies: ({team: src}, {asset filename: bytes})
+
+    For 'remote' nothing changes. 'inline' swaps each URL for a data: URI;
+    'sprite' for a fragment of one sprite sheet, returned as an asset to
+    write into ASSETS_DIR. Logos that can't be fetched keep their URL.
+    """
+    if mode == 'remote' or not team_logos:
+        return team_logos, {}
+    own_cache = cache is None
+    cache = cache or LogoCache()
+    try:
+        logos = cache.get_many(team_logos.values())
+    finally:
+        if own_cache:
+            cache.close()
+
+    assets = {}
+    if mode == 'inline':
+        sources = {url: data_uri(*logo) for url, logo in logos.items()}
+    elif logos:
+        digests = {url: hashlib.sha256(data).hexdigest() for url, (data, mime) in logos.items()}
+        sheet, fragments = build_sprite({digests[url]: logo for url, logo in logos.items()})
+        filename = fingerprint('logos', 'svg', sheet)
+        sources = {url: f"{ASSETS_DIR}/{filename}#{fragments[digest]}" for url, digest in digests.items()}
+        assets[filename] = sheet
+    else:
+        sources = {}
+    return {team: sources.get(url, url) for team, url in team_logos.items()}, assets
@@ -0,0 +1,154 @@
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Not on Windows; spans then carry no memory figure unless traced
+
+DEFAULT_METRICS_PATH = os.path.join(".cache", "metrics.json")
+DEFAULT_PROFILE_PATH = os.path.join(".cache", "profile.pstats")
+
+_DISABLED = nullcontext()
+
+
+def max_rss_bytes():
+    """The process's peak resident set size so far, or None where getrusage isn't available"""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+class Span:
+    """One timed stage; created by Metrics.span() and closed by its `with` block"""
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+        self.child_peak = 0
+
+    def __enter__(self):
+        metrics = self.metrics
+        if metrics.memory:
+            if metrics._stack:
+                # Remember the parent's peak so far before resetting it for this span
+                parent = metrics._stack[-1]
+                parent.child_peak = max(parent.child_peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        # Appended on entry so the list stays in start order with parents first
+        self.entry = {'name': self.name, 'depth': len(metrics._stack)}
+        metrics.spans.append(self.entry)
+        metrics._stack.append(self)
+        self.http_bytes = metrics.http_bytes
+        self.cpu = time.process_time()
+        self.wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+
+        metrics = self.metrics
+        metrics._stack.pop()
+        self.entry.update({
+            'wall_s': round(wall, 6),
+            'cpu_s': round(cpu, 6),
+            'http_bytes': metrics.http_bytes - self.http_bytes
+        })
+        if metrics.memory:
+            peak = max(tracemalloc.get_traced_memory()[1], self.child_peak)
+            if metrics._stack:
+                parent = metrics._stack[-1]
+                parent.child_peak = max(parent.child_peak, peak)
+            self.entry['peak_memory_bytes'] = peak
+        else:
+            self.entry['max_rss_bytes'] = max_rss_bytes()
+        return False
+
+
+class Metrics:
+    """
+    Named timing spans for the build stages.
+
+    Disabled by default: span() then hands out one shared no-op context
+    manager and add_http_bytes() only bumps a counter, so instrumented code
+    costs next to nothing.
+
+    Enabled spans record wall and CPU time plus the process's max RSS when
+    they end, which costs nothing to read. Per-span peak Python memory needs
+    tracemalloc, which slows allocation-heavy stages down many times over,
+    so it is only started by enable(memory=True): take timings and memory
+    peaks from separate runs.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.memory = False
+        self.spans = []
+        self.http_bytes = 0
+        self._stack = []
+        self._started = None
+
+    def enable(self, memory=False):
+        if not self.enabled:
+            self.enabled = True
+            self._started = time.perf_counter()
+        if memory and not self.memory:
+            self.memory = True
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+
+    def span(self, name):
+        if not self.enabled:
+            return _DISABLED
+        return Span(self, name)
+
+    def add_http_bytes(self, count):
+        self.http_bytes += count
+
+    def to_dict(self):
+        return {
+            'total_wall_s': round(time.perf_counter() - self._started, 6) if self._started else None,
+            # Timings taken under tracemalloc are inflated; don't compare them with untraced runs
+            'memory_traced': self.memory,
+            'http_bytes': self.http_bytes,
+            'spans': self.spans
+        }
+
+    def save(self, path=DEFAULT_METRICS_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+# Shared instance used by the pipeline
+metrics = Metrics()
+
+
+def span(name):
+    """Time a stage: `with span('render'): ...` (a no-op unless metrics are enabled)"""
+    return metrics.span(name)
+
+
+def print_summary(spans):
+    """
+    Print the recorded spans as an indented table
+
+    The memory column is the span's traced peak with memory tracing on and
+    the process's max RSS at the end of the span otherwise.
+    """
+    traced = any('peak_memory_bytes' in entry for entry in spans)
+    print(f"{'Stage':<24} {'Wall (s)':>9} {'CPU (s)':>9} {'Peak MB' if traced else 'RSS MB':>8} {'HTTP KB':>8}")
+    for entry in spans:
+        name = "  " * entry['depth'] + entry['name']
+        memory = entry.get('peak_memory_bytes', entry.get('max_rss_bytes'))
+        memory = f"{memory / 1e6:>8.1f}" if memory is not None else f"{'-':>8}"
+        print(f"{name:<24} {entry['wall_s']:>9.3f} {entry['cpu_s']:>9.3f} {memory} {entry['http_bytes'] / 1e3:>8.1f}")
@@ -0,0 +1,369 @@
+import os
+from datetime import datetime
+from html import escape
+
+from modules.position_histogram import (PositionHistogram, count_between, highest_position, lowest_position,
+                                        mean_position, median_position, position_count)
+from modules.renderer import load_template
+from modules.similarity import similarity_percent
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates")
+PAGE_TEMPLATE_PATH = os.path.join(TEMPLATES_DIR, "page.html")
+DATA_MODE_TEMPLATE_PATH = os.path.join(TEMPLATES_DIR, "data_mode.html")
+
+# (fun_stats key, card title, description template filled from fun_stats)
+FUN_STAT_CARDS = [
+    ('most_predicted_champion', "People's Champion", "Most frequently predicted to win with {champion_votes} votes"),
+    ('most_predicted_relegation', "Direct Relegation Favorite", "Most frequently predicted for direct relegation (bottom 2) with {relegation_votes} votes"),
+    ('most_predicted_playoff', "Playoff Candidate", "Most frequently predicted for relegation playoff (14th place) with {playoff_votes} votes"),
+    ('most_divisive_team', "Most Divisive Team", "Highest variance in predicted positions (variance: {divisive_variance})"),
+    ('most_agreed_team', "Most Agreed Upon Team", "Lowest variance in predicted positions (variance: {agreed_variance})"),
+    ('most_optimistic', "The Optimist", "Ranks top teams higher than others"),
+    ('most_pessimistic', "The Pessimist", "Ranks top teams lower than others"),
+    ('most_unique', "The Maverick", "Most predictions different from the consensus"),
+    ('prophet', "The Prophet", "Predictions most aligned with the group consensus"),
+]
+
+
+def position_row_class(pos, team_count):
+    """Row class for European qualification and relegation spots (pos is 0-based)"""
+    if pos == 0:  # Top position (Europa League)
+        return "europaleague"
+    elif pos == 1 or pos == 2:  # 2nd and 3rd position (Conference League)
+        return "conference-league"
+    elif pos >= team_count - 2:  # Bottom 2 positions (direct relegation)
+        return "relegation-direct"
+    elif pos == team_count - 3:  # 3rd from bottom position (playoff)
+        return "relegation-playoff"
+    return ""
+
+
+def team_id_map(bets):
+    """{team name: ID} in first-seen order, matching RankMatrix.team_ids for the same bets"""
+    team_ids = {}
+    for predictions in bets.values():
+        for team in predictions:
+            if team:
+                team_ids.setdefault(team, len(team_ids))
+    return team_ids
+
+
+def iter_fun_stat_cards(fun_stats):
+    """Yield one card per available fun statistic"""
+    for key, title, description in FUN_STAT_CARDS:
+        if key not in fun_stats:
+            continue
+        yield f'''
+                <div class="fun-stat-card">
+                    <div class="fun-stat-title">{title}</div>
+                    <div class="fun-stat-value">{escape(str(fun_stats[key]))}</div>
+                    <div class="fun-stat-description">{description.format(**fun_stats)}</div>
+                </div>
+    '''
+
+
+def iter_enhanced_standings_table(sorted_allsvenskan_tip_2025, bets, team_logos, histogram=None, team_ids=None):
+    """
+    Yield the HTML for an enhanced consensus standings table with additional statistics
+
+    The per-team statistics come from a PositionHistogram of everyone's first
+    listing of each team; pass the one shared with the fun stats to reuse it.
+    team_ids ({name: ID}, default team_id_map(bets)) tags the cells that light
+    up when the team is hovered.
+    """
+    if histogram is None:
+        histogram = PositionHistogram.from_bets(bets)
+    if team_ids is None:
+        team_ids = team_id_map(bets)
+    team_count = len(sorted_allsvenskan_tip_2025)
+
+    # Calculate additional statistics for each team
+    team_stats = {}
+    
+    for consensus_pos, team in enumerate(sorted_allsvenskan_tip_2025.keys(), 1):
+        counts = histogram.team_counts(team, first_only=True)
+        predictions_count = position_count(counts)
+        
+        # Calculate statistics if we have positions
+        if predictions_count:
+            # Calculate how many users predicted this team for each position group
+            top3 = count_between(counts, 1, 3)
+            europa = count_between(counts, 1, 1)
+            conference = count_between(counts, 2, 3)
+            relegation = count_between(counts, team_count - 2, len(counts))
+            
+            team_stats[team] = {
+                'consensus_pos': consensus_pos,
+                'avg_pos': mean_position(counts),
+                'highest_pos': highest_position(counts),  # Lowest number = highest position
+                'lowest_pos': lowest_position(counts),    # Highest number = lowest position
+                'median_pos': median_position(counts),
+                'top3_pct': (top3 / predictions_count) * 100,
+                'europa_pct': (europa / predictions_count) * 100,
+                'conference_pct': (conference / predictions_count) * 100,
+                'relegation_pct': (relegation / predictions_count) * 100,
+                'predictions_count': predictions_count,
+                'value': sorted_allsvenskan_tip_2025[team]
+            }
+    
+    # Start generating the HTML
+    yield '''
+    <section class="section">
+        <h2 class="section-title"><span class="icon">📊</span> Consensus Rankings & Team Statistics</h2>
+        
+        <div class="legend">
+            <div class="legend-item">
+                <div class="legend-color legend-europaleague"></div>
+                <span>Europa League (1st Place)</span>
+            </div>
+            <div class="legend-item">
+                <div class="legend-color legend-conference"></div>
+                <span>Conference League (2nd-3rd Place)</span>
+            </div>
+            <div class="legend-item">
+                <div class="legend-color legend-direct"></div>
+                <span>Direct Relegation (Bottom 2)</span>
+            </div>
+            <div class="legend-item">
+                <div class="legend-color legend-playoff"></div>
+                <span>Relegation Playoff (14th Place)</span>
+            </div>
+        </div>
+        
+        <div class="table-wrapper">
+            <table id="standings-table">
+                <thead>
+                    <tr>
+                        <th>#</th>
+                        <th>Team</th>
+                        <th>Avg. Position</th>
+                        <th>Highest Rank</th>
+                        <th>Lowest Rank</th>
+                        <th>Top 3</th>
+                        <th>Relegation</th>
+                    </tr>
+                </thead>
+                <tbody>
+    '''
+    
+    for pos, (team, value) in enumerate(sorted_allsvenskan_tip_2025.items()):
+        if team not in team_stats:
+            continue
+            
+        stats = team_stats[team]
+        
+        # Add classes for relegation and European qualification
+        row_class = position_row_class(pos, team_count)
+        
+        # Get team logo if available
+        logo_url = team_logos.get(team, '')
+        logo_html = f'<img src="{logo_url}" alt="{team} logo" class="team-logo" onerror="this.style.display=\'none\'">' if logo_url else ''
+        
+        # Format the stats
+        avg_pos = f"{stats['avg_pos']:.1f}"
+        top3_pct = f"{stats['top3_pct']:.0f}%"
+        relegation_pct = f"{stats['relegation_pct']:.0f}%"
+        
+        # Generate a mini bar chart for top3 percentage
+        top3_bar = f'''
+            <div class="mini-bar-container">
+                <div class="mini-bar top3-bar" style="width: {stats['top3_pct']}%"></div>
+                <span class="mini-bar-text">{top3_pct}</span>
+            </div>
+        '''
+        
+        # Generate a mini bar chart for relegation percentage
+        relegation_bar = f'''
+            <div class="mini-bar-container">
+                <div class="mini-bar relegation-bar" style="width: {stats['relegation_pct']}%"></div>
+                <span class="mini-bar-text">{relegation_pct}</span>
+            </div>
+        '''
+        
+        team_id = team_ids[team]
+        yield f'''
+            <tr class="{row_class}">
+                <td data-team="{team_id}">{pos+1}</td>
+                <td data-team="{team_id}">
+                    <div class="team-name-with-logo">
+                        {logo_html}
+                        <span>{escape(team)}</span>
+                    </div>
+                </td>
+                <td data-team="{team_id}">{avg_pos}</td>
+                <td>{stats['highest_pos']}</td>
+                <td>{stats['lowest_pos']}</td>
+                <td>{top3_bar}</td>
+                <td>{relegation_bar}</td>
+            </tr>
+        '''
+    
+    yield '''
+                </tbody>
+            </table>
+        </div>
+    </section>
+    '''
+
+
+def generate_enhanced_standings_table(sorted_allsvenskan_tip_2025, bets, team_logos, histogram=None, team_ids=None):
+    """
+    Generate HTML for an enhanced consensus standings table with additional statistics
+    """
+    return ''.join(iter_enhanced_standings_table(sorted_allsvenskan_tip_2025, bets, team_logos, histogram, team_ids))
+
+
+def format_cluster_members(members, limit=8):
+    shown = ', '.join(escape(user) for user in members[:limit])
+    if len(members) > limit:
+        shown += f" and {len(members) - limit} more"
+    return shown
+
+
+def iter_similarity_section(similarity):
+    """
+    Yield the "who predicted like whom" section from similarity.analyze_pool()
+
+    One card per cluster (its typical top three and bottom two), then each
+    participant's closest matches when the pool is small enough to have them.
+    """
+    if not similarity or not similarity['clusters']:
+        return
+    maximum = similarity['max_distance']
+    unsettled = "" if similarity.get('clusters_converged', True) else (
+        " The groups are approximate: they were still shifting when grouping stopped.")
+    yield f"""
+    <section class="section" id="similarity-section">
+        <h2 class="section-title"><span class="icon">🧬</span> Prediction Twins</h2>
+        <p class="section-description">Participants grouped by how alike their rankings are (total position difference per team).{unsettled}</p>
+
+        <div class="fun-stats-grid">
+    """
+    for number, cluster in enumerate(similarity['clusters'], 1):
+        ranking = cluster['ranking']
+        yield f'''
+                <div class="fun-stat-card">
+                    <div class="fun-stat-title">Group {number} · {len(cluster['members'])} participant{'s' if len(cluster['members']) != 1 else ''}</div>
+                    <div class="fun-stat-value">{escape(', '.join(ranking[:3]))}</div>
+                    <div class="fun-stat-description">Bottom two: {escape(', '.join(ranking[-2:]))}<br>{format_cluster_members(cluster['members'])}</div>
+                </div>
+    '''
+    yield """
+        </div>
+    """
+
+    if similarity['neighbours'] is not None:
+        yield """
+        <div class="table-wrapper">
+            <table id="similarity-table">
+                <thead>
+                    <tr>
+                        <th>Participant</th>
+                        <th>Group</th>
+                        <th>Most Alike</th>
+                    </tr>
+                </thead>
+                <tbody>
+    """
+        for user, found in similarity['neighbours'].items():
+            alike = ', '.join(f"{escape(other)} ({similarity_percent(distance, maximum)}%)" for other, distance in found)
+            yield f"""
+                <tr>
+                    <td>{escape(user)}</td>
+                    <td>{similarity['cluster_of'][user]}</td>
+                    <td>{alike}</td>
+                </tr>"""
+        yield """
+                </tbody>
+            </table>
+        </div>
+    """
+    yield """
+    </section>
+    """
+
+
+def iter_prediction_headers(users):
+    for user in users:
+        yield f'                            <th>{escape(user)}</th>\n'
+
+
+def iter_prediction_rows(bets, max_bets, team_ids):
+    """Yield the individual predictions table body, one row per position"""
+    users = list(bets.keys())
+    # Every team's cell is the same string wherever it appears, so build each once
+    team_cells = {team: f'                            <td data-team="{team_id}">{escape(team)}</td>\n'
+                  for team, team_id in team_ids.items()}
+    for i in range(max_bets):
+        # Highlight European qualification and relegation positions in the position column
+        cells = [f'                        <tr class="{position_row_class(i, max_bets)}">\n',
+                 f'                            <td>{i+1}</td>\n']
+        for user in users:
+            bet = bets[user][i] if i < len(bets[user]) else ""
+            cells.append(team_cells.get(bet) or f'                            <td>{escape(bet)}</td>\n')
+        cells.append('                        </tr>\n')
+        yield ''.join(cells)
+
+
+def page_context(bets, sorted_consensus, fun_stats, live_standings_html, consensus_table,
+                 pool_title="Grabbarnas Allsvenskan 2025", season_title="Allsvenskan 2025", similarity=None,
+                 team_ids=None):
+    """
+    Collect the slot values for templates/page.html
+
+    Table sections are generators, so they are only produced while the page
+    is being streamed out. team_ids ({name: ID}, default team_id_map(bets))
+    tags the prediction cells for the hover highlighting.
+    """
+    if team_ids is None:
+        team_ids = team_id_map(bets)
+    max_bets = max((len(predictions) for predictions in bets.values()), default=0)
+    return {
+        'pool_title': escape(pool_title),
+        'season_title': escape(season_title),
+        'participant_count': str(len(bets)),
+        'team_count': str(len(sorted_consensus)),
+        'current_favorite': str(next(iter(sorted_consensus))),
+        'fun_stats': iter_fun_stat_cards(fun_stats),
+        'live_standings': live_standings_html,
+        'consensus_table': consensus_table,
+        'similarity': iter_similarity_section(similarity),
+        'prediction_headers': iter_prediction_headers(bets.keys()),
+        'prediction_rows': iter_prediction_rows(bets, max_bets, team_ids),
+        'updated_at': datetime.now().strftime("%B %d, %Y at %H:%M"),
+        'data_script': ""
+    }
+
+
+def lazy_section_placeholder(url):
+    return f"""
+    <section class="section lazy-section" data-src="{escape(url)}">
+        <p class="section-description">Loading…</p>
+    </section>
+"""
+
+
+def data_mode_context(context, width, data_url, section_urls):
+    """
+    Switch a page_context() to data mode
+
+    The predictions table keeps only its header (a participant column and one
+    per position) and is filled from data_url by the page script; every slot
+    in section_urls ({slot: url}) becomes a placeholder fetched on scroll.
+    Returns (context, {slot: original value}) so the caller can write the
+    sections out as their own files.
+    """
+    context = dict(context)
+    sections = {slot: context[slot] for slot in section_urls}
+    for slot, url in section_urls.items():
+        context[slot] = lazy_section_placeholder(url)
+    context['prediction_headers'] = ''.join(f'                            <th>{label}</th>\n'
+                                            for label in ["Participant"] + list(range(1, width + 1)))
+    context['prediction_rows'] = ""
+    context['data_script'] = load_template(DATA_MODE_TEMPLATE_PATH).render({'data_url': escape(data_url)})
+    return context, sections
+
+
+def iter_page(context, template_path=PAGE_TEMPLATE_PATH):
+    """Yield the full index.html as a stream of chunks"""
+    return load_template(template_path).iter_chunks(context)
@@ -0,0 +1,41 @@
+"""
+Data-file output mode for the page.
+
+Instead of embedding every participant's ranking in index.html, the build
+writes a compact data.json (the RankMatrix bytes as base64 plus the team and
+participant names) that the page script decodes into a virtualized
+predictions table, and moves the sections that grow with the pool into
+separate HTML fragments fetched when they scroll into view. The first paint
+is then the same size however many people take part. The page has to be
+served over HTTP for the fetches to work.
+"""
+import base64
+import json
+
+from modules.rank_matrix import MISSING
+
+OUTPUT_MODES = ('static', 'data')
+DATA_FILENAME = "data.json"
+SECTIONS_DIR = "sections"
+
+# Page slots that list every participant, loaded lazily in data mode
+LAZY_SECTIONS = ('live_standings', 'similarity')
+
+
+def page_data(matrix):
+    """The predictions as a JSON-ready dict: width, missing marker, teams, users and the base64 matrix"""
+    return {
+        'width': matrix.width,
+        'missing': MISSING,
+        'teams': matrix.team_names,
+        'users': matrix.users,
+        'matrix': base64.b64encode(bytes(matrix.data)).decode('ascii')
+    }
+
+
+def dump_page_data(matrix):
+    return json.dumps(page_data(matrix), ensure_ascii=False, separators=(',', ':'))
+
+
+def section_filename(slot):
+    return f"{SECTIONS_DIR}/{slot}.html"
@@ -0,0 +1,403 @@
+import os
+
+from modules.allsvenskan_scraper import get_allsvenskan_standings, generate_live_standings_html, get_full_data
+from modules.assets import (ASSET_MODES, ASSETS_DIR, compressed_variants, externalize, load_hashed_template, precompress,
+                            write_assets)
+from modules.bets_parser import load_bets
+from modules.build_manifest import MANIFEST_PATH, collect_build_inputs, is_up_to_date, save_manifest, write_if_changed
+from modules.elimination import best_case_scores
+from modules.fun_stats import calculate_fun_stats, consensus_ranking
+from modules.logo_cache import LOGO_MODES, localize_logos
+from modules.metrics import span
+from modules.page import PAGE_TEMPLATE_PATH, data_mode_context, iter_enhanced_standings_table, iter_page, page_context
+from modules.page_data import (DATA_FILENAME, LAZY_SECTIONS, OUTPUT_MODES, SECTIONS_DIR, dump_page_data,
+                               section_filename)
+from modules.position_histogram import PositionHistogram
+from modules.readme import generate_readme
+from modules.renderer import write_chunks
+from modules.scoring_metrics import get_metrics
+from modules.similarity import analyze_pool
+from modules.simulator import simulate_pool
+from modules.snapshot_store import DEFAULT_HISTORY_PATH, record_standings_snapshot
+from modules.standings_client import STANDINGS_URL, standings_url
+from modules.team_registry import load_team_registry, save_team_registry
+
+SIMULATIONS = 200000
+
+
+def pool_config(**overrides):
+    """
+    Fill in a pool config (one league/season/bets file) with the defaults
+
+    Keys: name, league, season, title, bets, url, output_dir, simulate,
+    scoring_metrics (extra leaderboard columns, see modules.scoring_metrics),
+    similarity_workers (processes for the prediction twins, see
+    modules.similarity), output_mode ('static', or 'data' for a page
+    that loads its predictions from data.json, see modules.page_data) and
+    assets ('inline', or 'hashed' for fingerprinted CSS/JS files and
+    precompressed outputs, see modules.assets) and logos ('remote', or
+    'inline'/'sprite' to serve locally cached copies, see modules.logo_cache).
+    With no overrides this is the original Allsvenskan 2025 pool writing
+    index.html and README.md to the current directory.
+    """
+    config = {
+        'league': 'Allsvenskan',
+        'season': 2025,
+        'bets': 'bets',
+        'output_dir': '.',
+        'simulate': False,
+        'scoring_metrics': [],
+        'similarity_workers': 1,
+        'output_mode': 'static',
+        'assets': 'inline',
+        'logos': 'remote'
+    }
+    config.update(overrides)
+    config.setdefault('name', f"{config['league']}-{config['season']}".lower())
+    config.setdefault('title', f"Grabbarnas {config['league']} {config['season']}")
+    if not config.get('url'):
+        config['url'] = standings_url(config['league'], config['season'])
+    return config
+
+
+def pool_path(config, filename):
+    """Path of one of a pool's output or state files, relative to its output_dir"""
+    return os.path.normpath(os.path.join(config['output_dir'], filename))
+
+
+def output_paths(config):
+    paths = [pool_path(config, "index.html"), pool_path(config, "README.md")]
+    if config['output_mode'] == 'data':
+        paths.append(pool_path(config, DATA_FILENAME))
+        paths += [pool_path(config, section_filename(slot)) for slot in LAZY_SECTIONS]
+    if config['assets'] == 'hashed':
+        # README.md is read on the repository page, not served
+        paths += [variant for path in paths if path != paths[1] for variant in compressed_variants(path)]
+    return paths
+
+
+def enhanced_get_team_logos(team_registry, prediction_teams):
+    """
+    Get team logos by resolving each prediction team through the team registry
+
+    Args:
+        team_registry: TeamRegistry built from the API data and manual mapping
+        prediction_teams: List of team names from predictions
+
+    Returns:
+        Dictionary mapping prediction team names to logo URLs
+    """
+    team_logos = {}
+
+    for team in prediction_teams:
+        logo_url = team_registry.logo_url(team)
+        if logo_url:
+            team_logos[team] = logo_url
+        else:
+            print(f"! Could not find logo for team '{team}'")
+
+    return team_logos
+
+
+def validate_config(config):
+    """Raise ValueError for settings build_pool can't honour, before any work is done"""
+    get_metrics(config['scoring_metrics'])  # Fail early on a misspelled metric
+    if config['output_mode'] not in OUTPUT_MODES:
+        raise ValueError(f"Unknown output mode '{config['output_mode']}' (available: {', '.join(OUTPUT_MODES)})")
+    if config['assets'] not in ASSET_MODES:
+        raise ValueError(f"Unknown assets mode '{config['assets']}' (available: {', '.join(ASSET_MODES)})")
+    if config['logos'] not in LOGO_MODES:
+        raise ValueError(f"Unknown logos mode '{config['logos']}' (available: {', '.join(LOGO_MODES)})")
+
+
+def build_options(config):
+    """The config keys that change the output, for the build manifest"""
+    return {
+        'simulate': config['simulate'], 'title': config['title'], 'league': config['league'],
+        'season': config['season'], 'scoring_metrics': config['scoring_metrics'],
+        'output_mode': config['output_mode'], 'assets': config['assets'], 'logos': config['logos']
+    }
+
+
+def analyze_bets(config):
+    """
+    Everything that depends on the bets file alone
+
+    Returns {'bets_matrix', 'bets', 'sorted_consensus', 'histogram', 'readme',
+    'fun_stats', 'similarity'}; a long-running process can keep this until
+    the bets file changes.
+    """
+    print("Loading bets and calculating consensus rankings...")
+    with span('bets_load'):
+        bets_matrix = load_bets(config['bets'])
+        bets = bets_matrix.to_dict()
+    with span('consensus'):
+        sorted_consensus = consensus_ranking(bets)
+    # One team × position count matrix shared by every statistic
+    with span('histogram'):
+        histogram = PositionHistogram(bets_matrix)
+
+    # Outputs are buffered and only written at the very end
+    with span('readme'):
+        readme = generate_readme(bets, sorted_consensus, config['title'])
+
+    max_bets = max([len(bets[user]) for user in bets.keys()])
+    if max_bets != 16:
+        print(f"!!! Warning: Too many teams ({max_bets}) in table, someone spelled it wrong!!!")
+
+    # Calculate fun stats
+    print("Calculating fun statistics...")
+    with span('fun_stats'):
+        fun_stats = calculate_fun_stats(bets, sorted_consensus, histogram)
+
+    # Who predicted like whom: nearest neighbours and clusters of the pool
+    with span('similarity'):
+        similarity = analyze_pool(bets_matrix, workers=config['similarity_workers'])
+
+    return {
+        'bets_matrix': bets_matrix, 'bets': bets, 'sorted_consensus': sorted_consensus, 'histogram': histogram,
+        'readme': readme, 'fun_stats': fun_stats, 'similarity': similarity
+    }
+
+
+def match_logos(analysis, team_registry, mode='remote'):
+    """
+    Logos for the consensus teams: ({prediction team: image src}, logo assets)
+
+    With mode 'remote' the sources are the API's logo URLs; otherwise they
+    point at local copies (see localize_logos), and the assets are the
+    files, if any, that have to be written next to the page for them.
+    """
+    print("Getting team logos from API data...")
+    with span('logo_matching'):
+        team_logos = enhanced_get_team_logos(team_registry, analysis['sorted_consensus'].keys())
+
+    if team_logos:
+        print(f"✓ Successfully extracted logos for {len(team_logos)} teams")
+    else:
+        print("! Could not extract team logos")
+
+    logo_assets = {}
+    if mode != 'remote' and team_logos:
+        with span('logo_cache'):
+            team_logos, logo_assets = localize_logos(team_logos, mode)
+    return team_logos, logo_assets
+
+
+def score_standings(config, analysis, standings_payload, team_registry, leaderboard=None):
+    """
+    Everything that depends on the current standings
+
+    Returns {'current_standings', 'live_standings_html'}; the HTML is "" when
+    there are no standings or no matches have been played. leaderboard is
+    an IncrementalLeaderboard kept between calls (watch mode): it is moved
+    to the new standings instead of scoring every participant again.
+    """
+    bets_matrix = analysis['bets_matrix']
+
+    # Try to fetch current standings
+    print(f"Fetching current {config['league']} standings...")
+    try:
+        # Fetch current standings
+        with span('standings_parse'):
+            current_standings = get_allsvenskan_standings(standings_payload)
+
+        if not current_standings:
+            print("! Could not fetch current standings from API - using fallback data")
+
+        if current_standings:
+            print(f"✓ Successfully fetched current standings with {len(current_standings)} teams")
+        else:
+            print("! Could not fetch any standings data - check your implementation")
+    except Exception as e:
+        print(f"! Error importing or using API module: {e}")
+        current_standings = []
+
+    # Optionally simulate the rest of the season for pool win probabilities
+    pool_outlook = None
+    if current_standings and config['simulate']:
+        print(f"Simulating the rest of the season {SIMULATIONS} times...")
+        try:
+            with span('simulation'):
+                pool_outlook = simulate_pool(bets_matrix, get_allsvenskan_standings.full_data, team_registry,
+                                             simulations=SIMULATIONS)
+            print(f"✓ Simulated pool outcomes for {len(pool_outlook)} participants")
+        except Exception as e:
+            print(f"! Error simulating the season: {e}")
+
+    # Best scores still reachable and who can no longer win the pool
+    best_case = None
+    if current_standings:
+        try:
+            with span('best_case'):
+                best_case = best_case_scores(bets_matrix, current_standings, get_allsvenskan_standings.full_data,
+                                             team_registry)
+        except Exception as e:
+            print(f"! Error computing best achievable scores: {e}")
+
+    # Generate HTML for live standings section
+    live_standings_html = ""
+    if current_standings:
+        try:
+            with span('live_scoring'):
+                if leaderboard is not None:
+                    leaderboard.apply_standings(current_standings, team_registry)
+                live_standings_html = generate_live_standings_html(current_standings, bets_matrix, team_registry,
+                                                                   pool_outlook, config['scoring_metrics'], best_case,
+                                                                   leaderboard)
+            print("✓ Generated live standings and leaderboard HTML")
+        except Exception as e:
+            print(f"! Error generating live standings HTML: {e}")
+
+    return {'current_standings': current_standings, 'live_standings_html': live_standings_html}
+
+
+def remove_stale_outputs(config, outputs):
+    """
+    Delete the served files an earlier build wrote that this build doesn't
+
+    Switching back from assets='hashed' or output_mode='data' would otherwise
+    leave index.html.gz (and .br) behind, still holding the old page for any
+    host that serves precompressed files, along with data.json and sections/.
+    Returns the paths removed.
+    """
+    served = [pool_path(config, "index.html"), pool_path(config, DATA_FILENAME)]
+    served += [pool_path(config, section_filename(slot)) for slot in LAZY_SECTIONS]
+    candidates = served + [path + extension for path in served for extension in (".gz", ".br")]
+    current = set(outputs)
+    removed = [path for path in candidates if path not in current and os.path.isfile(path)]
+    for path in removed:
+        os.remove(path)
+    sections_dir = pool_path(config, SECTIONS_DIR)
+    if os.path.isdir(sections_dir) and not os.listdir(sections_dir):
+        os.rmdir(sections_dir)
+    return removed
+
+
+def write_pool(config, analysis, team_logos, scored, build_inputs, consensus_table=None, logo_assets=None):
+    """
+    Render and write a pool's outputs, then record them in the build manifest
+
+    consensus_table defaults to streaming a fresh enhanced standings table;
+    pass an already rendered one to reuse it. logo_assets are match_logos'
+    files for locally served logos. Returns the output paths.
+    """
+    outputs = output_paths(config)
+    bets_matrix, bets = analysis['bets_matrix'], analysis['bets']
+    if consensus_table is None:
+        # A generator: the table is produced while index.html is written
+        print("Generating enhanced standings table...")
+        consensus_table = iter_enhanced_standings_table(analysis['sorted_consensus'], bets, team_logos,
+                                                        analysis['histogram'], bets_matrix.team_ids)
+
+    # Stream the page straight to disk from the compiled template
+    page = page_context(bets, analysis['sorted_consensus'], analysis['fun_stats'], scored['live_standings_html'],
+                        consensus_table, pool_title=config['title'],
+                        season_title=f"{config['league']} {config['season']}",
+                        similarity=analysis['similarity'], team_ids=bets_matrix.team_ids)
+    sections = {}
+    if config['output_mode'] == 'data':
+        # The predictions and the heavy sections load from separate files once the page is open
+        page, sections = data_mode_context(page, bets_matrix.width, DATA_FILENAME,
+                                           {slot: section_filename(slot) for slot in LAZY_SECTIONS})
+
+    if config['output_dir']:
+        os.makedirs(config['output_dir'], exist_ok=True)
+    hashed = config['assets'] == 'hashed'
+    changed = {}  # served output -> whether this build rewrote it
+    assets = dict(logo_assets or {})
+    with span('render'):
+        if hashed:
+            # Styles and scripts go to fingerprinted files the page links to
+            template, page_assets = load_hashed_template(PAGE_TEMPLATE_PATH, 'page')
+            assets.update(page_assets)
+            if page['data_script']:
+                page['data_script'], data_assets = externalize(page['data_script'], 'data_mode')
+                assets.update(data_assets)
+            changed[outputs[0]] = write_chunks(outputs[0], template.iter_chunks(page))
+        else:
+            changed[outputs[0]] = write_chunks(outputs[0], iter_page(page))
+        if sections:
+            os.makedirs(pool_path(config, SECTIONS_DIR), exist_ok=True)
+        for slot, chunks in sections.items():
+            path = pool_path(config, section_filename(slot))
+            changed[path] = write_chunks(path, [chunks] if isinstance(chunks, str) else chunks)
+    with span('write'):
+        write_if_changed(outputs[1], analysis['readme'])
+        if config['output_mode'] == 'data':
+            changed[outputs[2]] = write_if_changed(outputs[2], dump_page_data(bets_matrix))
+        if hashed:
+            with span('compress'):
+                for path, rewritten in changed.items():
+                    precompress(path, force=rewritten)
+        outputs = outputs + write_assets(pool_path(config, ASSETS_DIR), assets, compress=hashed)
+        stale = remove_stale_outputs(config, outputs)
+        if stale:
+            print(f"✓ Removed {len(stale)} files left by a build in another output or asset mode")
+        save_manifest(build_inputs, outputs, pool_path(config, MANIFEST_PATH))
+    return outputs
+
+
+def build_pool(config, standings_payload=None, team_registry=None, incremental=False):
+    """
+    Generate one pool's index.html and README.md
+
+    Args:
+        config: pool_config() dict
+        standings_payload: Already fetched standings (default: fetch through
+            get_full_data, which only knows the default endpoint)
+        team_registry: Shared TeamRegistry; if None the registry is loaded from
+            and saved to .cache/team_registry.json
+        incremental: Skip the build if the manifest says nothing changed
+
+    Returns:
+        {'name', 'outputs', 'skipped', 'standings_teams', 'aliases'} where
+        aliases holds the fuzzy matches a shared registry learned during this
+        build (or None)
+    """
+    outputs = output_paths(config)
+    manifest_path = pool_path(config, MANIFEST_PATH)
+    result = {'name': config['name'], 'outputs': outputs, 'skipped': False, 'standings_teams': 0, 'aliases': None}
+    validate_config(config)
+
+    if standings_payload is None:
+        if config['url'] != STANDINGS_URL:
+            raise ValueError(f"Pool '{config['name']}' needs its standings payload passed in")
+        with span('api_fetch'):
+            standings_payload = get_full_data()
+
+    # With incremental, stop before doing any work if neither the bets, the
+    # standings payload nor the generator code changed since the last build
+    with span('manifest_check'):
+        build_inputs = collect_build_inputs(config['bets'], standings_payload, build_options(config))
+
+    # Keep every distinct payload so past rounds can be queried later
+    with span('snapshot'):
+        if record_standings_snapshot(standings_payload, pool_path(config, DEFAULT_HISTORY_PATH)) is not None:
+            print("✓ Recorded new standings snapshot")
+
+    if incremental and is_up_to_date(build_inputs, outputs, manifest_path):
+        print("✓ Inputs unchanged since the last build - nothing to do")
+        result['skipped'] = True
+        return result
+
+    analysis = analyze_bets(config)
+
+    # Get API data and extract team logos
+    shared_registry = team_registry is not None
+    if not shared_registry:
+        with span('registry_load'):
+            team_registry = load_team_registry(standings_payload)
+    team_logos, logo_assets = match_logos(analysis, team_registry, config['logos'])
+    scored = score_standings(config, analysis, standings_payload, team_registry)
+
+    # Keep any fuzzy team matches found this run for the next one
+    if team_registry.dirty and team_registry.teams:
+        if shared_registry:
+            result['aliases'] = dict(team_registry.aliases)
+        else:
+            save_team_registry(team_registry)
+
+    result['outputs'] = write_pool(config, analysis, team_logos, scored, build_inputs, logo_assets=logo_assets)
+    result['standings_teams'] = len(scored['current_standings'])
+    return result
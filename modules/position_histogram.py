@@ -0,0 +1,177 @@
+from collections import Counter
+
+from modules.rank_matrix import RankMatrix, MISSING
+
+
+class PositionHistogram:
+    """
+    Team × position prediction counts, built in one pass over a RankMatrix.
+
+    counts[team_id][p] is how many times the team was predicted at position
+    p (0-based), counting every occurrence; first_counts only counts each
+    participant's first listing of a team, like predictions.index(team).
+    Every per-team statistic (mean, variance, median, highest/lowest rank,
+    zone percentages) is derived from these counts in O(positions), however
+    many participants there are.
+    """
+
+    def __init__(self, matrix):
+        self.matrix = matrix
+        width = matrix.width
+        self.width = width
+        self.counts = [[0] * width for _ in matrix.team_names]
+        for pos in range(width):
+            for team_id, count in Counter(matrix.data[pos::width]).items():
+                if team_id != MISSING:
+                    self.counts[team_id][pos] = count
+
+        # Only rows that repeat a team differ between the two views
+        self.first_counts = [row[:] for row in self.counts]
+        for index in matrix.repeats:
+            seen = set()
+            for pos, team_id in enumerate(matrix.row(index)):
+                if team_id == MISSING:
+                    continue
+                if team_id in seen:
+                    self.first_counts[team_id][pos] -= 1
+                seen.add(team_id)
+
+        # Rows shorter than the matrix width (padded with MISSING)
+        last_column = matrix.data[width - 1::width] if width else b""
+        self.short_rows = []
+        index = last_column.find(MISSING)
+        while index != -1:
+            self.short_rows.append(index)
+            index = last_column.find(MISSING, index + 1)
+
+    @classmethod
+    def from_bets(cls, bets):
+        return cls(RankMatrix.from_bets(bets))
+
+    def team_counts(self, team, first_only=False):
+        """Per-position counts for a team name (all zeros for an unknown team)"""
+        team_id = self.matrix.team_ids.get(team)
+        if team_id is None:
+            return [0] * self.width
+        return (self.first_counts if first_only else self.counts)[team_id]
+
+    def row_length(self, index):
+        row = self.matrix.row(index)
+        length = row.find(MISSING)
+        return len(row) if length == -1 else length
+
+    def first_place_votes(self):
+        """
+        {team: votes} for everyone's first pick
+
+        Ordered by the first participant to pick each team, like a Counter
+        filled participant by participant.
+        """
+        if not self.width:
+            return {}
+        column = self.matrix.data[0::self.width]
+        votes = {team_id: row[0] for team_id, row in enumerate(self.counts) if row[0]}
+        order = sorted(votes, key=lambda team_id: column.find(team_id))
+        return {self.matrix.team_names[team_id]: votes[team_id] for team_id in order}
+
+    def tail_votes(self, offsets):
+        """
+        {team: votes} for the positions `offsets` from the end of each ranking
+
+        tail_votes((2, 1)) counts everyone's bottom two (predictions[-2:]),
+        tail_votes((3,)) their third-from-last pick. Only rankings with at
+        least max(offsets) teams count. Ordered by first appearance, scanning
+        participants in order and each one's picks left to right.
+        """
+        data, width = self.matrix.data, self.width
+        needed = max(offsets)
+        short = set(self.short_rows)
+        votes = {}
+        first_seen = {}
+
+        # Full-width rows: straight from the column counts
+        if width >= needed:
+            for slot, offset in enumerate(offsets):
+                pos = width - offset
+                column = data[pos::width]
+                for team_id, row in enumerate(self.counts):
+                    if not row[pos]:
+                        continue
+                    votes[team_id] = votes.get(team_id, 0) + row[pos]
+                    index = column.find(team_id)
+                    while index in short:
+                        index = column.find(team_id, index + 1)
+                    if index != -1:
+                        first_seen[team_id] = min(first_seen.get(team_id, (index, slot)), (index, slot))
+            # Short rows were counted in those columns too; take them back out
+            for index in short:
+                for offset in offsets:
+                    team_id = data[index * width + width - offset]
+                    if team_id != MISSING:
+                        votes[team_id] -= 1
+
+        # Short rows: their own tail
+        for index in self.short_rows:
+            length = self.row_length(index)
+            if length < needed:
+                continue
+            row = self.matrix.row(index)
+            for slot, offset in enumerate(offsets):
+                team_id = row[length - offset]
+                votes[team_id] = votes.get(team_id, 0) + 1
+                first_seen[team_id] = min(first_seen.get(team_id, (index, slot)), (index, slot))
+
+        order = sorted((team_id for team_id in votes if votes[team_id] > 0), key=first_seen.__getitem__)
+        return {self.matrix.team_names[team_id]: votes[team_id] for team_id in order}
+
+
+def position_count(counts):
+    return sum(counts)
+
+
+def position_total(counts):
+    """Sum of the 1-based positions"""
+    return sum((pos + 1) * count for pos, count in enumerate(counts))
+
+
+def mean_position(counts):
+    return position_total(counts) / position_count(counts)
+
+
+def position_variance(counts):
+    """Population variance of the 1-based positions, from exact integer sums"""
+    n = position_count(counts)
+    total = position_total(counts)
+    squares = sum((pos + 1) * (pos + 1) * count for pos, count in enumerate(counts))
+    return (n * squares - total * total) / (n * n)
+
+
+def nth_position(counts, k):
+    """The k-th smallest (0-based) 1-based position"""
+    seen = 0
+    for pos, count in enumerate(counts):
+        seen += count
+        if seen > k:
+            return pos + 1
+    raise IndexError(k)
+
+
+def median_position(counts):
+    n = position_count(counts)
+    if n % 2 != 0:
+        return nth_position(counts, n // 2)
+    return (nth_position(counts, n // 2 - 1) + nth_position(counts, n // 2)) / 2
+
+
+def highest_position(counts):
+    """Best (lowest-numbered) 1-based position anyone predicted"""
+    return next(pos + 1 for pos, count in enumerate(counts) if count)
+
+
+def lowest_position(counts):
+    return max(pos + 1 for pos, count in enumerate(counts) if count)
+
+
+def count_between(counts, first, last):
+    """How many predictions fall in 1-based positions first..last"""
+    return sum(counts[max(first - 1, 0):max(last, 0)])
@@ -0,0 +1,118 @@
+MISSING = 255  # Cell value for "no team at this position"
+MAX_TEAMS = 255
+
+
+class RankMatrix:
+    """
+    Compact users × positions matrix of predictions.
+
+    Team names are interned to small integer IDs and every participant's
+    ranking is stored as one fixed-width row of bytes in a single contiguous
+    bytearray, so row u, position p lives at data[u * width + p].
+    """
+
+    def __init__(self, width=16):
+        self.width = width
+        self.users = []
+        self.team_names = []   # team ID -> name
+        self.team_ids = {}     # name -> team ID
+        self.data = bytearray()
+        self.repeats = set()   # indices of rows that list some team more than once
+
+    def __len__(self):
+        return len(self.users)
+
+    def intern(self, team):
+        """Return the integer ID for a team name, assigning a new one if needed"""
+        team_id = self.team_ids.get(team)
+        if team_id is None:
+            team_id = len(self.team_names)
+            if team_id >= MAX_TEAMS:
+                raise ValueError(f"Too many distinct teams (max {MAX_TEAMS})")
+            self.team_ids[team] = team_id
+            self.team_names.append(team)
+        return team_id
+
+    def resize(self, width):
+        """Re-pack the matrix so every row holds exactly `width` positions"""
+        if width == self.width:
+            return
+        old, old_width = self.data, self.width
+        keep = min(width, old_width)
+        padding = bytes([MISSING]) * (width - keep)
+        self.data = bytearray()
+        for index in range(len(self.users)):
+            start = index * old_width
+            self.data += old[start:start + keep]
+            self.data += padding
+        self.width = width
+
+    def _pad_row(self, team_ids):
+        if len(team_ids) > self.width:
+            self.resize(len(team_ids))
+        row = bytearray(team_ids)
+        row += bytes([MISSING]) * (self.width - len(row))
+        return row
+
+    def add_row(self, user, teams):
+        """Append a participant's ranking given as a list of team names"""
+        self.add_id_row(user, [self.intern(team) for team in teams])
+
+    def add_id_row(self, user, team_ids):
+        """Append a participant's ranking given as already interned team IDs"""
+        if len(set(team_ids)) != len(team_ids):
+            self.repeats.add(len(self.users))
+        self.data += self._pad_row(team_ids)
+        self.users.append(user)
+
+    def replace_id_row(self, index, team_ids):
+        """Overwrite the ranking of the participant at `index`"""
+        row = self._pad_row(team_ids)
+        start = index * self.width
+        self.data[start:start + self.width] = row
+        if len(set(team_ids)) != len(team_ids):
+            self.repeats.add(index)
+        else:
+            self.repeats.discard(index)
+
+    def row(self, index):
+        """Return the raw team IDs for one participant"""
+        start = index * self.width
+        return self.data[start:start + self.width]
+
+    def predictions(self, index):
+        """Return one participant's ranking as a list of team names"""
+        return [self.team_names[team_id] for team_id in self.row(index) if team_id != MISSING]
+
+    def to_dict(self):
+        """Return the matrix in the {user: [team, ...]} shape used by stats.py"""
+        return {user: self.predictions(index) for index, user in enumerate(self.users)}
+
+    def position_table(self, ordered_teams, resolve=None):
+        """
+        Build a 256-byte translation table mapping team ID -> index in ordered_teams
+
+        Teams that are not in ordered_teams map to MISSING, so the table can be
+        passed straight to bytes.translate() over the whole matrix. If given,
+        resolve(name) maps both sides to a canonical name before matching.
+        """
+        if resolve is None:
+            resolve = lambda team: team
+        positions = {}
+        for pos, team in enumerate(ordered_teams):
+            positions.setdefault(resolve(team), pos)
+        table = bytearray([MISSING]) * 256
+        for team_id, team in enumerate(self.team_names):
+            pos = positions.get(resolve(team))
+            if pos is not None and pos < MISSING:
+                table[team_id] = pos
+        return bytes(table)
+
+    @classmethod
+    def from_bets(cls, bets):
+        """Build a matrix from the {user: [team, ...]} dict used by stats.py"""
+        width = max((len(predictions) for predictions in bets.values()), default=0)
+        matrix = cls(width)
+        for user, predictions in bets.items():
+            matrix.add_row(user, predictions)
+        return matrix
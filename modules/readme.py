@@ -0,0 +1,50 @@
+import io
+
+
+def highlight_top_teams(table_string):
+    lines = table_string.split('\n')
+    if len(lines) > 3:
+        for i in range(len(lines)):
+            if "| 1 |" in lines[i]:
+                lines[i] = lines[i].replace("| 1 |", "| 1 🥇 |")
+            elif "| 2 |" in lines[i]:
+                lines[i] = lines[i].replace("| 2 |", "| 2 🥈 |")
+            elif "| 3 |" in lines[i]:
+                lines[i] = lines[i].replace("| 3 |", "| 3 🥉 |")
+    return '\n'.join(lines)
+
+
+def generate_readme(bets, sorted_consensus, title):
+    """
+    Build README.md: the consensus table followed by everyone's predictions
+
+    Args:
+        bets: {user: [teams in predicted order]}
+        sorted_consensus: consensus_ranking(bets)
+        title: Pool name shown in the heading
+    """
+    from tabulate import tabulate  # Only the README needs it; keep it out of plain imports
+
+    readme = io.StringIO()
+    readme.write(f"# 🏆 {title} 🏆\n\n")
+    readme.write("## 📊 Current Standings\n`Calculated based on everyones prediction (lower score is better)`\n")
+    table_data = [(pos+1, team, value) for pos, (team, value) in enumerate(sorted_consensus.items())]
+
+    table_result = tabulate(table_data, headers=["#", "Team", "Value"], tablefmt="github")
+    readme.write(highlight_top_teams(table_result) + "\n\n")
+    readme.write("## 🔮 Individual Predictions\n")
+    max_bets = max([len(bets[user]) for user in bets.keys()])
+    predictions_table = []
+    for i in range(max_bets):
+        row = []
+        for user in bets.keys():
+            bet = bets[user][i] if i < len(bets[user]) else ""
+            row.append(bet)
+        predictions_table.append(row)
+
+    for i in range(len(predictions_table)):
+        predictions_table[i] = [i + 1] + predictions_table[i]
+
+    headers = ["#"] + list(bets.keys())
+    readme.write(tabulate(predictions_table, headers=headers, tablefmt="github") + "\n")
+    return readme.getvalue()
@@ -0,0 +1,92 @@
+import hashlib
+import os
+import re
+
+_PLACEHOLDER = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+_template_cache = {}
+
+
+class Template:
+    """
+    A page template with {{ name }} slots, split into parts once at load time.
+
+    Slot values can be strings or iterables of strings; iterables are streamed
+    through chunk by chunk, so a section never has to be joined in memory.
+    """
+
+    def __init__(self, source):
+        self.parts = []  # (literal text, slot name or None)
+        pos = 0
+        for match in _PLACEHOLDER.finditer(source):
+            self.parts.append((source[pos:match.start()], match.group(1)))
+            pos = match.end()
+        self.parts.append((source[pos:], None))
+        self.slots = [slot for _, slot in self.parts if slot]
+
+    def iter_chunks(self, context):
+        """Yield the rendered page as a sequence of string chunks"""
+        for literal, slot in self.parts:
+            if literal:
+                yield literal
+            if slot is None:
+                continue
+            value = context[slot]
+            if isinstance(value, str):
+                yield value
+            elif value is not None:
+                for chunk in value:
+                    yield chunk
+
+    def render(self, context):
+        return ''.join(self.iter_chunks(context))
+
+    def render_to(self, stream, context):
+        for chunk in self.iter_chunks(context):
+            stream.write(chunk)
+
+
+def load_template(path):
+    """Return the compiled template for path, recompiling only if the file changed"""
+    mtime = os.path.getmtime(path)
+    cached = _template_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(path, 'r', encoding='utf8') as f:
+        template = Template(f.read())
+    _template_cache[path] = (mtime, template)
+    return template
+
+
+def write_chunks(path, chunks, buffer_size=64 * 1024):
+    """
+    Stream string chunks to path, replacing the file only if the content changed
+
+    Chunks go to a temporary file through a fixed-size buffer while the new
+    content is hashed, so the full page is never held in memory. Returns True
+    if path was (re)written.
+    """
+    digest = hashlib.sha256()
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb', buffering=buffer_size) as out:
+        for chunk in chunks:
+            data = chunk.encode('utf8')
+            digest.update(data)
+            out.write(data)
+
+    if _file_digest(path) == digest.hexdigest():
+        os.remove(tmp_path)
+        return False
+    os.replace(tmp_path, path)
+    return True
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(64 * 1024), b""):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
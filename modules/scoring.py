@@ -0,0 +1,519 @@
+import sys
+from array import array
+from bisect import bisect_left, insort
+
+from modules.rank_matrix import RankMatrix, MISSING
+from modules.scoring_metrics import compute_metric_totals, get_metrics, lane_sums
+
+
+def max_possible_error(team_count):
+    """
+    The theoretical maximum error possible
+    Worst case: predicting teams in completely reverse order
+    """
+    return (team_count * team_count) // 2 if team_count % 2 == 0 else ((team_count * team_count) - 1) // 2
+
+
+def error_tables(width):
+    """
+    Build one 256-byte translation table per predicted position.
+
+    Table p maps an actual position a to abs(p - a), so translating column p of
+    the actual-position matrix gives that column's errors for every user at once.
+    """
+    tables = []
+    for predicted_pos in range(width):
+        table = bytearray(256)
+        for actual_pos in range(MISSING):
+            table[actual_pos] = abs(predicted_pos - actual_pos)
+        tables.append(bytes(table))
+    return tables
+
+
+def compute_error_matrix(matrix, actual_results, registry=None):
+    """
+    Compute the users × positions matrices of actual positions and absolute errors
+
+    Returns (actual, errors) as bytearrays laid out like matrix.data. Cells
+    whose team isn't in actual_results are MISSING in `actual` and 0 in `errors`.
+    With a TeamRegistry, prediction and standings names are matched through
+    their canonical names ('Malmö' scores against 'Malmö FF').
+    """
+    width = matrix.width
+    resolve = registry.canonical if registry is not None else None
+    actual = bytearray(matrix.data.translate(matrix.position_table(actual_results, resolve)))
+    errors = bytearray(len(actual))
+    for predicted_pos, table in enumerate(error_tables(width)):
+        errors[predicted_pos::width] = actual[predicted_pos::width].translate(table)
+    return actual, errors
+
+
+def fenwick_tables(team_count):
+    """
+    Per Fenwick-tree node k (1..team_count), the tables that map an actual
+    position a to 0xFF if node k is on the prefix-sum path for positions <= a
+    (query) and to 1 if it is on the update path of a (update).
+    """
+    size = min(team_count, MISSING)
+    query_tables, update_tables = [], []
+    for node in range(1, size + 1):
+        query = bytearray(256)
+        update = bytearray(256)
+        for actual_pos in range(size):
+            i = actual_pos + 1
+            while i > 0:
+                if i == node:
+                    query[actual_pos] = 0xFF
+                i -= i & -i
+            i = actual_pos + 1
+            while i <= size:
+                if i == node:
+                    update[actual_pos] = 1
+                i += i & -i
+        query_tables.append(bytes(query))
+        update_tables.append(bytes(update))
+    return query_tables, update_tables
+
+
+def kendall_distances(actual, width, user_count, team_count):
+    """
+    Every participant's Kendall tau distance (discordant pairs) from the actual positions
+
+    A Fenwick-tree inversion count run for all participants at once: each
+    tree node is a big int with one byte lane per user, and the per-user
+    choice of nodes on a query or update path is a bytes.translate of the
+    current column into a lane mask. Walking the columns left to right, a
+    prediction is discordant with every earlier one whose team finished
+    below it. Cells with no actual position (MISSING) are skipped.
+    """
+    query_tables, update_tables = fenwick_tables(team_count)
+    valid_table = bytes(0xFF if pos < min(team_count, MISSING) else 0 for pos in range(256))
+    ones = int.from_bytes(b'\x01' * user_count, 'little')
+    tree = [0] * len(query_tables)
+    seen = 0  # Valid cells so far, one byte lane per user
+
+    def discordant_columns():
+        nonlocal seen
+        for pos in range(width):
+            column = actual[pos::width]
+            at_or_above = 0
+            for node, table in enumerate(query_tables):
+                if tree[node]:
+                    at_or_above += tree[node] & int.from_bytes(column.translate(table), 'little')
+            valid = int.from_bytes(column.translate(valid_table), 'little')
+            # Lane-wise seen >= at_or_above, so the subtraction never borrows across lanes
+            yield ((seen - at_or_above) & valid).to_bytes(user_count, 'little')
+            seen += valid & ones
+            for node, table in enumerate(update_tables):
+                tree[node] += int.from_bytes(column.translate(table), 'little')
+
+    return lane_sums(discordant_columns(), user_count, width * (width - 1) // 2)
+
+
+def _prediction_detail(team_names, row_ids, predicted_pos, row_actual, row_errors):
+    return (team_names[row_ids[predicted_pos]], {
+        'predicted': predicted_pos + 1,                # +1 for display position
+        'actual': row_actual[predicted_pos] + 1,
+        'error': row_errors[predicted_pos]
+    })
+
+
+def score_prediction_row(team_names, row_ids, row_actual, row_errors, max_error, check_missing=True):
+    """
+    Build one participant's score_data from their row of team IDs, actual positions and errors
+    """
+    width = len(row_ids)
+    total_error = sum(row_errors)
+
+    if check_missing and MISSING in row_actual:
+        # Slow path: ignore positions whose team isn't in the actual results
+        scored = [pos for pos in range(width) if row_actual[pos] != MISSING]
+    else:
+        scored = None
+
+    if scored is None:
+        best_pos = row_errors.index(min(row_errors)) if width else None
+        worst_pos = row_errors.index(max(row_errors)) if width else None
+    elif scored:
+        best_pos = min(scored, key=lambda pos: row_errors[pos])
+        worst_pos = max(scored, key=lambda pos: row_errors[pos])
+    else:
+        best_pos = worst_pos = None
+
+    if best_pos is not None:
+        best_prediction = _prediction_detail(team_names, row_ids, best_pos, row_actual, row_errors)
+        worst_prediction = _prediction_detail(team_names, row_ids, worst_pos, row_actual, row_errors)
+    else:
+        best_prediction = None
+        worst_prediction = None
+
+    # Convert error to a positive score (higher is better)
+    positive_score = max_error - total_error
+
+    return {
+        'score': positive_score,
+        'max_possible': max_error,
+        'raw_error': total_error,
+        'percent': round((positive_score / max_error) * 100, 1),
+        'best_prediction': best_prediction,
+        'worst_prediction': worst_prediction
+    }
+
+
+def score_row(matrix, index, actual, errors, max_error, check_missing=True):
+    """
+    Build one participant's score_data from the shared actual/error matrices
+    """
+    start = index * matrix.width
+    end = start + matrix.width
+    return score_prediction_row(matrix.team_names, matrix.data[start:end], actual[start:end],
+                                errors[start:end], max_error, check_missing)
+
+
+def score_rank_matrix(matrix, actual_results, registry=None, metrics=None, kendall=False):
+    """
+    Score every participant in a RankMatrix against the actual results.
+
+    Returns the same {user: score_data} dict as calculate_prediction_scores.
+    metrics is a list of modules.scoring_metrics names; their totals are
+    computed from the same actual-position matrix and added to each
+    score_data as score_data['metrics'] = {name: total}. With kendall=True
+    each score_data also gets 'discordant_pairs' and 'kendall_tau'.
+    """
+    max_error = max_possible_error(len(actual_results))
+    actual, errors = compute_error_matrix(matrix, actual_results, registry)
+    has_missing = MISSING in actual
+    scores = {user: score_row(matrix, index, actual, errors, max_error, has_missing)
+              for index, user in enumerate(matrix.users)}
+
+    add_rank_extras(scores, matrix, actual, len(actual_results), metrics, kendall)
+    return scores
+
+
+def add_rank_extras(scores, matrix, actual, team_count, metrics=None, kendall=False):
+    """
+    Add metric totals and Kendall tau to score_data dicts in matrix user order
+
+    actual is the users × positions matrix of actual positions.
+    """
+    if metrics:
+        totals = compute_metric_totals(actual, matrix.width, len(matrix), team_count, get_metrics(metrics))
+        for index, score_data in enumerate(scores.values()):
+            score_data['metrics'] = {name: values[index] for name, values in totals.items()}
+
+    if kendall:
+        width, user_count = matrix.width, len(matrix)
+        distances = kendall_distances(actual, width, user_count, team_count)
+        valid_table = bytes(1 if pos != MISSING else 0 for pos in range(256))
+        ranked = lane_sums((actual[pos::width].translate(valid_table) for pos in range(width)), user_count, width)
+        for index, score_data in enumerate(scores.values()):
+            pairs = ranked[index] * (ranked[index] - 1) // 2
+            score_data['discordant_pairs'] = distances[index]
+            score_data['kendall_tau'] = round(1 - 2 * distances[index] / pairs, 3) if pairs else None
+
+
+def score_bets(bets, actual_results, registry=None, metrics=None, kendall=False):
+    """
+    Score a {user: [team, ...]} dict or a prebuilt RankMatrix
+    """
+    matrix = bets if isinstance(bets, RankMatrix) else RankMatrix.from_bets(bets)
+    return score_rank_matrix(matrix, actual_results, registry, metrics, kendall)
+
+
+class IncrementalLeaderboard:
+    """
+    Leaderboard that is updated in place when the standings change.
+
+    Keeps an inverted index from team ID to the users who predicted it (and
+    at which position), the error term of every such (user, position) cell,
+    each user's total and a list of (total, user index) kept sorted with
+    bisect. Applying new standings only recomputes the terms of teams whose
+    position moved (one bytes.translate each), adds each affected user's
+    delta to their total, re-places the users whose total changed and drops
+    just their cached score details. A match result that moves a few teams
+    therefore touches only the users who predicted those teams.
+
+    Scoring metrics are kept the same way, per team, from the first time
+    scores() asks for them. Kendall distances are updated pair by pair: only
+    pairs of teams whose order in the table flipped change anyone's count,
+    and each flipped pair is one lane-wise comparison of the two teams'
+    predicted positions across all users.
+
+    Constructed without standings, the first apply_standings() scores
+    everyone; so does a change in the set of teams (or their number, which
+    changes max_error for everyone).
+    """
+
+    def __init__(self, matrix, actual_results=None, registry=None):
+        self.matrix = matrix
+        self.registry = registry
+        self._resolve = registry.canonical if registry is not None else None
+
+        # team ID -> the users who predicted it and the position they put it at
+        self.predictors = [array('I') for _ in matrix.team_names]
+        cell_positions = [bytearray() for _ in matrix.team_names]
+        # team ID -> every user's predicted position of it (MISSING if they left it out)
+        self.inverse = [bytearray([MISSING]) * len(matrix) for _ in matrix.team_names]
+        width = matrix.width
+        for index in range(len(matrix)):
+            for pos, team_id in enumerate(matrix.data[index * width:(index + 1) * width]):
+                if team_id != MISSING:
+                    self.predictors[team_id].append(index)
+                    cell_positions[team_id].append(pos)
+                    self.inverse[team_id][index] = pos
+        self.predicted = [bytes(positions) for positions in cell_positions]
+
+        self.teams = None
+        self.team_count = 0
+        self.max_error = 0
+        self.positions = bytes([MISSING]) * 256
+        self.terms = []
+        self.totals = []
+        self.order = []
+        self._scores = {}
+        # metric name -> (per-team terms, per-user totals), for the metrics asked for so far
+        self.metric_terms = {}
+        self.metric_totals = {}
+        # Per-user discordant pairs and ranked cells, once Kendall tau has been asked for
+        self.discordant = None
+        self.ranked = None
+        if actual_results is not None:
+            self._score_all(actual_results)
+
+    def _team_terms(self, team_id, cell=None):
+        """
+        The term of every cell predicting one team, aligned with self.predictors[team_id]
+
+        cell is a ScoringMetric cell function; the default is the absolute error.
+        """
+        actual_pos = self.positions[team_id]
+        if actual_pos == MISSING:
+            return bytes(len(self.predicted[team_id]))
+        # Table mapping predicted position -> term
+        if cell is None:
+            table = [abs(pos - actual_pos) for pos in range(self.matrix.width)]
+        else:
+            table = [cell(pos, actual_pos, self.team_count) for pos in range(self.matrix.width)]
+        if max(table, default=0) <= 255:
+            return self.predicted[team_id].translate(bytes(table) + bytes(256 - len(table)))
+        return array('I', (table[pos] for pos in self.predicted[team_id]))
+
+    def _sum_terms(self, terms):
+        totals = [0] * len(self.matrix)
+        for users, team_terms in zip(self.predictors, terms):
+            for index, term in zip(users, team_terms):
+                totals[index] += term
+        return totals
+
+    def _track_metric(self, metric):
+        terms = [self._team_terms(team_id, metric.cell) for team_id in range(len(self.matrix.team_names))]
+        self.metric_terms[metric.name] = terms
+        self.metric_totals[metric.name] = self._sum_terms(terms)
+
+    def _track_kendall(self):
+        width, user_count = self.matrix.width, len(self.matrix)
+        actual = self.matrix.data.translate(self.positions)
+        self.discordant = kendall_distances(actual, width, user_count, self.team_count)
+        valid_table = bytes(1 if pos != MISSING else 0 for pos in range(256))
+        self.ranked = lane_sums((actual[pos::width].translate(valid_table) for pos in range(width)),
+                                user_count, width)
+
+    def _row_discordant(self, index):
+        """Discordant pairs of one row, counted pair by pair (rows that repeat a team)"""
+        row_actual = [pos for pos in self.matrix.row(index).translate(self.positions) if pos != MISSING]
+        return sum(1 for i, above in enumerate(row_actual) for below in row_actual[i + 1:] if above > below)
+
+    def _score_all(self, actual_results):
+        self.teams = frozenset(actual_results)
+        self.team_count = len(actual_results)
+        self.max_error = max_possible_error(self.team_count)
+        self.positions = self.matrix.position_table(actual_results, self._resolve)
+        self.terms = [self._team_terms(team_id) for team_id in range(len(self.matrix.team_names))]
+        self.totals = self._sum_terms(self.terms)
+        self.order = sorted((total, index) for index, total in enumerate(self.totals))
+        self._scores = {}
+        for metric in get_metrics(list(self.metric_terms)):
+            self._track_metric(metric)
+        if self.discordant is not None:
+            self._track_kendall()
+
+    def _row(self, index):
+        """Actual positions and errors for one user's row"""
+        row_actual = self.matrix.row(index).translate(self.positions)
+        row_errors = bytearray(len(row_actual))
+        for pos, actual_pos in enumerate(row_actual):
+            row_errors[pos] = 0 if actual_pos == MISSING else abs(pos - actual_pos)
+        return row_actual, row_errors
+
+    def _apply_terms(self, moved, terms, totals, cell=None):
+        """Recompute the terms of moved teams; returns {user index: change in their total}"""
+        deltas = {}
+        for team_id in moved:
+            old_terms, new_terms = terms[team_id], self._team_terms(team_id, cell)
+            terms[team_id] = new_terms
+            for index, old, new in zip(self.predictors[team_id], old_terms, new_terms):
+                if old != new:
+                    deltas[index] = deltas.get(index, 0) + new - old
+        for index, delta in deltas.items():
+            totals[index] += delta
+        return deltas
+
+    def _apply_kendall(self, old_positions, moved):
+        """
+        Update the discordant pair counts for the pairs of teams whose order flipped
+
+        A pair's discordance only depends on the sign of its actual position
+        difference, so only pairs involving a moved team whose sign changed
+        count. For each, the users who predicted both teams are split by which
+        of the two they put higher (a 16-bit lane subtraction whose bit 8 is
+        set where x >= y) and their counts go up or down by one.
+        """
+        def sign(value):
+            return (value > 0) - (value < 0)
+
+        user_count = len(self.matrix)
+        ones = int.from_bytes(b'\x01\x00' * user_count, 'little')
+        high = ones << 8
+        valid_table = bytes(1 if pos != MISSING else 0 for pos in range(256))
+
+        def wide(column):
+            lanes = bytearray(2 * user_count)
+            lanes[0::2] = column
+            return int.from_bytes(lanes, 'little')
+
+        moved_set = set(moved)
+        teams = [team_id for team_id in range(len(self.matrix.team_names)) if self.positions[team_id] != MISSING]
+        up = down = 0
+        for x in moved:
+            for y in teams:
+                if y == x or (y in moved_set and y < x):
+                    continue
+                old = sign(old_positions[x] - old_positions[y])
+                new = sign(self.positions[x] - self.positions[y])
+                if old == new:
+                    continue
+                # Users putting x below y are discordant when x finished above y (sign -1), and vice versa
+                x_below = [(new == -1) - (old == -1), (new == 1) - (old == 1)]
+                both = wide(self.inverse[x].translate(valid_table)) & wide(self.inverse[y].translate(valid_table))
+                below = (((wide(self.inverse[x]) | high) - wide(self.inverse[y])) >> 8) & both
+                for mask, change in ((below, x_below[0]), (both ^ below, x_below[1])):
+                    if change > 0:
+                        up += mask
+                    elif change < 0:
+                        down += mask
+
+        if up or down:
+            up_lanes = array('H', up.to_bytes(2 * user_count, 'little'))
+            down_lanes = array('H', down.to_bytes(2 * user_count, 'little'))
+            if sys.byteorder != 'little':
+                up_lanes.byteswap()
+                down_lanes.byteswap()
+            for index, (plus, minus) in enumerate(zip(up_lanes, down_lanes)):
+                if plus != minus:
+                    self.discordant[index] += plus - minus
+        for index in self.matrix.repeats:
+            self.discordant[index] = self._row_discordant(index)
+
+    def apply_standings(self, actual_results, registry=None):
+        """
+        Update the leaderboard for new standings; returns the indexes of users whose total changed
+
+        Pass the registry the standings were resolved with if it was
+        reloaded; name matches that change show up as moved teams.
+        """
+        if registry is not None:
+            self.registry = registry
+            self._resolve = registry.canonical
+        if self.teams is None or len(actual_results) != self.team_count or frozenset(actual_results) != self.teams:
+            self._score_all(actual_results)
+            return set(range(len(self.matrix)))
+
+        positions = self.matrix.position_table(actual_results, self._resolve)
+        moved = [team_id for team_id in range(len(self.matrix.team_names))
+                 if positions[team_id] != self.positions[team_id]]
+        if not moved:
+            return set()
+        if any((positions[team_id] == MISSING) != (self.positions[team_id] == MISSING) for team_id in moved):
+            # A name now matches (or no longer matches) a team: every count over ranked cells changes
+            self._score_all(actual_results)
+            return set(range(len(self.matrix)))
+        old_positions, self.positions = self.positions, positions
+
+        for team_id in moved:
+            # Their details show the team's actual position, so they are stale even if the total isn't
+            for index in self.predictors[team_id]:
+                self._scores.pop(index, None)
+        for metric in get_metrics(list(self.metric_terms)):
+            self._apply_terms(moved, self.metric_terms[metric.name], self.metric_totals[metric.name], metric.cell)
+        if self.discordant is not None:
+            self._apply_kendall(old_positions, moved)
+
+        old_totals = {}
+        for team_id in moved:
+            for index in self.predictors[team_id]:
+                old_totals.setdefault(index, self.totals[index])
+        self._apply_terms(moved, self.terms, self.totals)
+
+        changed = set()
+        for index, old in old_totals.items():
+            new = self.totals[index]
+            if new == old:
+                continue
+            del self.order[bisect_left(self.order, (old, index))]
+            insort(self.order, (new, index))
+            changed.add(index)
+        return changed
+
+    def score(self, index):
+        """score_data for one user, rebuilt only after their row changed"""
+        score_data = self._scores.get(index)
+        if score_data is None:
+            row_actual, row_errors = self._row(index)
+            score_data = score_prediction_row(self.matrix.team_names, self.matrix.row(index),
+                                              row_actual, row_errors, self.max_error)
+            self._scores[index] = score_data
+        return score_data
+
+    def scores(self, metrics=None, kendall=False):
+        """
+        Same {user: score_data} dict as calculate_prediction_scores
+
+        The score details come from the cache. Metric totals and Kendall
+        distances are kept up to date by apply_standings() once asked for,
+        and added to copies of the cached dicts.
+        """
+        stale = [index for index in range(len(self.matrix)) if index not in self._scores]
+        if len(stale) > 64:
+            # Rebuild the stale rows from shared actual/error matrices, as score_rank_matrix does
+            width = self.matrix.width
+            actual = self.matrix.data.translate(self.positions)
+            errors = bytearray(len(actual))
+            for predicted_pos, table in enumerate(error_tables(width)):
+                errors[predicted_pos::width] = actual[predicted_pos::width].translate(table)
+            for index in stale:
+                self._scores[index] = score_row(self.matrix, index, actual, errors, self.max_error)
+        scores = {user: self.score(index) for index, user in enumerate(self.matrix.users)}
+        if not metrics and not kendall:
+            return scores
+
+        for metric in get_metrics(metrics or []):
+            if metric.name not in self.metric_terms:
+                self._track_metric(metric)
+        if kendall and self.discordant is None:
+            self._track_kendall()
+
+        scores = {user: dict(score_data) for user, score_data in scores.items()}
+        for index, score_data in enumerate(scores.values()):
+            if metrics:
+                score_data['metrics'] = {name: self.metric_totals[name][index] for name in metrics}
+            if kendall:
+                pairs = self.ranked[index] * (self.ranked[index] - 1) // 2
+                score_data['discordant_pairs'] = self.discordant[index]
+                score_data['kendall_tau'] = round(1 - 2 * self.discordant[index] / pairs, 3) if pairs else None
+        return scores
+
+    def leaderboard(self, limit=None):
+        """Same [(user, score_data), ...] list as get_leaderboard, optionally only the top `limit`"""
+        users = self.matrix.users
+        order = self.order if limit is None else self.order[:limit]
+        return [(users[index], self.score(index)) for _, index in order]
@@ -0,0 +1,149 @@
+import sys
+from array import array
+
+from modules.rank_matrix import MISSING
+
+# name -> ScoringMetric, in registration order
+SCORING_METRICS = {}
+
+
+class ScoringMetric:
+    """
+    A per-prediction scoring rule summed over each participant's ranking.
+
+    cell(predicted_pos, actual_pos, team_count) scores one prediction (0-based
+    positions) as a non-negative int. The metric is evaluated by turning the
+    rule into one 256-byte table per predicted position and translating the
+    shared actual-position matrix through it, so every metric costs one
+    bytes.translate per column regardless of how it is defined. Rules whose
+    values don't fit in a byte (squared errors in larger leagues) get one
+    such set of tables per byte of their largest value.
+    """
+
+    def __init__(self, name, label, cell, higher_is_better=False):
+        self.name = name
+        self.label = label
+        self.cell = cell
+        self.higher_is_better = higher_is_better
+
+    def tables(self, width, team_count):
+        """
+        Translation tables (actual position -> cell value), one per predicted position
+
+        Returns a list of byte planes: plane k holds byte k of every value,
+        so a participant's total is the sum over planes of (plane total << 8k).
+        """
+        values = []
+        for predicted_pos in range(width):
+            row = [0] * 256
+            for actual_pos in range(min(team_count, MISSING)):
+                value = self.cell(predicted_pos, actual_pos, team_count)
+                if value < 0:
+                    raise ValueError(f"Metric '{self.name}' cell value {value} is negative")
+                row[actual_pos] = value
+            values.append(row)
+        largest = max((max(row) for row in values), default=0)
+        planes = []
+        for shift in range(0, max(largest.bit_length(), 1), 8):
+            planes.append([bytes((value >> shift) & 0xFF for value in row) for row in values])
+        return planes
+
+
+def register_metric(name, label, higher_is_better=False):
+    """Decorator adding a cell function to SCORING_METRICS"""
+    def decorator(cell):
+        SCORING_METRICS[name] = ScoringMetric(name, label, cell, higher_is_better)
+        return cell
+    return decorator
+
+
+def get_metrics(names):
+    """Look up metrics by name, raising ValueError for unknown ones"""
+    unknown = [name for name in names if name not in SCORING_METRICS]
+    if unknown:
+        raise ValueError(f"Unknown scoring metrics: {', '.join(unknown)} "
+                         f"(available: {', '.join(SCORING_METRICS)})")
+    return [SCORING_METRICS[name] for name in names]
+
+
+def zone(pos, team_count):
+    """Table zone of a 0-based position: europa, conference, playoff, relegation or None"""
+    if pos == 0:
+        return 'europa'
+    if pos <= 2:
+        return 'conference'
+    if pos >= team_count - 2:
+        return 'relegation'
+    if pos == team_count - 3:
+        return 'playoff'
+    return None
+
+
+@register_metric('absolute_error', "Abs. Error")
+def absolute_error(predicted_pos, actual_pos, team_count):
+    return abs(predicted_pos - actual_pos)
+
+
+@register_metric('squared_error', "Sq. Error")
+def squared_error(predicted_pos, actual_pos, team_count):
+    return (predicted_pos - actual_pos) ** 2
+
+
+@register_metric('top_heavy_error', "Top-Heavy Error")
+def top_heavy_error(predicted_pos, actual_pos, team_count):
+    """Absolute error weighted by how high up the table the prediction or result is"""
+    weight = team_count - min(predicted_pos, actual_pos)
+    return abs(predicted_pos - actual_pos) * max(weight, 1)
+
+
+@register_metric('zone_hits', "Zones Right", higher_is_better=True)
+def zone_hits(predicted_pos, actual_pos, team_count):
+    """1 if a team predicted in a European or relegation spot finished in that same zone"""
+    predicted_zone = zone(predicted_pos, team_count)
+    return int(predicted_zone is not None and predicted_zone == zone(actual_pos, team_count))
+
+
+@register_metric('exact_hits', "Exact Hits", higher_is_better=True)
+def exact_hits(predicted_pos, actual_pos, team_count):
+    return int(predicted_pos == actual_pos)
+
+
+def lane_sums(columns, user_count, bound):
+    """
+    Add up byte columns (one byte per user) into per-user totals
+
+    Each column is widened into lanes big enough for `bound` and added as one
+    big int, so summing a column is a single addition however many users
+    there are.
+    """
+    lane = 1 if bound < 2 ** 8 else 2 if bound < 2 ** 16 else 4
+    total = 0
+    for column in columns:
+        if lane > 1:
+            wide = bytearray(lane * user_count)
+            wide[0::lane] = column
+            column = wide
+        total += int.from_bytes(column, 'little')
+    totals = array({1: 'B', 2: 'H', 4: 'I'}[lane], total.to_bytes(lane * user_count, 'little'))
+    if sys.byteorder != 'little':
+        totals.byteswap()
+    return totals.tolist()
+
+
+def compute_metric_totals(actual, width, user_count, team_count, metrics):
+    """
+    Every participant's total for each metric, from the shared actual-position matrix
+
+    actual is the first matrix returned by scoring.compute_error_matrix.
+    Returns {metric name: [total per user]}.
+    """
+    totals = {}
+    for metric in metrics:
+        metric_totals = [0] * user_count
+        for plane, tables in enumerate(metric.tables(width, team_count)):
+            bound = sum(max(table) for table in tables)
+            columns = (actual[pos::width].translate(table) for pos, table in enumerate(tables))
+            sums = lane_sums(columns, user_count, bound)
+            metric_totals = [total + (value << (8 * plane)) for total, value in zip(metric_totals, sums)]
+        totals[metric.name] = metric_totals
+    return totals
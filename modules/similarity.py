@@ -0,0 +1,455 @@
+"""
+Participant-to-participant similarity: who predicted like whom.
+
+Distances between two rankings are Spearman's footrule (sum of |position
+differences| over the teams) or the Spearman distance (sum of squared
+differences). No users × users matrix is built: each participant is compared
+with one block of candidates at a time through small per-block lookup tables,
+and only their k nearest neighbours are kept. Ranges of participants can be
+spread over worker processes. The pool is also clustered into groups of
+similar rankings for the page.
+
+Usage: python -m modules.similarity [bets] [--top 3] [--metric footrule] [--workers 4]
+"""
+import argparse
+import heapq
+import sys
+from array import array
+
+from modules.rank_matrix import MISSING
+
+DISTANCE_METRICS = {
+    'footrule': lambda a, b: abs(a - b),
+    'spearman': lambda a, b: (a - b) ** 2
+}
+
+# Pools larger than this only get clusters on the page, not per-participant neighbours
+NEIGHBOUR_LIMIT = 5000
+# Cluster centers of larger pools are fitted on an evenly spaced sample of this size
+CLUSTER_SAMPLE = 20000
+# Safety cap on assign/re-center rounds; pools normally settle within a few dozen
+CLUSTER_ITERATIONS = 500
+
+
+def max_distance(team_count, metric='footrule'):
+    """Largest distance between two full rankings of team_count teams (reversed orders)"""
+    return sum(DISTANCE_METRICS[metric](pos, team_count - 1 - pos) for pos in range(team_count))
+
+
+def cluster_count(user_count):
+    """Default number of clusters for a pool: about √participants, at most 6"""
+    return max(1, min(6, round(user_count ** 0.5)))
+
+
+class SimilarityIndex:
+    """
+    Team-major view of a RankMatrix for distances between participants.
+
+    columns[t] holds every participant's 0-based position for team t, one byte
+    per participant; a team left out of a ranking counts as predicted last,
+    and a team listed twice counts at its first position. The distances from
+    one ranking to all participants are then one bytes.translate per team,
+    through a table of |position - query position| (or its square), summed as
+    one big int with a byte lane per participant.
+    """
+
+    def __init__(self, matrix):
+        data, width = matrix.data, matrix.width
+        user_count = len(matrix)
+        team_count = len(matrix.team_names)
+        self.users = list(matrix.users)
+        self.team_names = list(matrix.team_names)
+        self.user_count = user_count
+        self.team_count = team_count
+        self.last = max(width, 1) - 1
+
+        # Rows that repeat a team would add two positions into one lane; mask them out and patch them below
+        keep = None
+        if matrix.repeats:
+            mask = bytearray(b'\xff') * user_count
+            for index in matrix.repeats:
+                mask[index] = 0
+            keep = int.from_bytes(mask, 'little')
+
+        # Sum (position + 1) over the columns; 0 is left where a team isn't in the ranking
+        totals = [0] * team_count
+        for pos in range(width):
+            column = data[pos::width]
+            for team_id in set(column):
+                if team_id == MISSING:
+                    continue
+                table = bytearray(256)
+                table[team_id] = pos + 1
+                value = int.from_bytes(column.translate(table), 'little')
+                totals[team_id] += value if keep is None else value & keep
+
+        unshift = bytes([self.last] + [min(value - 1, self.last) for value in range(1, 256)])
+        self.columns = [total.to_bytes(user_count, 'little').translate(unshift) for total in totals]
+
+        if matrix.repeats:
+            columns = [bytearray(column) for column in self.columns]
+            for index in matrix.repeats:
+                row = matrix.row(index)
+                for team_id, column in enumerate(columns):
+                    pos = row.find(team_id)
+                    column[index] = self.last if pos == -1 else pos
+            self.columns = [bytes(column) for column in columns]
+
+    def sample(self, size):
+        """A view of every n-th participant, about `size` of them"""
+        step = -(-self.user_count // size)
+        sample = object.__new__(SimilarityIndex)
+        sample.__dict__.update(self.__dict__)
+        sample.users = self.users[::step]
+        sample.user_count = len(sample.users)
+        sample.columns = [column[::step] for column in self.columns]
+        return sample
+
+    def vector(self, index):
+        """One participant's position for every team"""
+        return [column[index] for column in self.columns]
+
+    def ranking(self, vector):
+        """Team IDs ordered by a position vector (ties by team ID)"""
+        return sorted(range(self.team_count), key=lambda team_id: (vector[team_id], team_id))
+
+    def distance_tables(self, metric):
+        """One 256-byte table per query position: participant position -> distance for that team"""
+        cell = DISTANCE_METRICS[metric]
+        tables = []
+        for query_pos in range(self.last + 1):
+            values = [cell(pos, query_pos) for pos in range(self.last + 1)]
+            if max(values) > 255:
+                raise ValueError(f"{metric} distances don't fit in a byte for {self.last + 1} positions")
+            tables.append(bytes(values + [0] * (256 - len(values))))
+        return tables
+
+    def distance_bound(self, metric):
+        return self.team_count * DISTANCE_METRICS[metric](0, self.last)
+
+    def lane_width(self, metric):
+        bound = self.distance_bound(metric)
+        return 1 if bound < 2 ** 8 else 2 if bound < 2 ** 16 else 4
+
+    def block_distances(self, vectors, metric='footrule', lane=None):
+        """
+        Distances from each of several position vectors to every participant
+
+        Computed team by team, so each column is streamed once for all the
+        vectors. Returns one little-endian bytes per vector, `lane` (by
+        default lane_width(metric)) bytes per participant.
+        """
+        tables = self.distance_tables(metric)
+        lane = lane or self.lane_width(metric)
+        user_count = self.user_count
+        totals = [0] * len(vectors)
+        for team_id, column in enumerate(self.columns):
+            for slot, vector in enumerate(vectors):
+                translated = column.translate(tables[vector[team_id]])
+                if lane > 1:
+                    wide = bytearray(lane * user_count)
+                    wide[0::lane] = translated
+                    translated = wide
+                totals[slot] += int.from_bytes(translated, 'little')
+        return [total.to_bytes(lane * user_count, 'little') for total in totals]
+
+    def distances(self, vector, metric='footrule'):
+        """Distances from a position vector to every participant, as a list"""
+        raw = self.block_distances([vector], metric)[0]
+        values = array({1: 'B', 2: 'H', 4: 'I'}[self.lane_width(metric)], raw)
+        if sys.byteorder != 'little':
+            values.byteswap()
+        return values.tolist()
+
+    def nearest_in(self, raw, lane, k, exclude=None):
+        """The k smallest (distance, index) pairs in one row of block_distances(), skipping `exclude`"""
+        if lane == 1:
+            # Byte lanes: find() each distance value in increasing order until k are found
+            found = []
+            for value in range(256):
+                index = raw.find(value)
+                while index != -1 and len(found) < k:
+                    if index != exclude:
+                        found.append((value, index))
+                    index = raw.find(value, index + 1)
+                if len(found) >= k:
+                    break
+            return found
+        values = array({2: 'H', 4: 'I'}[lane], raw)
+        if sys.byteorder != 'little':
+            values.byteswap()
+        return heapq.nsmallest(k, ((value, index) for index, value in enumerate(values) if index != exclude))
+
+    def block_lookup(self, start, stop, metric='footrule'):
+        """
+        Distance lanes for candidates start..stop-1, per team and query position
+
+        lookup[t][q] is, as one big int, every candidate's distance for team t
+        from a ranking that has t at position q. A query's distances to the
+        block are then just the sum of lookup[t][query[t]] over the teams.
+        """
+        tables = self.distance_tables(metric)
+        lane = self.lane_width(metric)
+        lookup = []
+        for column in self.columns:
+            column = column[start:stop]
+            row = []
+            for table in tables:
+                translated = column.translate(table)
+                if lane > 1:
+                    wide = bytearray(lane * len(column))
+                    wide[0::lane] = translated
+                    translated = wide
+                row.append(int.from_bytes(translated, 'little'))
+            lookup.append(row)
+        return lookup
+
+    def nearest_range(self, start, stop, k, metric='footrule', block_size=4096):
+        """
+        Nearest neighbours for participants start..stop-1, against everyone
+
+        Candidates are taken block_size at a time so their lookup tables stay
+        small enough to be cache resident; each block's best k are merged
+        into the running k nearest.
+        """
+        lane = self.lane_width(metric)
+        vectors = list(zip(*(column[start:stop] for column in self.columns)))
+        found = [[] for _ in vectors]
+        for block_start in range(0, self.user_count, block_size):
+            block_stop = min(block_start + block_size, self.user_count)
+            lookup = self.block_lookup(block_start, block_stop, metric)
+            size = lane * (block_stop - block_start)
+            for slot, vector in enumerate(vectors):
+                total = 0
+                for row, query_pos in zip(lookup, vector):
+                    total += row[query_pos]
+                user = start + slot
+                exclude = user - block_start if block_start <= user < block_stop else None
+                block_found = [(distance, block_start + index) for distance, index
+                               in self.nearest_in(total.to_bytes(size, 'little'), lane, k, exclude)]
+                found[slot] = heapq.nsmallest(k, found[slot] + block_found) if found[slot] else block_found
+        return found
+
+    def nearest(self, k=3, metric='footrule', workers=1, block_size=4096):
+        """
+        Every participant's k nearest neighbours as [(distance, index), ...]
+
+        Nearest first, ties by index. No users × users matrix is built; with
+        workers > 1 the participants are split into ranges that run in
+        separate processes.
+        """
+        self.distance_tables(metric)  # Fail early on a metric that doesn't fit
+        if workers > 1 and self.user_count > block_size:
+            step = -(-self.user_count // (workers * 4))
+            ranges = [(start, min(start + step, self.user_count), k, metric, block_size)
+                      for start in range(0, self.user_count, step)]
+            from concurrent.futures import ProcessPoolExecutor  # Pulls in multiprocessing; only needed here
+
+            with ProcessPoolExecutor(max_workers=workers, initializer=_set_worker_index,
+                                     initargs=(self,)) as executor:
+                return [neighbours for found in executor.map(_worker_nearest_range, ranges) for neighbours in found]
+        return self.nearest_range(0, self.user_count, k, metric, block_size)
+
+    def consensus_vector(self, mask=None):
+        """
+        Borda center of a group: teams ordered by their summed positions
+
+        mask is a lane mask (0xFF per included participant) from group_mask();
+        without one, the whole pool is used.
+        """
+        sums = []
+        for column in self.columns:
+            if mask is not None:
+                column = (int.from_bytes(column, 'little') & mask).to_bytes(self.user_count, 'little')
+            sums.append(sum(column))
+        vector = [0] * self.team_count
+        for pos, team_id in enumerate(sorted(range(self.team_count), key=lambda team_id: (sums[team_id], team_id))):
+            vector[team_id] = min(pos, self.last)
+        return vector
+
+    def group_mask(self, labels, label):
+        table = bytearray(256)
+        table[label] = 0xFF
+        return int.from_bytes(labels.translate(table), 'little')
+
+    def assign(self, centers, metric='footrule'):
+        """
+        Index of every participant's nearest center (lowest index on ties), as bytes
+
+        Each lane holds distance << 3 | center, so the nearest center is a
+        lane-wise minimum, taken across all participants at once with a
+        guard bit at the top of every lane marking where one key is >= the
+        other. Up to 8 centers.
+        """
+        user_count = self.user_count
+        lane = 2 if (self.distance_bound(metric) << 3) + 7 < 2 ** 15 else 4
+        bits = 8 * lane
+        ones = int.from_bytes((b'\x01' + bytes(lane - 1)) * user_count, 'little')
+        guard = ones << (bits - 1)
+        lane_ones = (1 << bits) - 1
+        best = None
+        for label, center in enumerate(centers):
+            raw = self.block_distances([center], metric, lane)[0]
+            key = (int.from_bytes(raw, 'little') << 3) | (ones * label)
+            if best is None:
+                best = key
+                continue
+            # The guard bit survives the subtraction exactly in lanes where best >= key
+            take = ((((best | guard) - key) & guard) >> (bits - 1)) * lane_ones
+            best = (key & take) | (best & ~take)
+        low_bits = bytes(value & 7 for value in range(256))
+        return best.to_bytes(lane * user_count, 'little')[0::lane].translate(low_bits)
+
+    def cluster(self, k=None, metric='footrule', iterations=CLUSTER_ITERATIONS):
+        """
+        Group the pool into k clusters of similar rankings
+
+        k-medians style: centers start as the participant furthest from the
+        pool consensus plus, one at a time, whoever is furthest from every
+        center so far; then alternate between assigning everyone to their
+        nearest center and re-centering each group on its Borda ranking,
+        until the groups stop changing. Borda re-centering isn't guaranteed
+        to settle, so this also stops when an earlier assignment comes back
+        (a cycle) or after `iterations` rounds. Pools over CLUSTER_SAMPLE
+        participants are clustered on a sample first and then assigned and
+        re-centered once as a whole. Returns (labels, centers, converged): a
+        cluster index per participant as bytes, each center's position vector
+        and whether every participant is in the group of their nearest center.
+        """
+        user_count = self.user_count
+        k = min(k or cluster_count(user_count), user_count, 8)
+        if not k:
+            return b"", [], True
+        if user_count > CLUSTER_SAMPLE:
+            _, centers, converged = self.sample(CLUSTER_SAMPLE).cluster(k, metric, iterations)
+            labels = self.assign(centers, metric)
+            centers = self.recenter(labels, centers)
+            return labels, centers, converged and self.assign(centers, metric) == labels
+
+        # The most unusual ranking first, then each next one furthest from all centers so far
+        closest = self.distances(self.consensus_vector(), metric)
+        centers = []
+        while len(centers) < k:
+            furthest = max(range(user_count), key=closest.__getitem__)
+            centers.append(self.vector(furthest))
+            distances = self.distances(centers[-1], metric)
+            closest = distances if len(centers) == 1 else list(map(min, closest, distances))
+
+        labels = None
+        seen = set()
+        for _ in range(iterations):
+            new_labels = self.assign(centers, metric)
+            if new_labels == labels:
+                return labels, centers, True
+            if new_labels in seen:
+                break  # Cycling between assignments; it would never settle
+            seen.add(new_labels)
+            labels = new_labels
+            centers = self.recenter(labels, centers)
+        # Unsettled: at least put everyone with the nearest of the centers that are shown
+        return self.assign(centers, metric), centers, False
+
+    def recenter(self, labels, centers):
+        """Move each center to its group's Borda ranking (empty groups keep theirs)"""
+        return [self.consensus_vector(self.group_mask(labels, label)) if labels.count(label) else center
+                for label, center in enumerate(centers)]
+
+
+def summarize_clusters(index, labels, centers, metric='footrule'):
+    """
+    Clusters as dicts, largest first
+
+    Each has 'ranking' (the center's team names in order), 'members' (user
+    names, closest to the center first) and 'spread' (mean distance from
+    the center).
+    """
+    groups = [[] for _ in centers]
+    for user, label in enumerate(labels):
+        groups[label].append(user)
+    clusters = []
+    for center, members in zip(centers, groups):
+        if not members:
+            continue
+        distances = index.distances(center, metric)
+        members.sort(key=distances.__getitem__)
+        clusters.append({
+            'ranking': [index.team_names[team_id] for team_id in index.ranking(center)],
+            'members': [index.users[user] for user in members],
+            'spread': sum(distances[user] for user in members) / len(members)
+        })
+    clusters.sort(key=lambda cluster: -len(cluster['members']))
+    return clusters
+
+
+def analyze_pool(matrix, top=3, metric='footrule', workers=1, clusters=None):
+    """
+    Neighbours and clusters for the page
+
+    Returns {'metric', 'max_distance', 'neighbours', 'clusters', 'cluster_of',
+    'clusters_converged'} where neighbours maps each user to [(other user,
+    distance), ...] (None for pools over NEIGHBOUR_LIMIT), cluster_of maps
+    each user to the 1-based number of their cluster in the clusters list
+    and clusters_converged is False if the groups never settled.
+    """
+    index = SimilarityIndex(matrix)
+    neighbours = None
+    if index.user_count <= NEIGHBOUR_LIMIT:
+        nearest = index.nearest(top, metric, workers)
+        neighbours = {index.users[user]: [(index.users[other], distance) for distance, other in found]
+                      for user, found in enumerate(nearest)}
+
+    labels, centers, converged = index.cluster(clusters, metric)
+    summary = summarize_clusters(index, labels, centers, metric)
+    cluster_of = {user: number for number, cluster in enumerate(summary, 1) for user in cluster['members']}
+    return {
+        'metric': metric,
+        'max_distance': max_distance(index.team_count, metric),
+        'neighbours': neighbours,
+        'clusters': summary,
+        'cluster_of': cluster_of,
+        'clusters_converged': converged
+    }
+
+
+def similarity_percent(distance, maximum):
+    """How alike two rankings are, 100 for identical and 0 for reversed"""
+    if not maximum:
+        return 100.0
+    return round(max(0.0, 100 * (1 - distance / maximum)), 1)
+
+
+# Worker-process state for SimilarityIndex.nearest(workers=...)
+_worker_index = None
+
+
+def _set_worker_index(index):
+    global _worker_index
+    _worker_index = index
+
+
+def _worker_nearest_range(args):
+    return _worker_index.nearest_range(*args)
+
+
+if __name__ == '__main__':
+    from modules.bets_parser import load_bets
+
+    parser = argparse.ArgumentParser(description="Nearest neighbours and clusters of a prediction pool")
+    parser.add_argument('bets', nargs='?', default='bets')
+    parser.add_argument('--top', type=int, default=3)
+    parser.add_argument('--metric', choices=DISTANCE_METRICS, default='footrule')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--clusters', type=int)
+    args = parser.parse_args()
+
+    analysis = analyze_pool(load_bets(args.bets), args.top, args.metric, args.workers, args.clusters)
+    if not analysis['clusters_converged']:
+        print("! The groups did not settle; they are approximate")
+    for number, cluster in enumerate(analysis['clusters'], 1):
+        print(f"Group {number} ({len(cluster['members'])} participants, spread {cluster['spread']:.1f}): "
+              f"{', '.join(cluster['ranking'][:3])} ... {', '.join(cluster['ranking'][-2:])}")
+    if analysis['neighbours'] is not None:
+        for user, found in analysis['neighbours'].items():
+            alike = ', '.join(f"{other} ({similarity_percent(distance, analysis['max_distance'])}%)"
+                              for other, distance in found)
+            print(f"{user}: {alike}")
@@ -0,0 +1,322 @@
+import math
+import os
+import random
+import sys
+from array import array
+
+from modules.scoring import error_tables, max_possible_error
+
+# League-wide outcome rates used to shrink small samples early in the season
+PRIOR_RATES = (0.375, 0.25, 0.375)  # win, draw, loss
+PRIOR_MATCHES = 5
+
+# Approximation: the standings payload has no fixture list, so each team's
+# remaining points are drawn independently from its own W/D/L rates rather
+# than by playing the remaining matches. Results of teams that meet aren't
+# coupled (both can "win" their game against each other), which widens the
+# spread of simulated tables somewhat and so slightly overstates the chances
+# of unlikely finishes and of participants far behind.
+
+
+def team_stat(stats, *names, default=0):
+    """Return the first of several possible stat names present in a team's stats"""
+    for name in names:
+        if name in stats and stats[name] is not None:
+            try:
+                return float(stats[name])
+            except (TypeError, ValueError):
+                continue
+    return default
+
+
+def outcome_rates(stats):
+    """
+    Estimate a team's win/draw/loss probabilities from its stats so far
+
+    Uses W/D/L when the API provides them and otherwise derives wins and draws
+    from points, then shrinks towards PRIOR_RATES by PRIOR_MATCHES games.
+    """
+    gp = team_stat(stats, 'gp', 'played', 'matches')
+    wins = team_stat(stats, 'w', 'wins', 'won', default=None)
+    draws = team_stat(stats, 'd', 'draws', 'drawn', default=None)
+    if wins is None or draws is None:
+        points = team_stat(stats, 'points', 'pts', 'p')
+        draws = PRIOR_RATES[1] * gp
+        wins = max(0.0, min(gp - draws, (points - draws) / 3))
+    losses = max(0.0, gp - wins - draws)
+
+    total = gp + PRIOR_MATCHES
+    return tuple((observed + PRIOR_MATCHES * prior) / total
+                 for observed, prior in zip((wins, draws, losses), PRIOR_RATES))
+
+
+def points_distribution(rates, matches):
+    """Exact distribution of points gained over `matches` games (index = points)"""
+    p_win, p_draw, p_loss = rates
+    dist = [1.0]
+    for _ in range(matches):
+        step = [0.0] * (len(dist) + 3)
+        for points, p in enumerate(dist):
+            if p:
+                step[points] += p * p_loss
+                step[points + 1] += p * p_draw
+                step[points + 3] += p * p_win
+        dist = step
+    return dist
+
+
+def build_team_models(full_data, total_rounds=None):
+    """
+    Turn get_allsvenskan_standings.full_data into per-team simulation inputs
+
+    Returns a list (in standings order) of dicts with current points,
+    projected goal difference and the cumulative weights of the points still
+    to be gained.
+    """
+    team_count = len(full_data)
+    if total_rounds is None:
+        total_rounds = 2 * (team_count - 1)  # Everyone meets everyone home and away
+
+    models = []
+    for team in full_data:
+        stats = team.get('stats', {})
+        gp = int(team_stat(stats, 'gp', 'played', 'matches'))
+        remaining = max(0, total_rounds - gp)
+        gd = team_stat(stats, 'gd', 'goalDifference', 'diff')
+        dist = points_distribution(outcome_rates(stats), remaining)
+
+        cum_weights = []
+        running = 0.0
+        for p in dist:
+            running += p
+            cum_weights.append(running)
+
+        models.append({
+            'name': team.get('displayName', team.get('name', '')),
+            'points': int(team_stat(stats, 'points', 'pts', 'p')),
+            # Keep the current goal-difference rate as a tie-breaker
+            'gd': gd + (gd / gp * remaining if gp else 0.0),
+            'remaining': remaining,
+            'cum_weights': cum_weights
+        })
+    return models
+
+
+# Byte value -> 1 if its top bit is set: reads "lane >= 0" off the high byte of a biased 16-bit lane
+_HIGH_BIT = bytes(1 if value >= 0x80 else 0 for value in range(256))
+_FULL_BYTE = bytes(0xFF if value else 0 for value in range(256))
+
+
+class _Lanes:
+    """
+    Lane-wise arithmetic on per-season byte strings (one byte per simulated season)
+
+    Values are widened to 16-bit lanes of one big int and biased by 2**15,
+    so a comparison of every season at once is one addition, one
+    subtraction and a read of each lane's top bit.
+    """
+
+    def __init__(self, seasons):
+        self.seasons = seasons
+        self.ones = int.from_bytes(b"\x01\x00" * seasons, 'little')
+        self.bias = int.from_bytes(b"\x00\x80" * seasons, 'little')
+
+    def widen(self, lanes):
+        wide = bytearray(2 * self.seasons)
+        wide[0::2] = lanes
+        return int.from_bytes(wide, 'little')
+
+    def at_least(self, x, y, offset=0):
+        """1 in every season where lane x >= lane y + offset (x, y widened; lane gaps below 2**15)"""
+        diff = x + self.bias - y - offset * self.ones
+        return diff.to_bytes(2 * self.seasons, 'little')[1::2].translate(_HIGH_BIT)
+
+    def minimum(self, a, b):
+        """Season-wise minimum of two byte strings"""
+        take_b = int.from_bytes(self.at_least(self.widen(a), self.widen(b)).translate(_FULL_BYTE), 'little')
+        low = (int.from_bytes(b, 'little') & take_b) | (int.from_bytes(a, 'little') & ~take_b)
+        return low.to_bytes(self.seasons, 'little')
+
+    def select(self, mask, a, b):
+        """a where mask (0/1 bytes) is set, b elsewhere"""
+        take_a = int.from_bytes(mask.translate(_FULL_BYTE), 'little')
+        return ((int.from_bytes(a, 'little') & take_a) | (int.from_bytes(b, 'little') & ~take_a)).to_bytes(
+            self.seasons, 'little')
+
+
+def _tie_break_offset(model_above, model_below, above_first):
+    """
+    The smallest final-points lead over model_below for which model_above finishes ahead
+
+    Teams are ordered by points, then projected goal difference, then their
+    current standings order; the goal differences don't change during a
+    simulation, so this is fixed per pair of teams.
+    """
+    gd_gap = model_below['gd'] - model_above['gd']
+    lead = math.floor(gd_gap / 1000)
+    # Step to the exact boundary of the float key used for sorting (points * 1000 + gd)
+    while lead * 1000.0 + model_above['gd'] > model_below['gd'] or (
+            lead * 1000.0 + model_above['gd'] == model_below['gd'] and above_first):
+        lead -= 1
+    return lead + 1
+
+
+def _simulate_batch(args):
+    """
+    Run one batch of seasons in a worker and tally the pool outcomes
+
+    Everything is computed for all seasons of the batch at once, as byte
+    strings with one byte per season: every team's final points (one
+    random.choices draw per team), every team's final position (one
+    lane-wise comparison per pair of teams, summed), every participant's
+    error (one bytes.translate per predicted position, summed with big-int
+    additions) and from those the winners and top three (lane-wise minima).
+    There is no Python loop over seasons.
+    """
+    seed, simulations, models, data, width, user_count, team_index = args
+    rng = random.Random(seed)
+    team_count = len(models)
+    tables = error_tables(width)
+    lanes = _Lanes(simulations)
+
+    # Final points per team and season
+    final_points = []
+    for m in models:
+        samples = rng.choices(range(len(m['cum_weights'])), cum_weights=m['cum_weights'], k=simulations)
+        shift = bytes(min(255, m['points'] + gained) for gained in range(256))
+        final_points.append(lanes.widen(bytes(samples).translate(shift)))
+
+    # Final position per team and season: the number of teams that finish above it
+    positions = []
+    for t in range(team_count):
+        above = 0
+        for u in range(team_count):
+            if u != t:
+                lead = max(-1000, min(1000, _tie_break_offset(models[u], models[t], u < t)))
+                above += int.from_bytes(lanes.at_least(final_points[u], final_points[t], lead), 'little')
+        positions.append(above.to_bytes(simulations, 'little'))
+
+    # Every participant's total error per season
+    errors = []
+    for u in range(user_count):
+        total = 0
+        for p, team_id in enumerate(data[u * width:(u + 1) * width]):
+            t = team_index[team_id] if team_id < len(team_index) else None
+            if t is not None:
+                total += int.from_bytes(positions[t].translate(tables[p]), 'little')
+        errors.append(total.to_bytes(simulations, 'little'))
+    error_sums = [sum(user_errors) for user_errors in errors]
+
+    # Competition ranking: a user's rank is 1 + users with a strictly lower error
+    wide_errors = [lanes.widen(user_errors) for user_errors in errors]
+    best = errors[0]
+    for user_errors in errors[1:]:
+        best = lanes.minimum(best, user_errors)
+    wide_best = lanes.widen(best)
+    at_best = [int.from_bytes(lanes.at_least(wide_best, wide), 'little') for wide in wide_errors]
+    winners = sum(lanes.widen(mask.to_bytes(simulations, 'little')) for mask in at_best)
+
+    # A shared first place splits the win: tally the seasons with each number of winners separately
+    wins = [0.0] * user_count
+    counts = array('H', winners.to_bytes(2 * simulations, 'little'))
+    if sys.byteorder != 'little':
+        counts.byteswap()
+    for count in set(counts):
+        exactly = (int.from_bytes(lanes.at_least(winners, 0, count), 'little')
+                   - int.from_bytes(lanes.at_least(winners, 0, count + 1), 'little'))
+        for u, mask in enumerate(at_best):
+            wins[u] += (mask & exactly).to_bytes(simulations, 'little').count(1) / count
+
+    if user_count <= 3:
+        top3 = [simulations] * user_count
+    else:
+        # Users at the best error are in the top three; the next distinct error level is too while fewer
+        # than three users are ahead of it, and the level after that while fewer than three are ahead of it
+        threshold, level, ahead = best, wide_best, winners
+        for _ in range(2):
+            above = [lanes.at_least(wide, level, 1) for wide in wide_errors]
+            next_level = b"\xff" * simulations
+            for user_errors, user_above in zip(errors, above):
+                next_level = lanes.minimum(next_level, lanes.select(user_above, user_errors, next_level))
+            threshold = lanes.select(lanes.at_least(0, ahead, -2), next_level, threshold)
+            level = lanes.widen(next_level)
+            for wide, user_above in zip(wide_errors, above):
+                at_level = int.from_bytes(lanes.at_least(level, wide), 'little') & int.from_bytes(user_above, 'little')
+                ahead += lanes.widen(at_level.to_bytes(simulations, 'little'))
+        top3 = [lanes.at_least(lanes.widen(threshold), wide).count(1) for wide in wide_errors]
+    return error_sums, wins, top3
+
+
+def simulate_pool(matrix, full_data, team_registry=None, simulations=100000, workers=None,
+                  total_rounds=None, seed=None, batch_size=20000):
+    """
+    Simulate the rest of the season and report each participant's pool outlook
+
+    Args:
+        matrix: RankMatrix of predictions
+        full_data: get_allsvenskan_standings.full_data (standings order, with stats)
+        team_registry: TeamRegistry used to match prediction names to API names
+        simulations: Number of seasons to simulate
+        workers: Size of the process pool (default: CPU count, 1 runs in-process)
+
+    Returns:
+        {user: {'win_probability', 'top3_probability', 'expected_score', 'expected_error'}}
+    """
+    if not full_data or not len(matrix):
+        return {}
+
+    models = build_team_models(full_data, total_rounds)
+    width = matrix.width
+    user_count = len(matrix)
+    team_count = len(models)
+    max_error = max_possible_error(team_count)
+
+    # Each byte lane holds one user's total error (and one team's final points) for a season
+    if sum(max(p, team_count - 1 - p) for p in range(width)) > 255:
+        raise ValueError(f"Too many teams ({team_count}) for byte-lane scoring")
+    if max(m['points'] + len(m['cum_weights']) - 1 for m in models) > 255:
+        raise ValueError("Too many points for byte-lane simulation")
+
+    resolve = team_registry.canonical if team_registry is not None else (lambda name: name)
+    standings_index = {}
+    for t, model in enumerate(models):
+        standings_index.setdefault(resolve(model['name']), t)
+    team_index = [standings_index.get(resolve(name)) for name in matrix.team_names]
+
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    batches = []
+    remaining = simulations
+    while remaining > 0:
+        size = min(batch_size, remaining)
+        batches.append((seed + len(batches), size, models, bytes(matrix.data), width, user_count, team_index))
+        remaining -= size
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(batches) > 1:
+        from concurrent.futures import ProcessPoolExecutor  # Pulls in multiprocessing; only needed here
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(batches))) as pool:
+            results = list(pool.map(_simulate_batch, batches))
+    else:
+        results = [_simulate_batch(batch) for batch in batches]
+
+    error_sums = [0] * user_count
+    wins = [0.0] * user_count
+    top3 = [0] * user_count
+    for batch_errors, batch_wins, batch_top3 in results:
+        for u in range(user_count):
+            error_sums[u] += batch_errors[u]
+            wins[u] += batch_wins[u]
+            top3[u] += batch_top3[u]
+
+    outlook = {}
+    for u, user in enumerate(matrix.users):
+        expected_error = error_sums[u] / simulations
+        outlook[user] = {
+            'win_probability': wins[u] / simulations,
+            'top3_probability': top3[u] / simulations,
+            'expected_error': round(expected_error, 2),
+            'expected_score': round(max_error - expected_error, 1)
+        }
+    return outlook
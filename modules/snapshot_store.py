@@ -0,0 +1,197 @@
+import json
+import sqlite3
+import sys
+import time
+import zlib
+
+from modules.allsvenskan_scraper import calculate_prediction_scores, get_leaderboard, parse_standings
+from modules.build_manifest import hash_payload
+
+DEFAULT_HISTORY_PATH = "standings_history.sqlite"
+KEYFRAME_INTERVAL = 10  # Store the full table every N snapshots, deltas in between
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS teams (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    fetched_at REAL NOT NULL,
+    round INTEGER NOT NULL,
+    payload_hash TEXT NOT NULL UNIQUE,
+    keyframe INTEGER NOT NULL,
+    positions BLOB NOT NULL,
+    payload BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_round ON snapshots (round, fetched_at);
+CREATE INDEX IF NOT EXISTS snapshots_fetched_at ON snapshots (fetched_at);
+"""
+
+
+class SnapshotStore:
+    """
+    Append-only SQLite history of every distinct standings payload.
+
+    Each snapshot keeps the zlib-compressed payload plus the table order as
+    team IDs. Every KEYFRAME_INTERVAL-th snapshot stores the full order; the
+    others store only (team ID, new position) pairs for teams that moved
+    since the previous snapshot, so "standings as of round N" is one indexed
+    lookup plus at most KEYFRAME_INTERVAL small deltas.
+    """
+
+    def __init__(self, path=DEFAULT_HISTORY_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        self._team_ids = dict(self.conn.execute("SELECT name, id FROM teams"))
+        self._team_names = {team_id: name for name, team_id in self._team_ids.items()}
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _team_id(self, name):
+        team_id = self._team_ids.get(name)
+        if team_id is None:
+            team_id = self.conn.execute("INSERT INTO teams (name) VALUES (?)", (name,)).lastrowid
+            if team_id > 254:  # 255 marks a league-size change in deltas
+                raise ValueError("Snapshot store supports at most 254 teams")
+            self._team_ids[name] = team_id
+            self._team_names[team_id] = name
+        return team_id
+
+    def record(self, payload, fetched_at=None):
+        """
+        Store a payload unless an identical one is already recorded
+
+        Returns the new snapshot id, or None if nothing was added.
+        """
+        standings_data = parse_standings(payload) if isinstance(payload, dict) else []
+        if not standings_data:
+            return None
+
+        payload_hash = hash_payload(payload)
+        if self.conn.execute("SELECT 1 FROM snapshots WHERE payload_hash = ?", (payload_hash,)).fetchone():
+            return None
+
+        with self.conn:
+            order = bytes(self._team_id(team['displayName']) for team in standings_data)
+            round_played = max(int(team['stats'].get('gp', 0) or 0) for team in standings_data)
+
+            previous = self.conn.execute("SELECT id FROM snapshots ORDER BY id DESC LIMIT 1").fetchone()
+            since_keyframe = self.conn.execute(
+                "SELECT COUNT(*) FROM snapshots WHERE id > COALESCE((SELECT MAX(id) FROM snapshots WHERE keyframe = 1), 0)"
+            ).fetchone()[0]
+
+            keyframe = previous is None or since_keyframe + 1 >= KEYFRAME_INTERVAL
+            if keyframe:
+                positions = order
+            else:
+                previous_order = self._order_for(previous[0])
+                positions = encode_delta(previous_order, order)
+
+            blob = zlib.compress(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode('utf8'))
+            cursor = self.conn.execute(
+                "INSERT INTO snapshots (fetched_at, round, payload_hash, keyframe, positions, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (fetched_at or time.time(), round_played, payload_hash, int(keyframe), positions, blob)
+            )
+        return cursor.lastrowid
+
+    def _order_for(self, snapshot_id):
+        """Rebuild the table order (team IDs) of a snapshot from its keyframe and deltas"""
+        rows = self.conn.execute(
+            "SELECT keyframe, positions FROM snapshots "
+            "WHERE id <= ? AND id >= (SELECT MAX(id) FROM snapshots WHERE keyframe = 1 AND id <= ?) "
+            "ORDER BY id", (snapshot_id, snapshot_id)
+        ).fetchall()
+        order = b""
+        for keyframe, positions in rows:
+            order = bytes(positions) if keyframe else apply_delta(order, positions)
+        return order
+
+    def snapshot_for_round(self, round_number):
+        """Id of the latest snapshot taken with at most `round_number` rounds played"""
+        row = self.conn.execute(
+            "SELECT id FROM snapshots WHERE round <= ? ORDER BY round DESC, fetched_at DESC LIMIT 1",
+            (round_number,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def standings_as_of(self, round_number):
+        """Team names in table order as of a round, or [] if no snapshot is that old"""
+        snapshot_id = self.snapshot_for_round(round_number)
+        if snapshot_id is None:
+            return []
+        return [self._team_names[team_id] for team_id in self._order_for(snapshot_id)]
+
+    def payload(self, snapshot_id):
+        row = self.conn.execute("SELECT payload FROM snapshots WHERE id = ?", (snapshot_id,)).fetchone()
+        return json.loads(zlib.decompress(row[0]).decode('utf8')) if row else None
+
+    def rounds(self):
+        return [row[0] for row in self.conn.execute("SELECT DISTINCT round FROM snapshots ORDER BY round")]
+
+    def leaderboard_as_of(self, round_number, bets, team_registry=None):
+        """The get_leaderboard() result for the standings as of a round"""
+        standings = self.standings_as_of(round_number)
+        if not standings:
+            return []
+        return get_leaderboard(calculate_prediction_scores(bets, standings, team_registry))
+
+
+def encode_delta(previous_order, order):
+    """(team ID, new position) byte pairs for every team whose position changed"""
+    previous_positions = {team_id: pos for pos, team_id in enumerate(previous_order)}
+    delta = bytearray()
+    if len(previous_order) != len(order):
+        # League size changed; mark it with the new length so apply_delta can resize
+        delta += bytes([255, len(order)])
+    for pos, team_id in enumerate(order):
+        if previous_positions.get(team_id) != pos:
+            delta += bytes([team_id, pos])
+    return bytes(delta)
+
+
+def apply_delta(previous_order, delta):
+    order = bytearray(previous_order)
+    pairs = [(delta[i], delta[i + 1]) for i in range(0, len(delta), 2)]
+    if pairs and pairs[0][0] == 255:
+        size = pairs.pop(0)[1]
+        order = order[:size] + bytearray(max(0, size - len(order)))
+    for team_id, pos in pairs:
+        order[pos] = team_id
+    return bytes(order)
+
+
+def record_standings_snapshot(payload, path=DEFAULT_HISTORY_PATH):
+    """Append payload to the history at path; returns the new snapshot id or None"""
+    try:
+        with SnapshotStore(path) as store:
+            return store.record(payload)
+    except (sqlite3.Error, OSError, ValueError) as e:
+        print(f"! Could not record standings snapshot: {e}")
+        return None
+
+
+# Print the leaderboard as it stood after a given round
+if __name__ == '__main__':
+    from modules.bets_parser import load_bets
+    from modules.team_registry import load_team_registry
+
+    round_number = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    with SnapshotStore() as store:
+        snapshot_id = store.snapshot_for_round(round_number)
+        if snapshot_id is None:
+            print(f"No standings recorded for round {round_number} or earlier")
+            sys.exit(1)
+        registry = load_team_registry(store.payload(snapshot_id))
+        leaderboard = store.leaderboard_as_of(round_number, load_bets('bets'), registry)
+        for position, (user, score_data) in enumerate(leaderboard, 1):
+            print(f"{position}. {user}: {score_data['score']} pts")
@@ -0,0 +1,214 @@
+import hashlib
+import json
+import os
+import time
+
+from modules.metrics import metrics
+
+# requests is imported on first use: it takes longer to import than scoring a
+# whole pool, and only callers that actually go to the network need it
+
+STANDINGS_URL_TEMPLATE = "https://{host}/data-endpoint/statistics/standings/{season}/total"
+STANDINGS_URL = STANDINGS_URL_TEMPLATE.format(host="allsvenskan.se", season=2025)
+DEFAULT_CACHE_PATH = os.path.join(".cache", "standings.json")
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept": "application/json",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Cache-Control": "no-cache"
+}
+
+
+# Answers worth asking again for: rate limiting and server-side failures
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Longest Retry-After (seconds) honoured; a build shouldn't stall for longer
+MAX_RETRY_AFTER = 30
+
+
+def standings_url(league="Allsvenskan", season=2025):
+    """Standings endpoint for a league's own site (allsvenskan.se, superettan.se, ...)"""
+    return STANDINGS_URL_TEMPLATE.format(host=f"{league.lower()}.se", season=season)
+
+
+def cache_path_for(url):
+    """
+    On-disk cache file for an endpoint
+
+    The default endpoint keeps the original .cache/standings.json; any other
+    league or season gets its own file next to it.
+    """
+    if url == STANDINGS_URL:
+        return DEFAULT_CACHE_PATH
+    digest = hashlib.sha256(url.encode('utf8')).hexdigest()[:12]
+    return os.path.join(os.path.dirname(DEFAULT_CACHE_PATH), f"standings-{digest}.json")
+
+
+def create_session():
+    """A requests session with pooled keep-alive connections and the API headers"""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+
+class StandingsClient:
+    """
+    Fetches the standings payload once per run over a pooled HTTP session.
+
+    The last payload is kept in an on-disk cache together with its ETag and
+    Last-Modified headers. Within `ttl` seconds the cache is used as-is; after
+    that the endpoint is revalidated with If-None-Match / If-Modified-Since so
+    unchanged standings only cost a 304.
+
+    Connection errors, timeouts and RETRY_STATUSES answers are retried up to
+    `retries` times, waiting backoff, 2 × backoff, ... seconds in between
+    (or the server's Retry-After, up to MAX_RETRY_AFTER); only then does
+    the client fall back to the cache. self.retries counts the retries made.
+    """
+
+    def __init__(self, url=STANDINGS_URL, cache_path=DEFAULT_CACHE_PATH, ttl=60, timeout=10, session=None,
+                 retries=2, backoff=0.5):
+        self.url = url
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.timeout = timeout
+        self.session = session or create_session()
+        self.max_retries = retries
+        self.backoff = backoff
+        self.retries = 0
+        self._payload = None
+        self.last_status = None  # 'memory', 'cache', 'not-modified', 'fetched', 'stale' or 'error'
+
+    def _load_cache(self):
+        if not self.cache_path:
+            return None
+        try:
+            with open(self.cache_path, 'r', encoding='utf8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Ignore caches written for another endpoint (e.g. another season)
+        if cache.get('url') != self.url or 'payload' not in cache:
+            return None
+        return cache
+
+    def _save_cache(self, cache):
+        if not self.cache_path:
+            return
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf8') as f:
+            json.dump(cache, f, ensure_ascii=False)
+        os.replace(tmp_path, self.cache_path)
+
+    def _retry_delay(self, attempt, response=None):
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.strip().isdigit():
+            return min(int(retry_after), MAX_RETRY_AFTER)
+        return self.backoff * 2 ** attempt
+
+    def _get(self, headers):
+        """GET the endpoint, retrying transient failures; the last response or error is the result"""
+        import requests
+
+        attempt = 0
+        while True:
+            try:
+                response = self.session.get(self.url, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._retry_delay(attempt)
+            else:
+                metrics.add_http_bytes(len(response.content))
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                delay = self._retry_delay(attempt, response)
+            attempt += 1
+            self.retries += 1
+            if delay:
+                time.sleep(delay)
+
+    def fetch(self, force=False):
+        """
+        Return the standings payload, hitting the network at most once per client
+
+        Returns the cached payload if the endpoint can't be reached, or [] if
+        there's nothing cached either (same as the old get_full_data).
+        """
+        if self._payload is not None and not force:
+            self.last_status = 'memory'
+            return self._payload
+
+        cache = self._load_cache()
+        now = time.time()
+
+        if cache and not force and now - cache.get('fetched_at', 0) < self.ttl:
+            self.last_status = 'cache'
+            self._payload = cache['payload']
+            return self._payload
+
+        headers = {}
+        if cache:
+            if cache.get('etag'):
+                headers['If-None-Match'] = cache['etag']
+            if cache.get('last_modified'):
+                headers['If-Modified-Since'] = cache['last_modified']
+
+        from requests import RequestException
+
+        try:
+            response = self._get(headers)
+            if response.status_code == 304 and cache:
+                cache['fetched_at'] = now
+                self._save_cache(cache)
+                self.last_status = 'not-modified'
+                self._payload = cache['payload']
+                return self._payload
+
+            response.raise_for_status()
+            payload = response.json()
+            self._save_cache({
+                'url': self.url,
+                'fetched_at': now,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'payload': payload
+            })
+            self.last_status = 'fetched'
+            self._payload = payload
+            return self._payload
+        except (RequestException, ValueError, OSError) as e:
+            print(f"Error fetching Allsvenskan standings from API: {e}")
+
+        if cache:
+            print("! Using cached standings from a previous run")
+            self.last_status = 'stale'
+            self._payload = cache['payload']
+            return self._payload
+
+        self.last_status = 'error'
+        self._payload = []
+        return self._payload
+
+    def close(self):
+        self.session.close()
+
+
+_default_client = None
+
+
+def get_standings_client():
+    """Return the shared client used by get_full_data()"""
+    global _default_client
+    if _default_client is None:
+        _default_client = StandingsClient()
+    return _default_client
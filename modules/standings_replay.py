@@ -0,0 +1,327 @@
+"""
+Record/replay for the standings endpoint, and a local stand-in server.
+
+RecordingSession wraps a real requests session and saves every successful
+standings response to a fixture file; ReplaySession answers from those
+files without touching the network. Both plug into StandingsClient through
+its session argument. StandInServer serves the same fixtures over local
+HTTP with configurable latency, injected errors and ETag behaviour, so the
+whole fetch path (pooled session, conditional requests, stale fallback,
+concurrency) can be tested and benchmarked offline.
+
+Usage:
+    python -m modules.standings_replay record [--league Allsvenskan] [--season 2025] [--fixtures DIR]
+    python -m modules.standings_replay serve [--port 8765] [--latency 0.2] [--error-rate 0.1] [--etag strong]
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from modules.standings_client import DEFAULT_CACHE_PATH, create_session, standings_url
+
+FIXTURES_DIR = "fixtures"
+ETAG_MODES = ('strong', 'none', 'changing')
+
+# Response headers worth keeping in a fixture
+RECORDED_HEADERS = ('ETag', 'Last-Modified', 'Content-Type')
+
+
+def fixture_path(url, directory=FIXTURES_DIR):
+    """Fixture file for an endpoint: <directory>/standings-<url hash>.json"""
+    digest = hashlib.sha256(url.encode('utf8')).hexdigest()[:12]
+    return os.path.join(directory, f"standings-{digest}.json")
+
+
+def save_fixture(path, url, payload, headers=None):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fixture = {
+        'url': url,
+        'recorded_at': time.time(),
+        'headers': {name: headers[name] for name in RECORDED_HEADERS if headers and headers.get(name)},
+        'payload': payload
+    }
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf8') as f:
+        json.dump(fixture, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def load_fixture(path):
+    """
+    Read a fixture, or a StandingsClient cache file (.cache/standings.json) as one
+
+    Returns {'url', 'headers', 'payload'}.
+    """
+    with open(path, 'r', encoding='utf8') as f:
+        data = json.load(f)
+    if 'headers' not in data:
+        data['headers'] = {name: value for name, value in (('ETag', data.get('etag')),
+                                                           ('Last-Modified', data.get('last_modified'))) if value}
+    return data
+
+
+def load_fixtures(directory=FIXTURES_DIR):
+    """{url: fixture} for every fixture in directory"""
+    fixtures = {}
+    for path in sorted(glob.glob(os.path.join(directory, "standings-*.json"))):
+        fixture = load_fixture(path)
+        fixtures[fixture['url']] = fixture
+    return fixtures
+
+
+def fixture_body(fixture):
+    return json.dumps(fixture['payload'], ensure_ascii=False).encode('utf8')
+
+
+def make_response(url, status, body=b"", headers=None):
+    """A requests.Response built in memory, for the replay session"""
+    response = requests.Response()
+    response.url = url
+    response.status_code = status
+    response._content = body
+    response.headers = CaseInsensitiveDict(headers or {})
+    response.encoding = 'utf-8'
+    return response
+
+
+class RecordingSession:
+    """
+    A session that fetches for real and saves each 200 response as a fixture
+
+    Pass it to StandingsClient(session=...) to capture what a normal run sees.
+    """
+
+    def __init__(self, directory=FIXTURES_DIR, session=None):
+        self.directory = directory
+        self.session = session or create_session()
+        self.headers = self.session.headers
+        self.recorded = []  # fixture paths written, in order
+
+    def get(self, url, **kwargs):
+        response = self.session.get(url, **kwargs)
+        if response.status_code == 200:
+            path = fixture_path(url, self.directory)
+            save_fixture(path, url, response.json(), response.headers)
+            self.recorded.append(path)
+        return response
+
+    def close(self):
+        self.session.close()
+
+
+class ReplaySession:
+    """
+    A session that answers from fixtures and never touches the network
+
+    Conditional requests get a 304 when If-None-Match matches the recorded
+    ETag; an endpoint without a fixture raises ConnectionError, like being
+    offline, so the client's stale-cache fallback is exercised too.
+    """
+
+    def __init__(self, directory=FIXTURES_DIR, fixtures=None):
+        self.fixtures = fixtures if fixtures is not None else load_fixtures(directory)
+        self.headers = CaseInsensitiveDict()
+        self.calls = 0
+
+    def get(self, url, headers=None, **kwargs):
+        self.calls += 1
+        fixture = self.fixtures.get(url)
+        if fixture is None:
+            raise requests.ConnectionError(f"No recorded response for {url}")
+        etag = fixture['headers'].get('ETag')
+        if etag and (headers or {}).get('If-None-Match') == etag:
+            return make_response(url, 304, headers=fixture['headers'])
+        headers = {'Content-Type': 'application/json', **fixture['headers']}
+        return make_response(url, 200, fixture_body(fixture), headers)
+
+    def close(self):
+        pass
+
+
+class StandInServer:
+    """
+    Local HTTP server that plays the standings endpoint from fixtures
+
+    Fixtures are matched on the URL path, so a client pointed at
+    server.url_for(recorded_url) sees the recorded payload. Every response
+    waits latency seconds plus up to jitter more. The first fail_first
+    requests, and then a random error_rate share, get a 503. etag is one
+    of ETAG_MODES: 'strong' sends the recorded ETag (or a hash of the body)
+    and answers matching If-None-Match with 304, 'none' sends no validators,
+    'changing' sends a new ETag every time so nothing ever revalidates.
+
+    Use as a context manager; it serves from a background thread.
+    """
+
+    def __init__(self, fixtures, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 fail_first=0, etag='strong', seed=None):
+        if etag not in ETAG_MODES:
+            raise ValueError(f"Unknown ETag mode '{etag}' (available: {', '.join(ETAG_MODES)})")
+        self.routes = {}
+        for url, fixture in fixtures.items():
+            body = fixture_body(fixture)
+            tag = fixture['headers'].get('ETag') or f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+            self.routes[urlsplit(url).path] = (body, tag, fixture['headers'].get('Last-Modified'))
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.fail_first = fail_first
+        self.etag = etag
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'ok': 0, 'not_modified': 0, 'errors': 0, 'not_found': 0}
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url_for(self, url):
+        """The local address serving a recorded endpoint"""
+        return self.url + urlsplit(url).path
+
+    def reset_stats(self):
+        with self.lock:
+            self.stats = dict.fromkeys(self.stats, 0)
+
+    def _count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def _plan(self):
+        """(delay, fail, request number) for the next request"""
+        with self.lock:
+            self.stats['requests'] += 1
+            number = self.stats['requests']
+            delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+            fail = number <= self.fail_first or (self.error_rate and self.random.random() < self.error_rate)
+        return delay, fail, number
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                delay, fail, number = server._plan()
+                if delay:
+                    time.sleep(delay)
+                route = server.routes.get(urlsplit(self.path).path)
+                if fail:
+                    server._count('errors')
+                    self._reply(503, b"Service Unavailable")
+                elif route is None:
+                    server._count('not_found')
+                    self._reply(404, b"Not Found")
+                else:
+                    self._serve(route, number)
+
+            def _serve(self, route, number):
+                body, tag, last_modified = route
+                headers = {'Content-Type': 'application/json'}
+                if server.etag == 'changing':
+                    headers['ETag'] = f'"{number}-{tag.strip(chr(34))}"'
+                elif server.etag == 'strong':
+                    headers['ETag'] = tag
+                    if last_modified:
+                        headers['Last-Modified'] = last_modified
+                    if self.headers.get('If-None-Match') == tag:
+                        server._count('not_modified')
+                        self._reply(304, b"", headers)
+                        return
+                server._count('ok')
+                self._reply(200, body, headers)
+
+            def _reply(self, status, body, headers=None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep benchmark and test output clean
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread:
+            self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record standings fixtures or serve them locally.")
+    parser.add_argument('command', choices=['record', 'serve'])
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help="Fixture directory")
+    parser.add_argument('--league', default='Allsvenskan')
+    parser.add_argument('--season', type=int, default=2025)
+    parser.add_argument('--from-cache', action='store_true',
+                        help=f"Record the payload already in {DEFAULT_CACHE_PATH} instead of fetching")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Up to this many extra random seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of requests answered with 503")
+    parser.add_argument('--fail-first', type=int, default=0, help="Answer the first N requests with 503")
+    parser.add_argument('--etag', choices=ETAG_MODES, default='strong')
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        if args.from_cache:
+            cache = load_fixture(DEFAULT_CACHE_PATH)
+            path = fixture_path(cache['url'], args.fixtures)
+            save_fixture(path, cache['url'], cache['payload'], cache['headers'])
+        else:
+            url = standings_url(args.league, args.season)
+            session = RecordingSession(args.fixtures)
+            response = session.get(url, timeout=10)
+            session.close()
+            if not session.recorded:
+                raise SystemExit(f"! {url} answered {response.status_code}, nothing recorded")
+            path = session.recorded[0]
+        print(f"✓ Recorded {path}")
+        return
+
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        raise SystemExit(f"! No fixtures in {args.fixtures}; run the record command first")
+    server = StandInServer(fixtures, port=args.port, latency=args.latency, jitter=args.jitter,
+                           error_rate=args.error_rate, fail_first=args.fail_first, etag=args.etag)
+    with server:
+        for url in fixtures:
+            print(f"✓ Serving {url} at {server.url_for(url)}")
+        try:
+            server.thread.join()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+import hashlib
+import json
+import os
+import unicodedata
+
+DEFAULT_REGISTRY_PATH = os.path.join(".cache", "team_registry.json")
+
+
+def create_manual_team_mapping():
+    """Create a manual mapping for teams that might be difficult to match automatically"""
+    mapping = {
+        # Your prediction team name: API team name
+        "Malmö": "Malmö FF",
+        "Malmö FF": "Malmö FF",
+        "MFF": "Malmö FF",
+        "AIK": "AIK",
+        "Djurgården": "Djurgården",
+        "DIF": "Djurgården",
+        "Hammarby": "Hammarby",
+        "Bajen": "Hammarby",
+        "IFK Göteborg": "IFK Göteborg",
+        "Göteborg": "IFK Göteborg",
+        "Blåvitt": "IFK Göteborg",
+        "Häcken": "BK Häcken",
+        "BK Häcken": "BK Häcken",
+        "Elfsborg": "IF Elfsborg",
+        "IF Elfsborg": "IF Elfsborg",
+        "IFK Norrköping": "IFK Norrköping",
+        "Peking": "IFK Norrköping",
+        "Värnamo": "IFK Värnamo",
+        "IFK Värnamo": "IFK Värnamo",
+        "Sirius": "IK Sirius",
+        "IK Sirius": "IK Sirius",
+        "Mjällby": "Mjällby AIF",
+        "Mjällby AIF": "Mjällby AIF",
+        "MAIF": "Mjällby AIF",
+        "BP": "BP",
+        "Brommapojkarna": "BP",
+        "Degerfors": "Degerfors IF",
+        "Degerfors IF": "Degerfors IF",
+        "Halmstad": "Halmstads BK",
+        "Halmstads BK": "Halmstads BK",
+        "HBK": "Halmstads BK",
+        "GAIS": "GAIS",
+        "Gais": "GAIS",
+        "Öster": "Östers IF",
+        "Östers IF": "Östers IF",
+        "Östers": "Östers IF"
+    }
+    return mapping
+
+
+def normalize_team_key(name):
+    """Fold case, diacritics and whitespace so 'Malmö  FF' and 'malmo ff' match"""
+    decomposed = unicodedata.normalize('NFKD', str(name).casefold())
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(stripped.split())
+
+
+def iter_api_teams(api_data):
+    """Yield the team entries of a standings payload, skipping the 'undefined' key"""
+    if not isinstance(api_data, dict):
+        return
+    for key, team_info in api_data.items():
+        if key == 'undefined' or not key.isdigit():
+            continue
+        yield team_info
+
+
+class TeamRegistry:
+    """
+    Canonical team names and every alias that resolves to them.
+
+    Canonical names are the API's displayName. Aliases (the API's name and
+    abbrv, the manual mapping, and any fuzzy matches found on the way) are
+    stored under their normalized key, so resolve() is a single dict lookup.
+    """
+
+    def __init__(self):
+        self.teams = {}    # canonical name -> team info (full_name, abbreviation, logo_url)
+        self.aliases = {}  # normalized key -> canonical name
+        self.fingerprint = None
+        self.dirty = False
+
+    def add_team(self, name, full_name='', abbreviation='', logo_url=''):
+        self.teams[name] = {
+            'name': name,
+            'full_name': full_name,
+            'abbreviation': abbreviation,
+            'logo_url': logo_url
+        }
+        for alias in (abbreviation, full_name, name):
+            if alias:
+                self.aliases[normalize_team_key(alias)] = name
+
+    def add_alias(self, alias, canonical):
+        self.aliases[normalize_team_key(alias)] = canonical
+
+    def _fuzzy_match(self, key):
+        """The old substring/abbreviation matching, only used on lookup misses"""
+        for team in self.teams.values():
+            name_key = normalize_team_key(team['name'])
+            if key in name_key or key in normalize_team_key(team['full_name']):
+                return team['name']
+            if name_key in key or normalize_team_key(team['abbreviation']) == key:
+                return team['name']
+        return None
+
+    def resolve(self, name):
+        """Return the canonical name for a team name or alias, or None if unknown"""
+        key = normalize_team_key(name)
+        canonical = self.aliases.get(key)
+        if canonical is None and key:
+            canonical = self._fuzzy_match(key)
+            if canonical is not None:
+                # Remember the match so it's a direct hit next time (and next run)
+                self.aliases[key] = canonical
+                self.dirty = True
+        return canonical
+
+    def canonical(self, name):
+        """Like resolve() but falls back to the name itself"""
+        return self.resolve(name) or name
+
+    def logo_url(self, name):
+        canonical = self.resolve(name)
+        if canonical is None or canonical not in self.teams:
+            return ''
+        return self.teams[canonical]['logo_url']
+
+    def to_dict(self):
+        return {'fingerprint': self.fingerprint, 'teams': self.teams, 'aliases': self.aliases}
+
+    @classmethod
+    def from_dict(cls, data):
+        registry = cls()
+        registry.fingerprint = data.get('fingerprint')
+        registry.teams = data.get('teams', {})
+        registry.aliases = data.get('aliases', {})
+        return registry
+
+    @classmethod
+    def build(cls, api_data, manual_mapping=None):
+        """Build the registry from a standings payload plus the manual mapping"""
+        if manual_mapping is None:
+            manual_mapping = create_manual_team_mapping()
+
+        registry = cls()
+        registry.fingerprint = registry_fingerprint(api_data, manual_mapping)
+        for team_info in iter_api_teams(api_data):
+            display_name = team_info.get('displayName') or team_info.get('name', '')
+            if display_name:
+                registry.add_team(display_name,
+                                  full_name=team_info.get('name', ''),
+                                  abbreviation=team_info.get('abbrv', ''),
+                                  logo_url=team_info.get('logoImageUrl', ''))
+
+        # Manual aliases take priority over the API abbreviations
+        for alias, api_name in manual_mapping.items():
+            canonical = registry.aliases.get(normalize_team_key(api_name))
+            if canonical is None:
+                if registry.teams:
+                    # The API doesn't know this name; leave it to fuzzy matching
+                    continue
+                canonical = api_name
+            registry.add_alias(alias, canonical)
+
+        # A canonical name always resolves to itself
+        for name in registry.teams:
+            registry.add_alias(name, name)
+        return registry
+
+
+def registry_fingerprint(api_data, manual_mapping):
+    """Hash the inputs the registry is built from"""
+    api_teams = sorted(
+        (t.get('displayName', ''), t.get('name', ''), t.get('abbrv', ''), t.get('logoImageUrl', ''))
+        for t in iter_api_teams(api_data)
+    )
+    blob = json.dumps([api_teams, sorted(manual_mapping.items())], ensure_ascii=False)
+    return hashlib.sha1(blob.encode('utf8')).hexdigest()
+
+
+def save_team_registry(registry, path=DEFAULT_REGISTRY_PATH):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf8') as f:
+        json.dump(registry.to_dict(), f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    registry.dirty = False
+
+
+def load_team_registry(api_data, path=DEFAULT_REGISTRY_PATH, manual_mapping=None):
+    """
+    Return the team registry for api_data, reusing the copy on disk if it is current
+
+    If the API payload is unavailable the last saved registry is used as-is.
+    """
+    if manual_mapping is None:
+        manual_mapping = create_manual_team_mapping()
+
+    cached = None
+    if path:
+        try:
+            with open(path, 'r', encoding='utf8') as f:
+                cached = TeamRegistry.from_dict(json.load(f))
+        except (OSError, ValueError):
+            cached = None
+
+    has_api_teams = any(True for _ in iter_api_teams(api_data))
+    if cached is not None:
+        if not has_api_teams or cached.fingerprint == registry_fingerprint(api_data, manual_mapping):
+            return cached
+
+    registry = TeamRegistry.build(api_data, manual_mapping)
+    if path and has_api_teams:
+        try:
+            save_team_registry(registry, path)
+        except OSError as e:
+            print(f"! Could not save team registry: {e}")
+    return registry
@@ -0,0 +1,179 @@
+"""
+Keep a pool's page up to date from one long-running process.
+
+A cron job running stats.py pays for interpreter start-up, imports, parsing
+the bets, matching logos and every statistic on each update. PoolWatcher
+keeps all of that in memory instead: it polls the bets file's stat (size,
+mtime, inode; a cheap stand-in for inotify that works everywhere) and only
+re-reads it when the content hash changed, revalidates the standings on a
+schedule with a conditional request, and then redoes just the stages that
+depend on what changed before writing the page again.
+
+Usage: python -m modules.watch [--interval 0.5] [--standings-interval 60] [--simulate] [--once]
+       (or python stats.py --watch)
+"""
+import argparse
+import os
+import time
+
+from modules.build_manifest import collect_build_inputs, hash_file, hash_payload
+from modules.metrics import span
+from modules.page import generate_enhanced_standings_table
+from modules.pipeline import (analyze_bets, build_options, match_logos, pool_config, pool_path, score_standings,
+                              validate_config, write_pool)
+from modules.scoring import IncrementalLeaderboard
+from modules.snapshot_store import DEFAULT_HISTORY_PATH, record_standings_snapshot
+from modules.standings_client import StandingsClient, cache_path_for
+from modules.team_registry import load_team_registry, save_team_registry
+
+
+def file_signature(path):
+    """(size, mtime, inode) of path, or None if it doesn't exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns, stat.st_ino
+
+
+class PoolWatcher:
+    """
+    One pool's build state, refreshed in place when its inputs change.
+
+    The bets analysis (matrix, consensus, histogram, fun stats, similarity,
+    README) is redone only when the bets file's content changes; the team
+    registry only when the standings payload does; the consensus table HTML
+    is kept until the bets or the matched logos change. Scoring against the
+    standings and writing the page run whenever either input changed; new
+    standings only rescore the participants who predicted a team that moved.
+    """
+
+    def __init__(self, config, client=None, standings_interval=60):
+        validate_config(config)
+        self.config = config
+        self.client = client or StandingsClient(url=config['url'], cache_path=cache_path_for(config['url']))
+        self.standings_interval = standings_interval
+        self.bets_signature = None
+        self.bets_digest = None
+        self.payload = None
+        self.payload_digest = None
+        self.next_poll = 0.0
+        self.analysis = None
+        self.team_registry = None
+        self.team_logos = None
+        self.logo_assets = None
+        self.consensus_table = None
+        self.leaderboard = None
+
+    def _bets_changed(self):
+        signature = file_signature(self.config['bets'])
+        if signature == self.bets_signature:
+            return False
+        self.bets_signature = signature
+        digest = hash_file(self.config['bets'])
+        if digest == self.bets_digest:
+            return False  # Touched or rewritten with the same content
+        self.bets_digest = digest
+        return True
+
+    def _standings_changed(self, now, force=False):
+        if not force and now < self.next_poll:
+            return False
+        self.next_poll = now + self.standings_interval
+        with span('api_fetch'):
+            payload = self.client.fetch(force=True)  # A 304 when nothing changed upstream
+        digest = hash_payload(payload)
+        if digest == self.payload_digest:
+            return False
+        self.payload, self.payload_digest = payload, digest
+        return True
+
+    def refresh(self, force_standings=False):
+        """
+        Rebuild whatever the changed inputs affect
+
+        Returns the set of inputs that changed ('bets', 'standings'); empty
+        if nothing had to be written.
+        """
+        changed = set()
+        if self._bets_changed() or self.analysis is None:
+            changed.add('bets')
+        if self._standings_changed(time.monotonic(), force_standings) or self.payload is None:
+            changed.add('standings')
+        if not changed:
+            return changed
+
+        config = self.config
+        if 'standings' in changed:
+            with span('snapshot'):
+                if record_standings_snapshot(self.payload, pool_path(config, DEFAULT_HISTORY_PATH)) is not None:
+                    print("✓ Recorded new standings snapshot")
+            with span('registry_load'):
+                self.team_registry = load_team_registry(self.payload)
+        if 'bets' in changed:
+            self.analysis = analyze_bets(config)
+            self.leaderboard = IncrementalLeaderboard(self.analysis['bets_matrix'])
+
+        team_logos, self.logo_assets = match_logos(self.analysis, self.team_registry, config['logos'])
+        if 'bets' in changed or team_logos != self.team_logos:
+            self.team_logos = team_logos
+            with span('consensus_table'):
+                analysis = self.analysis
+                self.consensus_table = generate_enhanced_standings_table(
+                    analysis['sorted_consensus'], analysis['bets'], team_logos, analysis['histogram'],
+                    analysis['bets_matrix'].team_ids)
+
+        scored = score_standings(config, self.analysis, self.payload, self.team_registry, self.leaderboard)
+        if self.team_registry.dirty and self.team_registry.teams:
+            save_team_registry(self.team_registry)
+
+        with span('manifest_check'):
+            build_inputs = collect_build_inputs(config['bets'], self.payload, build_options(config))
+        write_pool(config, self.analysis, self.team_logos, scored, build_inputs, self.consensus_table,
+                   self.logo_assets)
+        return changed
+
+    def run(self, interval=0.5, once=False):
+        """Refresh every interval seconds until interrupted (or just once)"""
+        while True:
+            start = time.perf_counter()
+            try:
+                changed = self.refresh()
+            except Exception as e:
+                # A half-written bets file or a network hiccup shouldn't stop the daemon
+                print(f"! Update failed, keeping the last page: {e}")
+                # Start from scratch next time: re-read the bets and re-poll the standings
+                self.bets_signature = self.bets_digest = self.payload_digest = None
+                self.next_poll = 0.0
+            else:
+                if changed:
+                    elapsed = (time.perf_counter() - start) * 1000
+                    print(f"✓ Rebuilt for {' and '.join(sorted(changed))} changes in {elapsed:.0f} ms")
+            if once:
+                return
+            time.sleep(interval)
+
+
+def watch_pool(config, interval=0.5, standings_interval=60, once=False):
+    watcher = PoolWatcher(config, standings_interval=standings_interval)
+    print(f"Watching {config['bets']} and the {config['league']} standings (Ctrl+C to stop)...")
+    try:
+        watcher.run(interval, once)
+    except KeyboardInterrupt:
+        print("✓ Stopped watching")
+    finally:
+        watcher.client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the pool page whenever the bets or standings change.")
+    parser.add_argument('--interval', type=float, default=0.5, help="Seconds between bets file checks")
+    parser.add_argument('--standings-interval', type=float, default=60, help="Seconds between standings polls")
+    parser.add_argument('--simulate', action='store_true', help="Include the season simulation")
+    parser.add_argument('--once', action='store_true', help="Build once and exit")
+    args = parser.parse_args()
+    watch_pool(pool_config(simulate=args.simulate), args.interval, args.standings_interval, args.once)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Best-case scores and elimination against enumerating every reachable final table.
+"""
+import random
+from itertools import permutations
+
+from modules.elimination import LEADER_CANDIDATES, best_case_scores, position_bounds
+from modules.rank_matrix import RankMatrix
+from modules.scoring import max_possible_error
+
+TEAMS = ["A", "B", "C", "D", "E", "F", "G"]
+
+
+def random_table(rng, rounds_left):
+    """full_data-like standings after a random season so far, sorted by points"""
+    played = 2 * (len(TEAMS) - 1) - rounds_left
+    points = sorted((rng.randint(0, 3 * played) for _ in TEAMS), reverse=True)
+    return [{'displayName': team, 'stats': {'gp': played, 'points': points[pos]}}
+            for pos, team in enumerate(TEAMS)]
+
+
+def reachable_tables(full_data):
+    """Every order of the current standings (finals[current pos] = final pos) the bounds allow"""
+    bounds = position_bounds(full_data)
+    return [finals for finals in permutations(range(len(full_data)))
+            if all(low <= final <= high for final, (low, high) in zip(finals, bounds))]
+
+
+def error(ranking, finals):
+    return sum(abs(pos - finals[TEAMS.index(team)]) for pos, team in enumerate(ranking))
+
+
+def test_best_case_scores_match_enumeration():
+    rng = random.Random(6)
+    for _ in range(40):
+        full_data = random_table(rng, rng.randint(1, 3))
+        bets = {f"User {index}": rng.sample(TEAMS, len(TEAMS)) for index in range(rng.randint(2, 8))}
+        tables = reachable_tables(full_data)
+        results = best_case_scores(RankMatrix.from_bets(bets), TEAMS, full_data)
+
+        max_error = max_possible_error(len(TEAMS))
+        errors = {user: [error(ranking, finals) for finals in tables] for user, ranking in bets.items()}
+        current = {user: error(ranking, range(len(TEAMS))) for user, ranking in bets.items()}
+        users = list(bets)
+        candidates = sorted(users, key=lambda user: (current[user], users.index(user)))[:LEADER_CANDIDATES]
+        leader = min(candidates, key=lambda user: (max(errors[user]), users.index(user)))
+        for user in users:
+            assert results[user]['best_error'] == min(errors[user])
+            assert results[user]['best_score'] == max_error - min(errors[user])
+            beaten = user != leader and all(mine > theirs for mine, theirs in zip(errors[user], errors[leader]))
+            assert results[user]['eliminated'] == beaten, user
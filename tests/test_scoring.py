@@ -0,0 +1,140 @@
+"""
+Regression tests for the byte-lane scoring engines against plain per-user loops.
+
+The lane arithmetic fails silently (a carry into the next user's lane, a
+table one position short), so every engine is checked against the obvious
+O(users × teams) implementation on random pools, including pools with
+predictions for teams that aren't in the standings.
+"""
+import random
+
+from modules.allsvenskan_scraper import get_leaderboard
+from modules.rank_matrix import RankMatrix
+from modules.scoring import IncrementalLeaderboard, max_possible_error, score_rank_matrix
+from modules.scoring_metrics import SCORING_METRICS, lane_sums
+
+TEAMS = [f"Team {i}" for i in range(16)]
+
+
+def random_bets(rng, users, teams=TEAMS, extra=()):
+    """{user: ranking}; rankings may swap in teams from extra that aren't in the standings"""
+    bets = {}
+    for index in range(users):
+        ranking = rng.sample(list(teams), len(teams))
+        for pos in range(len(ranking)):
+            if extra and rng.random() < 0.1:
+                ranking[pos] = rng.choice(extra)
+        bets[f"User {index}"] = list(dict.fromkeys(ranking))
+    return bets
+
+
+def reference_scores(bets, actual_results):
+    """The original per-user loop: absolute position errors, skipping unknown teams"""
+    max_error = max_possible_error(len(actual_results))
+    scores = {}
+    for user, predictions in bets.items():
+        errors = {}
+        for predicted_pos, team in enumerate(predictions):
+            if team in actual_results:
+                actual_pos = actual_results.index(team)
+                errors[team] = {'predicted': predicted_pos + 1, 'actual': actual_pos + 1,
+                                'error': abs(predicted_pos - actual_pos)}
+        total_error = sum(details['error'] for details in errors.values())
+        scores[user] = {
+            'score': max_error - total_error,
+            'max_possible': max_error,
+            'raw_error': total_error,
+            'percent': round(((max_error - total_error) / max_error) * 100, 1),
+            'best_prediction': min(errors.items(), key=lambda x: x[1]['error']) if errors else None,
+            'worst_prediction': max(errors.items(), key=lambda x: x[1]['error']) if errors else None
+        }
+    return scores
+
+
+def test_score_rank_matrix_matches_per_user_loop():
+    rng = random.Random(1)
+    for _ in range(50):
+        bets = random_bets(rng, rng.randint(1, 40), extra=["Relegated", "Promoted"])
+        actual_results = rng.sample(TEAMS, len(TEAMS))
+        matrix = RankMatrix.from_bets(bets)
+        assert score_rank_matrix(matrix, actual_results) == reference_scores(bets, actual_results)
+
+
+def test_score_rank_matrix_short_rankings():
+    bets = {"Empty": [], "One": ["Team 3"], "Unknown": ["Nobody"], "Full": TEAMS[::-1]}
+    actual_results = TEAMS[:]
+    scores = score_rank_matrix(RankMatrix.from_bets(bets), actual_results)
+    assert scores == reference_scores(bets, actual_results)
+    assert scores["Full"]['score'] == 0
+
+
+def test_rank_matrix_round_trip_and_resize():
+    rng = random.Random(2)
+    bets = random_bets(rng, 30)
+    matrix = RankMatrix(width=4)
+    for user, ranking in bets.items():
+        matrix.add_row(user, ranking)
+    assert matrix.width == len(TEAMS)
+    assert matrix.to_dict() == bets
+
+
+def test_lane_sums_at_lane_boundaries():
+    rng = random.Random(3)
+    for value, count in ((255, 1), (1, 255), (255, 2), (255, 257), (255, 300)):
+        users = 7
+        columns = [bytes(rng.choice((0, value)) if user else value for user in range(users))
+                   for _ in range(count)]
+        expected = [sum(column[user] for column in columns) for user in range(users)]
+        assert lane_sums(iter(columns), users, value * count) == expected
+
+
+def test_incremental_leaderboard_matches_full_rescore():
+    rng = random.Random(4)
+    metrics = ['squared_error', 'zone_hits']
+    for trial in range(60):
+        bets = random_bets(rng, rng.randint(1, 30), extra=["Relegated"])
+        if bets and rng.random() < 0.5:
+            # A row that lists a team twice
+            ranking = next(iter(bets.values()))
+            ranking[1] = ranking[0]
+        matrix = RankMatrix.from_bets(bets)
+        standings = TEAMS[:]
+        board = IncrementalLeaderboard(matrix, standings)
+        for step in range(8):
+            if step == 5:
+                standings = rng.sample(TEAMS, 14)
+            elif rng.random() < 0.3:
+                standings = rng.sample(standings, len(standings))
+            else:
+                i, j = rng.randrange(len(standings)), rng.randrange(len(standings))
+                standings[i], standings[j] = standings[j], standings[i]
+            board.apply_standings(standings)
+            full = score_rank_matrix(matrix, standings, metrics=metrics, kendall=True)
+            assert board.scores(metrics, kendall=True) == full
+            assert [user for user, _ in board.leaderboard()] == [user for user, _ in get_leaderboard(full)]
+
+
+def test_metric_totals_match_per_user_sums_beyond_a_byte():
+    rng = random.Random(5)
+    teams = [f"Team {i}" for i in range(20)]  # 19² and 19·20 don't fit in a byte
+    bets = random_bets(rng, 25, teams=teams)
+    actual_results = rng.sample(teams, len(teams))
+    scores = score_rank_matrix(RankMatrix.from_bets(bets), actual_results, metrics=list(SCORING_METRICS))
+    for user, ranking in bets.items():
+        for name, metric in SCORING_METRICS.items():
+            expected = sum(metric.cell(pos, actual_results.index(team), len(teams)) for pos, team in enumerate(ranking))
+            assert scores[user]['metrics'][name] == expected
+
+
+def test_kendall_distances_match_pair_count():
+    rng = random.Random(7)
+    for _ in range(40):
+        bets = random_bets(rng, rng.randint(1, 30), extra=["Relegated", "Promoted"])
+        actual_results = rng.sample(TEAMS, rng.choice((12, 16)))
+        scores = score_rank_matrix(RankMatrix.from_bets(bets), actual_results, kendall=True)
+        for user, ranking in bets.items():
+            ranked = [actual_results.index(team) for team in ranking if team in actual_results]
+            pairs = [(a, b) for i, a in enumerate(ranked) for b in ranked[i + 1:]]
+            discordant = sum(1 for a, b in pairs if a > b)
+            assert scores[user]['discordant_pairs'] == discordant
+            assert scores[user]['kendall_tau'] == (round(1 - 2 * discordant / len(pairs), 3) if pairs else None)
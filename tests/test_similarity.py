@@ -0,0 +1,57 @@
+"""
+Lane-wise similarity distances and nearest neighbours against brute force.
+"""
+import random
+
+from modules.rank_matrix import RankMatrix
+from modules.similarity import DISTANCE_METRICS, SimilarityIndex
+
+TEAMS = [f"Team {i}" for i in range(12)]
+
+
+def position_vector(matrix, index):
+    """A team's first position in the row, or the last position if it's left out"""
+    row = list(matrix.row(index))
+    last = matrix.width - 1
+    return [row.index(team_id) if team_id in row else last for team_id in range(len(matrix.team_names))]
+
+
+def test_nearest_matches_brute_force():
+    rng = random.Random(8)
+    for _ in range(20):
+        bets = {}
+        for index in range(rng.randint(2, 60)):
+            ranking = rng.sample(TEAMS, len(TEAMS))
+            if rng.random() < 0.1:
+                ranking[2] = ranking[0]  # A team listed twice
+            if rng.random() < 0.1:
+                ranking = ranking[:9]
+            bets[f"User {index}"] = ranking
+        matrix = RankMatrix.from_bets(bets)
+        index = SimilarityIndex(matrix)
+        vectors = [position_vector(matrix, user) for user in range(len(matrix))]
+        for metric, cell in DISTANCE_METRICS.items():
+            for user, vector in enumerate(vectors):
+                expected = [sum(cell(a, b) for a, b in zip(vector, other)) for other in vectors]
+                assert index.distances(vector, metric) == expected
+            nearest = index.nearest(k=3, metric=metric, block_size=7)
+            for user, vector in enumerate(vectors):
+                distances = [(sum(cell(a, b) for a, b in zip(vector, other)), other_user)
+                             for other_user, other in enumerate(vectors) if other_user != user]
+                assert nearest[user] == sorted(distances)[:3]
+
+
+def test_assign_picks_the_nearest_center():
+    rng = random.Random(9)
+    for _ in range(20):
+        bets = {f"User {index}": rng.sample(TEAMS, len(TEAMS)) for index in range(rng.randint(1, 80))}
+        matrix = RankMatrix.from_bets(bets)
+        index = SimilarityIndex(matrix)
+        vectors = [position_vector(matrix, user) for user in range(len(matrix))]
+        centers = [index.vector(rng.randrange(len(matrix))) for _ in range(rng.randint(1, 8))]
+        for metric, cell in DISTANCE_METRICS.items():
+            expected = bytes(min(range(len(centers)), key=lambda label: (
+                sum(cell(a, b) for a, b in zip(vector, centers[label])), label)) for vector in vectors)
+            assert index.assign(centers, metric) == expected
+            labels, cluster_centers, converged = index.cluster(metric=metric)
+            assert labels == index.assign(cluster_centers, metric)
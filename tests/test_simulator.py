@@ -0,0 +1,64 @@
+"""
+The season-parallel simulation batch against a plain loop over the same seasons.
+"""
+import random
+
+import pytest
+
+from modules.rank_matrix import RankMatrix
+from modules.simulator import _simulate_batch, build_team_models
+
+TEAMS = ["A", "B", "C", "D", "E", "F"]
+
+
+def random_full_data(rng, played):
+    full_data = []
+    for team in TEAMS:
+        won = rng.randint(0, played)
+        drawn = rng.randint(0, played - won)
+        full_data.append({'displayName': team, 'stats': {'gp': played, 'w': won, 'd': drawn,
+                                                         'l': played - won - drawn, 'points': 3 * won + drawn,
+                                                         'gd': rng.randint(-5, 5)}})
+    return full_data
+
+
+def reference_batch(seed, simulations, models, data, width, user_count, team_index):
+    """Each season on its own: sort the table, score everyone, split wins among the tied leaders"""
+    rng = random.Random(seed)
+    gained = [rng.choices(range(len(m['cum_weights'])), cum_weights=m['cum_weights'], k=simulations)
+              for m in models]
+    error_sums = [0] * user_count
+    wins = [0.0] * user_count
+    top3 = [0] * user_count
+    for season in range(simulations):
+        keys = [(m['points'] + gained[t][season]) * 1000.0 + m['gd'] for t, m in enumerate(models)]
+        order = sorted(range(len(models)), key=keys.__getitem__, reverse=True)
+        final = {t: pos for pos, t in enumerate(order)}
+        errors = []
+        for u in range(user_count):
+            row = data[u * width:(u + 1) * width]
+            errors.append(sum(abs(pos - final[team_index[team_id]]) for pos, team_id in enumerate(row)
+                              if team_id < len(team_index) and team_index[team_id] is not None))
+        best = min(errors)
+        for u, error in enumerate(errors):
+            error_sums[u] += error
+            if error == best:
+                wins[u] += 1 / errors.count(best)
+            if sum(1 for other in errors if other < error) < 3:
+                top3[u] += 1
+    return error_sums, wins, top3
+
+
+@pytest.mark.parametrize('users', [2, 7])
+def test_simulate_batch_matches_per_season_loop(users):
+    rng = random.Random(users)
+    for trial in range(10):
+        models = build_team_models(random_full_data(rng, 7), total_rounds=10)
+        matrix = RankMatrix.from_bets({f"User {u}": rng.sample(TEAMS, len(TEAMS)) for u in range(users)})
+        team_index = [TEAMS.index(name) for name in matrix.team_names]
+        args = (trial, 500, models, bytes(matrix.data), matrix.width, len(matrix), team_index)
+        error_sums, wins, top3 = _simulate_batch(args)
+        expected_sums, expected_wins, expected_top3 = reference_batch(*args)
+        assert error_sums == expected_sums
+        assert wins == pytest.approx(expected_wins)
+        assert top3 == expected_top3